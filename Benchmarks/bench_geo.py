@@ -0,0 +1,24 @@
+"""Time nearest and radius queries on a Geo.GridIndex of random points spread over Great Britain.
+Run from the repository root:  python -m Benchmarks.bench_geo [points]
+"""
+import sys
+import timeit
+
+import numpy as np
+
+from EstateAgent import Geo
+
+REPEAT = 2000
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+    random = np.random.RandomState(0)
+    points = Geo.project(random.uniform(50, 58, n), random.uniform(-5, 1.5, n))
+    start = timeit.default_timer()
+    index = Geo.GridIndex(points)
+    print(f"build {n} points {(timeit.default_timer() - start) * 1000:8.1f} ms   cell {index.cell_size:.2f} km")
+    queries = points[random.randint(n, size=REPEAT)]
+    for name, query in [("nearest 5", lambda q: index.nearest(q, 5)), ("within 5 km", lambda q: index.within(q, 5))]:
+        seconds = timeit.timeit(lambda: [query(q) for q in queries], number=1)
+        print(f"{name:12} {seconds / REPEAT * 1000:8.3f} ms/query")
@@ -0,0 +1,35 @@
+"""Time how long it takes to import each EstateAgent module in a fresh interpreter and list the heavy
+third party packages each import pulls in.
+Run from the repository root:  python -m Benchmarks.bench_imports
+"""
+import re
+import subprocess
+import sys
+
+MODULES = ["EstateAgent.Classes", "EstateAgent.Parsers", "EstateAgent.Scrapers"]
+HEAVY = ["pandas", "numpy", "selenium", "bs4", "lxml", "requests"]
+REPEAT = 5
+
+
+def import_time(module):
+    """
+    Import module in a new interpreter with -X importtime.
+    :param module : string dotted module name
+    :return float cumulative import time in ms, list of heavy packages loaded
+    """
+    script = f"import sys, {module}; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", script], capture_output=True, text=True)
+    # import time:  self [us] | cumulative | imported package
+    match = re.search(r"\|\s*(\d+)\s*\|\s*" + re.escape(module) + r"\s*$", result.stderr, re.MULTILINE)
+    cumulative = int(match.group(1)) / 1000 if match else float("nan")
+    return cumulative, [m for m in result.stdout.strip().split(",") if m]
+
+
+if __name__ == '__main__':
+    for name in MODULES:
+        times = []
+        loaded = []
+        for _ in range(REPEAT):
+            ms, loaded = import_time(name)
+            times.append(ms)
+        print(f"{name:25} {min(times):8.1f} ms   heavy packages loaded: {', '.join(loaded) or 'none'}")
@@ -0,0 +1,108 @@
+"""Measure the memory held by a history of jobs like the one JobStore.load_jobs builds.
+The same jobs are also built from copies of the job classes with an instance __dict__ in place of __slots__, as they
+were before, for a before/after comparison.
+Run from the repository root:  python -m Benchmarks.bench_memory [jobs]
+"""
+import datetime as dt
+import gc
+import sys
+import tracemalloc
+import types
+
+from EstateAgent import Classes
+
+BRANCHES = 300  # distinct agent branches the jobs are spread over
+PROPERTY_TYPES = ["House", "Flat", "Bungalow", "Maisonette"]
+
+
+SLOTTED = ["Address", "Appointment", "Client", "Vendor", "Agent", "Job"]  # bases before the classes built on them
+
+
+def _cell(value):
+    return (lambda: value).__closure__[0]
+
+
+def _copy_function(function, namespace, cls):
+    """
+    :param function  : function defined in Classes
+    :param namespace : dict of globals for the copy to run in
+    :param cls       : class the copy belongs to, for super()
+    :return function running the same code but seeing namespace's classes
+    """
+    closure = function.__closure__
+    if closure is not None:
+        closure = tuple(_cell(cls) if name == "__class__" else cell
+                        for name, cell in zip(function.__code__.co_freevars, closure))
+    copy = types.FunctionType(function.__code__, namespace, function.__name__, function.__defaults__, closure)
+    copy.__kwdefaults__ = function.__kwdefaults__
+    return copy
+
+
+def unslotted():
+    """
+    Copies of the Classes job classes that keep their attributes in an instance __dict__ instead of __slots__.
+    Their methods see the other copies, so e.g. a copied Job makes copied Appointments for its defaults.
+    :return types.SimpleNamespace of the copied classes by name
+    """
+    namespace = dict(vars(Classes))
+    for name in SLOTTED:
+        original = getattr(Classes, name)
+        slots = set(vars(original).get("__slots__", ()))
+        body = {key: value for key, value in vars(original).items()
+                if key not in slots and key not in ("__slots__", "__dict__", "__weakref__")}
+        bases = tuple(namespace[base.__name__] if base.__name__ in SLOTTED else base for base in original.__bases__)
+        cls = namespace[name] = type(name, bases, body)
+        for key, value in body.items():
+            if isinstance(value, types.FunctionType):
+                setattr(cls, key, _copy_function(value, namespace, cls))
+            elif isinstance(value, (classmethod, staticmethod)) and isinstance(value.__func__, types.FunctionType):
+                setattr(cls, key, type(value)(_copy_function(value.__func__, namespace, cls)))
+    return types.SimpleNamespace(**{name: namespace[name] for name in SLOTTED})
+
+
+def make_jobs(count, agent=Classes.Agent, classes=Classes):
+    """
+    Build count jobs as a load from the database would: every string is a new object as sqlite returns it.
+    :param count   : int number of jobs
+    :param agent   : callable making Agent objects e.g. Agent or Agent.interned
+    :param classes : module or namespace holding the other job classes e.g. unslotted()
+    :return list of Job objects
+    """
+    start = dt.datetime(2019, 2, 1, 9)
+    jobs = []
+    for i in range(count):
+        b = i % BRANCHES
+        job = classes.Job(id_=f"{1000000000 + i}", client="".join(["K", "A"]),
+                          agent=agent(branch=f"Connells - Branch {b}", phone_1=f"01908 {b:03d} 343",
+                                      phone_2=f"01908 {b:03d} 999"),
+                          vendor=classes.Vendor(f"Mrs Sue Blogs {i}", phone_1=f"07891 {i % 1000:03d} 211"),
+                          beds=str(i % 5 + 1), property_type="".join(PROPERTY_TYPES[i % 4]),
+                          appointment=classes.Appointment(classes.Address(f"{i % 200}, Test Street, Milton Keynes",
+                                                                          "MK4 4FY"),
+                                                          start + dt.timedelta(hours=i)),
+                          notes=[f"Note {i}"], photos=i % 20, specific_reqs={"StreetScape": 1}, system_notes=[])
+        jobs.append(job)
+    return jobs
+
+
+def measure(count, agent, classes=Classes):
+    """
+    :return float MB held by count jobs
+    """
+    gc.collect()
+    tracemalloc.start()
+    jobs = make_jobs(count, agent, classes)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del jobs
+    return size / 2 ** 20
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    before = unslotted()
+    results = [("before: __dict__", measure(n, before.Agent, before)),
+               ("__slots__", measure(n, Classes.Agent)),
+               ("__slots__, Agent.interned", measure(n, Classes.Agent.interned))]
+    for label, size in results:
+        print(f"{label:28} {size:8.1f} MB  for {n} jobs  {size / results[0][1]:6.1%} of before")
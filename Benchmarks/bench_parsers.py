@@ -0,0 +1,116 @@
+"""Parser throughput on synthetic pages from Benchmarks.generator.
+For each client and each number of pages, time every stage a job page goes through once it has been captured:
+  soup   : BeautifulSoup parse of the page source
+  fields : Scraper._extract_page_fields
+  parse  : Parser.map_job
+and the landing page stage:
+  links  : Scraper.job_links on a landing page / dashboard listing that many jobs
+Results are compared with the saved baseline so regressions show up.
+Run from the repository root:  python -m Benchmarks.bench_parsers [pages ...] [--save] [--baseline FILE]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from Benchmarks import generator
+from EstateAgent import Parsers, Scrapers
+
+SIZES = [10, 1000, 100000]
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+TOLERANCE = 0.2  # slow down by more than this fraction of the baseline to be reported as a regression
+CLIENTS = {"KA": (Scrapers.KaScraper, Parsers.KaParser), "HS": (Scrapers.HsScraper, Parsers.HsParser)}
+
+
+def run(kind, count, seed=0):
+    """
+    Push count synthetic job pages through each stage.
+    :param kind  : "KA" or "HS"
+    :param count : int number of pages
+    :param seed  : int generator seed
+    :return dict {"jobs_per_sec" : float, "stages" : {stage : ms per page}}
+    """
+    scraper_class, parser_class = CLIENTS[kind]
+    scraper = scraper_class(persist_session=False)
+    stages = {"soup": 0.0, "fields": 0.0, "parse": 0.0}
+    clock = time.perf_counter
+    for page in generator.pages(kind, count, seed):  # made one at a time so 100k pages need no more memory than 10
+        start = clock()
+        soup = BeautifulSoup(page, 'lxml')
+        parsed = clock()
+        fields = scraper._extract_page_fields(soup)
+        extracted = clock()
+        parser_class(fields).map_job()
+        done = clock()
+        stages["soup"] += parsed - start
+        stages["fields"] += extracted - parsed
+        stages["parse"] += done - extracted
+    total = sum(stages.values())
+
+    landing = generator.landing_page(kind, count, seed)
+    start = clock()
+    scraper.job_links(BeautifulSoup(landing, 'lxml'))
+    stages["links"] = clock() - start
+    return {"jobs_per_sec": count / total if total else 0.0,
+            "stages":       {stage: seconds / count * 1000 for stage, seconds in stages.items()}}
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """
+    :param results  : dict {client : {pages : run() result}}
+    :param baseline : dict of the same shape from an earlier run
+    :return list of strings describing every stage more than tolerance slower than the baseline
+    """
+    regressions = []
+    for kind, sizes in results.items():
+        for size, result in sizes.items():
+            before = baseline.get(kind, {}).get(size)
+            if before is None:
+                continue
+            for stage, ms in result["stages"].items():
+                old = before["stages"].get(stage)
+                if old and ms > old * (1 + tolerance):
+                    regressions.append(f"{kind} {size:>7} pages {stage:7} {old:8.3f} -> {ms:8.3f} ms/page "
+                                       f"({ms / old - 1:+.0%})")
+    return regressions
+
+
+def main(argv=None):
+    arguments = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arguments.add_argument("sizes", nargs="*", type=int, default=SIZES, help="numbers of pages to time")
+    arguments.add_argument("--clients", nargs="+", default=list(CLIENTS), choices=list(CLIENTS))
+    arguments.add_argument("--baseline", default=BASELINE, help="json file of earlier results")
+    arguments.add_argument("--save", action="store_true", help="save these results as the new baseline")
+    arguments.add_argument("--tolerance", type=float, default=TOLERANCE)
+    options = arguments.parse_args(argv)
+
+    results = {}
+    for kind in options.clients:
+        for size in options.sizes:
+            result = results.setdefault(kind, {})[str(size)] = run(kind, size)
+            stages = "   ".join(f"{stage} {ms:7.3f}" for stage, ms in result["stages"].items())
+            print(f"{kind} {size:>7} pages {result['jobs_per_sec']:9.1f} jobs/s   ms/page: {stages}")
+
+    baseline = {}
+    if os.path.exists(options.baseline):
+        with open(options.baseline) as f:
+            baseline = json.load(f).get("results", {})
+    regressions = compare(results, baseline, options.tolerance)
+    for line in regressions:
+        print("REGRESSION", line)
+    if options.save:
+        for kind, sizes in results.items():  # keep the baseline of any size not run this time
+            baseline.setdefault(kind, {}).update(sizes)
+        with open(options.baseline, "w") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "results": baseline}, f,
+                      indent=2)
+        print(f"baseline saved to {options.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
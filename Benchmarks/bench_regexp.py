@@ -0,0 +1,58 @@
+"""Compare the per string loops with the precompiled Parsers.ExtractionPlan on the text parsed for every KeyAGENT job:
+ConfigKA.REGEXP on the agent and vendor fields, abbreviating the history table and filtering unwanted notes.
+Run from the repository root:  python -m Benchmarks.bench_regexp [history rows]
+"""
+import re
+import sys
+import timeit
+
+from EstateAgent import ConfigKA, Parsers
+
+REPEAT = 20000
+AGENT = "Steve CaballeroTEL: 01908 563 993MOB: 07891 123211TEL"
+VENDOR = "Mr H Brown DAY: 01908 563 993  MOB: 07891 123211  EVE: N/A  Email: h.brown@example.com"
+
+
+def raw_search(source, string):
+    fields = {}
+    for name in ConfigKA.REGEXP_SOURCES[source]:
+        match = re.search(ConfigKA.REGEXP[name], string)
+        fields[name] = match.group(1) if match else None
+    return fields
+
+
+def abbreviate_cells(cells):
+    result = []
+    for string in cells:
+        for k, v in ConfigKA.JOB_PAGE_SITE_VISIT_ABBRS.items():
+            string = string.replace(k, v)
+        result.append(string)
+    return result
+
+
+def unwanted_notes(notes):
+    return {note for note in notes for unwanted in ConfigKA.UNWANTED_NOTES if unwanted in note}
+
+
+def report(name, old, new):
+    old_us = min(timeit.repeat(old, number=REPEAT, repeat=3)) / REPEAT * 1e6
+    new_us = min(timeit.repeat(new, number=REPEAT, repeat=3)) / REPEAT * 1e6
+    print(f"{name:10} loops {old_us:9.2f} us/job   plan {new_us:9.2f} us/job   speedup {old_us / new_us:5.1f}x")
+
+
+if __name__ == '__main__':
+    plan = Parsers.ExtractionPlan.for_config(ConfigKA)
+    assert raw_search("JOB_DATA_VENDOR", VENDOR) == plan.extract("JOB_DATA_VENDOR", VENDOR)
+    report("Agent", lambda: raw_search("JOB_DATA_AGENT", AGENT), lambda: plan.extract("JOB_DATA_AGENT", AGENT))
+    report("Vendor", lambda: raw_search("JOB_DATA_VENDOR", VENDOR), lambda: plan.extract("JOB_DATA_VENDOR", VENDOR))
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    REPEAT //= 10
+    history = [cell for i in range(rows) for cell in (f"0{i % 9 + 1}/02/2019 10:{i % 60:02d}", "Steve Caballero",
+                                                      f"Appointment date ammended due to the reason {i}")]
+    assert abbreviate_cells(history) == plan.abbreviate(history)
+    report("History", lambda: abbreviate_cells(history), lambda: plan.abbreviate(history))
+    notes = [f"Sample Selector: {i}" if i % 4 == 0 else f"Key with agent : NA {i}" if i % 4 == 1 else f"Note {i}"
+             for i in range(rows)]
+    assert unwanted_notes(notes) == plan.unwanted_notes(notes)
+    report("Notes", lambda: unwanted_notes(notes), lambda: plan.unwanted_notes(notes))
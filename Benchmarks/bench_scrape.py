@@ -0,0 +1,79 @@
+"""End to end scrape throughput against the local portals in Benchmarks.portal.
+For each client and each pool size a fresh portal listing N jobs is started and a whole scrape is run through headless
+Chrome: logon, landing page, every job page and parsing. Where the time went is reported from EstateAgent.Metrics.
+Needs Chrome and chromedriver but no network.
+Run from the repository root:
+    python -m Benchmarks.bench_scrape [--jobs N] [--pools 1 2 4] [--latency S] [--error-rate F] [--http-fetch]
+                                      [--parse-workers N]
+"""
+import argparse
+import sys
+import time
+
+from Benchmarks import portal
+from EstateAgent import Metrics, Scrapers
+
+
+def run(kind, jobs, pool_size, latency=0.0, jitter=0.0, error_rate=0.0, headless=True, **options):
+    """
+    Scrape a fresh local portal once.
+    :param kind       : "KA" or "HS"
+    :param jobs       : int number of jobs the portal lists
+    :param pool_size  : int webdrivers, see Scraper.__init__
+    :param latency    : float seconds the portal adds to every response
+    :param jitter     : float up to this many seconds more at random
+    :param error_rate : float fraction of job pages the portal fails
+    :param headless   : bool run Chrome without a window
+    :param options    : other Scraper options e.g. http_fetch, extract_js
+    :return dict {"jobs" : int scraped, "seconds" : float, "jobs_per_sec" : float, "requests" : {page : count},
+                  "metrics" : Metrics.Metrics, "error" : string or None}
+    """
+    with portal.PORTALS[kind](jobs=jobs, latency=latency, jitter=jitter, error_rate=error_rate) as site:
+        config = site.local_config()
+        metrics = Metrics.Metrics(config.CLIENT)
+        scraper = Scrapers.SCRAPERS[kind](config=config, pool_size=pool_size, headless=headless,
+                                          persist_session=False, metrics=metrics, **options)
+        scraped, error = 0, None
+        start = time.perf_counter()
+        try:
+            for _ in scraper.iter_jobs():
+                scraped += 1
+        except Exception as e:  # report it with the rest rather than lose the other runs
+            error = f"{type(e).__name__}: {e}"
+        seconds = time.perf_counter() - start
+        return {"jobs": scraped, "seconds": seconds, "jobs_per_sec": scraped / seconds if seconds else 0.0,
+                "requests": dict(site.requests), "metrics": metrics, "error": error}
+
+
+def main(argv=None):
+    arguments = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arguments.add_argument("--clients", nargs="+", default=list(portal.PORTALS), choices=list(portal.PORTALS))
+    arguments.add_argument("--jobs", type=int, default=50, help="jobs listed on each portal")
+    arguments.add_argument("--pools", nargs="+", type=int, default=[1, 2, 4], help="pool sizes to time")
+    arguments.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    arguments.add_argument("--jitter", type=float, default=0.0, help="up to this many seconds more at random")
+    arguments.add_argument("--error-rate", type=float, default=0.0, help="fraction of job pages answered with 500")
+    arguments.add_argument("--http-fetch", action="store_true", help="fetch job pages over HTTP")
+    arguments.add_argument("--extract-js", action="store_true", help="read job page fields with javascript")
+    arguments.add_argument("--parse-workers", type=int, default=0, help="processes parsing pages as they're captured")
+    arguments.add_argument("--headed", action="store_true", help="show the Chrome windows")
+    options = arguments.parse_args(argv)
+
+    failed = False
+    for kind in options.clients:
+        for pool_size in options.pools:
+            result = run(kind, options.jobs, pool_size, options.latency, options.jitter, options.error_rate,
+                         headless=not options.headed, http_fetch=options.http_fetch, extract_js=options.extract_js,
+                         parse_workers=options.parse_workers)
+            requests = "  ".join(f"{page} {count}" for page, count in sorted(result["requests"].items()))
+            print(f"{kind} pool {pool_size:2} {result['jobs']:5} jobs {result['seconds']:8.2f}s "
+                  f"{result['jobs_per_sec']:7.2f} jobs/s   requests: {requests}")
+            print("\n".join("   " + line for line in str(result["metrics"]).splitlines()[1:]))
+            if result["error"]:
+                failed = True
+                print(f"   FAILED {result['error']}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Compare pandas.read_html with EstateAgent.Tables on the tables parsed for every job.
+Run from the repository root:  python -m Benchmarks.bench_tables [history rows]
+"""
+import sys
+import timeit
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from EstateAgent import Tables
+
+REPEAT = 200
+
+
+def ka_tables(history_rows):
+    """
+    :param history_rows : int rows in the job history table
+    :return BeautifulSoup Tags: specific requirements table, history table
+    """
+    reqs = "<table id='reqs'><tr><th>Specific Requirement</th><th>Files required</th></tr>" \
+           "<tr><td>StreetScape</td><td>1</td></tr><tr><td>Garden</td><td>2</td></tr></table>"
+    history = "<table id='history'><tr><th>Date Created</th><th>Created By</th><th>Note</th></tr>" + "".join(
+            f"<tr><td>0{i % 9 + 1}/02/2019 10:{i % 60:02d}</td><td>Steve Caballero</td>"
+            f"<td>Appointment date ammended due to the reason {i}</td></tr>" for i in range(history_rows)) + "</table>"
+    soup = BeautifulSoup(reqs + history, 'lxml')
+    return soup.find(id="reqs"), soup.find(id="history")
+
+
+def hs_tables():
+    """
+    :return list of BeautifulSoup Tags: Home Visit and Owner key/value tables
+    """
+    html = "<table><tr><td>Reference</td><td>HSS103120</td></tr><tr><td>Address</td><td>37 Testy Road, " \
+           "MK41 5DA</td></tr><tr><td>Number of bedrooms</td><td>3</td></tr><tr><td>Property type</td>" \
+           "<td>Semi-detached House</td></tr><tr><td>Appointment time</td><td>08/12/2018 @ 15:00</td></tr></table>" \
+           "<table><tr><td>Name</td><td>joe blogs</td></tr><tr><td>Email</td><td>joe@example.com</td></tr></table>"
+    return BeautifulSoup(html, 'lxml').find_all("table")
+
+
+def pandas_ka(reqs, history):
+    df = pd.read_html(str(reqs), header=0)[0]
+    specifics = {row['Specific Requirement']: row['Files required'] for _, row in df.iterrows()}
+    df = pd.read_html(str(history), header=0)[0]
+    notes = [[row['Date Created'], row['Created By'], row['Note']] for _, row in df.iterrows()]
+    return specifics, notes
+
+
+def native_ka(reqs, history):
+    specifics = {row['Specific Requirement']: row['Files required'] for row in Tables.read_table(reqs)}
+    notes = [[row['Date Created'], row['Created By'], row['Note']] for row in Tables.read_table(history)]
+    return specifics, notes
+
+
+def pandas_hs(tables):
+    df = pd.read_html(str(tables), index_col=0)
+    table = pd.concat([pd.DataFrame(df[i]) for i in range(len(df))]).T
+    return {key: table[key].values[0] for key in ("Reference", "Address", "Name")}
+
+
+def native_hs(tables):
+    table = Tables.read_key_values(tables)
+    return {key: table[key] for key in ("Reference", "Address", "Name")}
+
+
+def report(name, old, new):
+    old_ms = min(timeit.repeat(old, number=REPEAT, repeat=3)) / REPEAT * 1000
+    new_ms = min(timeit.repeat(new, number=REPEAT, repeat=3)) / REPEAT * 1000
+    print(f"{name:30} pandas {old_ms:8.3f} ms/job   native {new_ms:8.3f} ms/job   speedup {old_ms / new_ms:6.1f}x")
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    ka_reqs, ka_history = ka_tables(rows)
+    hs = hs_tables()
+    report(f"KeyAGENT ({rows} history rows)", lambda: pandas_ka(ka_reqs, ka_history),
+           lambda: native_ka(ka_reqs, ka_history))
+    report("House Simple", lambda: pandas_hs(hs), lambda: native_hs(hs))
@@ -0,0 +1,208 @@
+"""Synthetic KeyAGENT and House Simple pages built from the ids and layouts in ConfigKA and ConfigHS.
+Vendors, agents, phone number styles, postcodes, notes and history tables are random but seeded, so the same seed
+always gives the same pages. Used by the benchmarks in place of the pickled fixtures.
+"""
+import datetime as dt
+import html
+import random
+
+from EstateAgent import Classes, ConfigHS, ConfigKA
+
+TITLES = ["Mr", "Mrs", "Ms", "Miss", "Dr"]
+FIRST_NAMES = ["Sue", "Harry", "Joe", "Priya", "Tom", "Aisha", "Mark", "Jane", "Wei", "Olu"]
+SURNAMES = ["Blogs", "Brown", "Smith", "Patel", "Jones", "Khan", "Taylor", "Wilson", "Evans", "Walker"]
+AGENCIES = ["Connells", "Michael Graham", "Your Move", "Bairstow Eves", "Haart", "Fine & Country"]
+TOWNS = ["Milton Keynes", "Stony Stratford", "Bedford", "Northampton", "Luton", "Newport Pagnell", "Olney"]
+STREETS = ["High Street", "Test Street", "Church Lane", "Station Road", "Mill Close", "The Green", "Park Avenue"]
+AREAS = ["MK", "NN", "LU", "SG", "HP", "OX", "B", "E", "N", "W"]
+PROPERTY_TYPES = ["House", "Flat", "Bungalow", "Maisonette", "Semi-detached House", "Detached House", "Terraced House"]
+NOTES = ["Key with agent", "Vendor has a dog", "Park on the drive", "Ring before arriving", "Tenant in situ",
+         "Garden is the main feature", "Access via the side gate", "Parking: NA", "Sample Selector: 3",
+         "AA Prestige property", "Lockbox code from branch"]
+HISTORY = ["Appointment date ammended due to the reason Changed at Vendors request",
+           "The Supplier has confirmed the Appointment", "Floorplan required",
+           "Added by the Supplier: I will call again",
+           "Appointment booked (DEA)", "Vendor asked for a morning slot please explain"]
+REQUIREMENTS = ["StreetScape", "Garden", "Kitchen", "Rear elevation", "Views"]
+HS_SITE = "https://www.housesimple.com"  # dashboard links are absolute on the real site
+# ASP.NET's postback: fill in the hidden event fields and submit the page's form
+POSTBACK_SCRIPT = "<script>function __doPostBack(target, argument) {var form = document.forms[0]; " \
+                  "form.__EVENTTARGET.value = target; form.__EVENTARGUMENT.value = argument; form.submit();}</script>"
+
+
+def phone(rng):
+    """
+    :return string random UK number written in one of the ways agents type them
+    """
+    template, _ = rng.choice(Classes.TEL_FORMATS)
+    number = "".join(str(rng.randrange(10)) if c == "#" else c for c in template.strip())  # e.g. 01908 501 401
+    code, _, rest = number.partition(" ")
+    return rng.choice([number, number.replace(" ", ""), f"({code}) {rest}", number.replace(" ", "-")])
+
+
+def postcode(rng):
+    """
+    :return string random postcode matching Address.POSTCODE_REGEXP
+    """
+    letters = "ABDEFGHJLNPQRSTUWXYZ"
+    return f"{rng.choice(AREAS)}{rng.randint(1, 45)} {rng.randrange(10)}{rng.choice(letters)}{rng.choice(letters)}"
+
+
+def name(rng):
+    return f"{rng.choice(TITLES)} {rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)}"
+
+
+def address(rng):
+    return f"{rng.randint(1, 250)}, {rng.choice(STREETS)} {rng.choice(TOWNS)}, {rng.choice(TOWNS)}, {postcode(rng)}"
+
+
+def appointment(rng):
+    return dt.datetime(2019, 1, 1, 8) + dt.timedelta(days=rng.randrange(365), minutes=30 * rng.randrange(20))
+
+
+def _table(table_id, headings, rows):
+    """
+    :return string html table with a header row
+    """
+    head = "".join(f"<th>{html.escape(h)}</th>" for h in headings)
+    body = "".join("<tr>" + "".join(f"<td>{html.escape(str(c))}</td>" for c in row) + "</tr>" for row in rows)
+    return f'<table id="{table_id}" cellspacing="0" border="1"><tr>{head}</tr>{body}</table>'
+
+
+def _page(body, form=""):
+    """
+    :param body : string html inside the page's form
+    :param form : string attributes of the form tag e.g. ' method="post"'
+    :return string html
+    """
+    return f"<!DOCTYPE html><html><head><title>Job</title></head><body><form{form}>{body}</form></body></html>"
+
+
+def ka_job_page(rng, job_id, history_rows=None):
+    """
+    A KeyAGENT job page with every ConfigKA.JOB_PAGE_DATA field and JOB_PAGE_TABLES table.
+    :param rng          : random.Random
+    :param job_id       : int
+    :param history_rows : int rows in the job history table or None for a random number
+    :return string html
+    """
+    ids = ConfigKA.JOB_PAGE_DATA
+    branch = f"{rng.choice(AGENCIES)} - {rng.choice(TOWNS)}"
+    mob = phone(rng) if rng.random() < 0.7 else "N/A"
+    eve = phone(rng) if rng.random() < 0.3 else "N/A"
+    notes = [f"Agency Branch: {branch}"] + rng.sample(NOTES, rng.randint(0, 5))
+    fields = {
+            "JOB_DATA_AGENT":               f"{name(rng)} of {branch}  MOB:{phone(rng)}  TEL:{phone(rng)}  EVE:N/A",
+            "JOB_DATA_VENDOR":              f"{name(rng)} DAY: {phone(rng)}  MOB: {mob}  EVE: {eve}  Email: "
+                                            f"vendor{job_id}@example.com",
+            "JOB_DATA_FLOORPLAN":           rng.choice(["Yes", "No"]),
+            "JOB_DATA_PHOTOS":              f"Up to {rng.randint(6, 20)} photos",
+            "JOB_DATA_PROPERTY_TYPE":       rng.choice(PROPERTY_TYPES),
+            "JOB_DATA_BEDS":                str(rng.randint(1, 6)),
+            "JOB_DATA_NOTES":               "\n".join(notes),
+            "JOB_DATA_BRANCH_NOTES":        rng.choice(["", "Call branch first"]),
+            "JOB_DATA_SENT":                "01/02/2019",
+            "JOB_DATA_CONFIRMED":           "02/02/2019",
+            "JOB_DATA_APPOINTMENT":         appointment(rng).strftime(ConfigKA.TIME_FORMAT),
+            "JOB_DATA_APPOINTMENT_ADDRESS": address(rng),
+            "JOB_DATA_ID":                  str(1000000000 + job_id)
+    }
+    body = "".join(f'<textarea id="{ids[key]}">{html.escape(value)}</textarea>' if key == "JOB_DATA_NOTES" else
+                   f'<span id="{ids[key]}">{html.escape(value)}</span>' for key, value in fields.items())
+    tables = ConfigKA.JOB_PAGE_TABLES
+    body += _table(tables["JOB_DATA_SPECIFIC_REQS_TABLE"], ["Specific Requirement", "Files required"],
+                   [[req, rng.randint(1, 3)] for req in rng.sample(REQUIREMENTS, rng.randint(1, 3))])
+    rows = rng.randint(1, 40) if history_rows is None else history_rows
+    start = appointment(rng)
+    body += _table(tables["JOB_DATA_HISTORY_TABLE"], ["Date Created", "Created By", "Note"],
+                   [[(start - dt.timedelta(hours=i)).strftime("%d/%m/%Y %H:%M"), "Steve Caballero", rng.choice(HISTORY)]
+                    for i in range(rows)])
+    body += "".join(f'<input type="submit" id="{value}" value="{key}">' for key, value in
+                    ConfigKA.JOB_PAGE_BUTTONS.items())
+    return _page(body)
+
+
+def ka_landing_page(rng, count, action=None):
+    """
+    A KeyAGENT home page listing count outstanding jobs, each with a __doPostBack "Select" link.
+    :param rng    : random.Random
+    :param count  : int number of jobs
+    :param action : string url the form posts back to, with the hidden ASP.NET fields and __doPostBack script a
+                    browser needs to follow the links. None for just the listing
+    :return string html
+    """
+    table = "ctl00_text_GridViewOutstandingCases"
+    rows = "".join(f"<tr><td><a href=\"javascript:__doPostBack('ctl00$text$GridViewOutstandingCases','Select${i}')\">"
+                   f"Select</a></td><td>{1000000000 + i}</td><td>{html.escape(address(rng))}</td></tr>"
+                   for i in range(count))
+    body = f'<table id="{table}"><tr><th></th><th>Ref</th><th>Address</th></tr>{rows}</table>'
+    if action is None:
+        return _page(body)
+    state = "".join(f'<input type="hidden" name="{name}" id="{name}" value="{value}">' for name, value in
+                    [("__EVENTTARGET", ""), ("__EVENTARGUMENT", ""), ("__VIEWSTATE", f"/wEPDw{rng.getrandbits(64):x}"),
+                     ("__EVENTVALIDATION", f"/wEWA{rng.getrandbits(64):x}")])
+    return _page(state + POSTBACK_SCRIPT + body, f' method="post" action="{html.escape(action)}" id="aspnetForm"')
+
+
+def hs_job_page(rng, job_id):
+    """
+    A House Simple home visit page: the Home Visit and Owner key/value tables.
+    :return string html
+    """
+    data = ConfigHS.JOB_PAGE_DATA
+    visit = [(data["ID"], f"HSS{100000 + job_id}"), (data["ADDRESS"], address(rng)),
+             (data["BEDS"], str(rng.randint(1, 6))), (data["PROPERTY"], rng.choice(PROPERTY_TYPES)),
+             (data["APPOINTMENT"], appointment(rng).strftime(ConfigHS.TIME_FORMAT)), ("Status", "Confirmed")]
+    owner = [(data["VENDOR"], name(rng).lower()), ("Email", f"owner{job_id}@example.com"), ("Phone", "Hidden")]
+    tables = "".join("<table class='table'>" + "".join(f"<tr><td>{html.escape(k)}</td><td>{html.escape(v)}</td></tr>"
+                                                       for k, v in pairs) + "</table>" for pairs in (visit, owner))
+    return _page(tables)
+
+
+def hs_dashboard(rng, count, site=HS_SITE):
+    """
+    A House Simple dashboard listing count home visits, about two thirds of them confirmed.
+    :param rng   : random.Random
+    :param count : int number of home visits
+    :param site  : string start of the home visit links. "" for links relative to the page
+    :return string html
+    """
+    rows = "".join(f"<tr><td>{html.escape(address(rng))}</td><td>{appointment(rng):%d/%m/%Y}</td>"
+                   f"<td><span>{ConfigHS.JOB_OPEN if rng.random() < 0.67 else 'Pending'}</span></td>"
+                   f"<td><a href=\"{site}/admin/home-visit-supplier/{300000 + i}/show\">View</a>"
+                   f"</td></tr>" for i in range(count))
+    return _page(f"<table class='sonata-home-visit-block-home-visit-container table table-condensed'>"
+                 f"<tr><th>Address</th><th>Date</th><th>{ConfigHS.JOB_STATUS}</th><th></th></tr>{rows}</table>")
+
+
+def pages(kind, count, seed=0):
+    """
+    :param kind  : "KA" or "HS"
+    :param count : int number of job pages
+    :param seed  : int
+    :return generator of html strings, one job page at a time so any number can be made in constant memory
+    """
+    rng = random.Random(seed)
+    make = ka_job_page if kind == "KA" else hs_job_page
+    for i in range(count):
+        yield make(rng, i)
+
+
+def job_page(kind, job_id, seed=0):
+    """
+    One job page on its own, the same every time for the same job and seed, so pages can be made in any order.
+    :param kind   : "KA" or "HS"
+    :param job_id : int
+    :param seed   : int
+    :return string html
+    """
+    rng = random.Random(f"{seed}:{job_id}")
+    return ka_job_page(rng, job_id) if kind == "KA" else hs_job_page(rng, job_id)
+
+
+def landing_page(kind, count, seed=0):
+    """
+    :return string html of the landing page / dashboard listing count jobs
+    """
+    rng = random.Random(seed)
+    return ka_landing_page(rng, count) if kind == "KA" else hs_dashboard(rng, count)
@@ -0,0 +1,307 @@
+"""Local stand-ins for the KeyAGENT and House Simple portals so whole scrapes can be load tested without the network.
+Each portal serves the flow its ConfigXX describes: a logon form with USERNAME_FIELD/PASSWORD_FIELD/LOGIN_BUTTON, a
+session cookie, the landing page / dashboard listing N jobs and the job pages, all made by Benchmarks.generator.
+KeyAGENT job pages are reached by __doPostBack form posts to the landing page, House Simple ones by plain links.
+Every response can be slowed down and job pages can be made to fail at random.
+
+    with portal.KaPortal(jobs=200, latency=0.05) as site:
+        jobs = list(Scrapers.KaScraper(config=site.local_config(), headless=True, persist_session=False).iter_jobs())
+"""
+import collections
+import html
+import random
+import re
+import secrets
+import threading
+import time
+import types
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit, urlunsplit
+
+from Benchmarks import generator
+
+HOST = "127.0.0.1"
+COOKIE = "PortalSession"
+USERNAME = "benchmark"
+PASSWORD = "benchmark"
+
+
+def local_config(config, url, **overrides):
+    """
+    Copy a ConfigXX file with its logon and landing pages moved to url, keeping their paths and queries.
+    The copy holds only the upper case settings so it can be pickled into Orchestrator processes.
+    :param config    : ConfigXX file tailored to each config
+    :param url       : string scheme and host of the portal e.g. "http://127.0.0.1:8000"
+    :param overrides : settings to replace as well e.g. USERNAME, CHROME_DRIVER
+    :return types.SimpleNamespace standing in for the ConfigXX file
+    """
+    settings = {name: value for name, value in vars(config).items() if name.isupper()}
+    site = urlsplit(url)
+    for page in ("LOGIN_PAGE", "LANDING_PAGE"):
+        settings[page] = urlunsplit(site[:2] + urlsplit(settings[page])[2:])
+    settings.update(overrides)
+    return types.SimpleNamespace(**settings)
+
+
+def _path(url):
+    """
+    :return string path and query of url as sent in an HTTP request line
+    """
+    parts = urlsplit(url)
+    return (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, as Fetchers.HttpFetcher pools its connections
+
+    def do_GET(self):
+        self.server.portal.respond(self, "GET")
+
+    def do_POST(self):
+        self.server.portal.respond(self, "POST")
+
+    def log_message(self, format, *args):
+        pass  # one line per request would swamp the benchmark output
+
+
+class Portal:
+    """
+    Generic portal served from a background thread.
+    Client specific portals say how a job page is asked for. Requests served are counted in Portal.requests
+    {page : count}, pages being LOGIN_PAGE, LOGON, LANDING_PAGE, JOB_PAGE, ERROR and NOT_FOUND.
+    """
+
+    def __init__(self, config, kind, jobs=10, latency=0.0, jitter=0.0, error_rate=0.0, seed=0, port=0,
+                 username=USERNAME, password=PASSWORD):
+        """
+        :param config     : ConfigXX file whose flow is imitated
+        :param kind       : "KA" or "HS", the Benchmarks.generator pages to serve
+        :param jobs       : int number of jobs on the landing page / dashboard
+        :param latency    : float seconds added to every response
+        :param jitter     : float up to this many seconds more, at random, added to every response
+        :param error_rate : float fraction of job page requests answered with a 500 error
+        :param seed       : int generator seed. The same seed always serves the same pages
+        :param port       : int port to listen on. 0 for any free port
+        :param username   : string accepted by the logon form
+        :param password   : string accepted by the logon form
+        :return: None
+        """
+        self.config = config
+        self.kind = kind
+        self.jobs = jobs
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.seed = seed
+        self.username = username
+        self.password = password
+        self.login_path = urlsplit(config.LOGIN_PAGE).path or "/"
+        self.landing_path = urlsplit(config.LANDING_PAGE).path or "/"
+        self.requests = collections.Counter()
+        self._sessions = set()  # cookie values of logged on browsers
+        self._rng = random.Random(seed)  # latency and errors
+        self._lock = threading.Lock()
+        self._landing = None  # made once, it lists the same jobs every time
+        self._server = ThreadingHTTPServer((HOST, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.portal = self
+        self._thread = None
+
+    @property
+    def url(self):
+        """
+        :return string scheme, host and port the portal is listening on
+        """
+        return f"http://{HOST}:{self._server.server_address[1]}"
+
+    def local_config(self, **overrides):
+        """
+        :param overrides : settings to replace as well, see local_config
+        :return stand-in ConfigXX pointing at this portal with its credentials
+        """
+        return local_config(self.config, self.url, USERNAME=self.username, PASSWORD=self.password, **overrides)
+
+    def start(self):
+        """
+        Serve requests from a background thread.
+        :return self
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, name=f"{self.kind}Portal", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop serving and close the listening socket.
+        :return None
+        """
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def respond(self, request, method):
+        """
+        Answer one request. Runs on the server's thread for that connection.
+        :param request : _Handler
+        :param method  : "GET" or "POST"
+        :return None
+        """
+        form = {}
+        if method == "POST":
+            length = int(request.headers.get("Content-Length") or 0)
+            form = {key: values[0] for key, values in
+                    parse_qs(request.rfile.read(length).decode("utf-8"), keep_blank_values=True).items()}
+        cookie = SimpleCookie(request.headers.get("Cookie", ""))
+        logged_on = COOKIE in cookie and cookie[COOKIE].value in self._sessions
+        with self._lock:
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+        page, status, body, headers = self.route(method, urlsplit(request.path).path, form, logged_on)
+        with self._lock:
+            self.requests[page] += 1
+        data = body.encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", "text/html; charset=utf-8")
+        request.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            request.send_header(name, value)
+        request.end_headers()
+        request.wfile.write(data)
+
+    def route(self, method, path, form, logged_on):
+        """
+        :param method    : "GET" or "POST"
+        :param path      : string url path
+        :param form      : dict {field : value} posted
+        :param logged_on : bool True if the request carries a valid session cookie
+        :return (page, HTTP status, html, [(header, value)])
+        """
+        if method == "POST" and self.config.USERNAME_FIELD in form:
+            return self.logon(form)
+        job_id = self.job_id(method, path, form)
+        if job_id is not None:
+            if not logged_on:
+                return "LOGIN_PAGE", 200, self.login_page(), []  # session expired, as the portals do
+            if not 0 <= job_id < self.jobs:
+                return "NOT_FOUND", 404, "<html><body>Not Found</body></html>", []
+            with self._lock:
+                failed = self._rng.random() < self.error_rate
+            if failed:
+                return "ERROR", 500, "<html><body>Server Error</body></html>", []
+            return "JOB_PAGE", 200, generator.job_page(self.kind, job_id, self.seed), []
+        if path == self.landing_path and logged_on:
+            return "LANDING_PAGE", 200, self.landing_page(), []
+        if path in (self.login_path, self.landing_path):
+            return "LOGIN_PAGE", 200, self.login_page(), []
+        return "NOT_FOUND", 404, "<html><body>Not Found</body></html>", []
+
+    def logon(self, form):
+        """
+        Check the posted credentials and start a session.
+        :param form : dict {field : value} posted by the logon form
+        :return route result, a redirect to the landing page or the logon form again
+        """
+        if form.get(self.config.USERNAME_FIELD) != self.username or \
+                form.get(self.config.PASSWORD_FIELD) != self.password:
+            return "LOGON", 200, self.login_page("Invalid username or password"), []
+        session = secrets.token_hex(16)
+        with self._lock:
+            self._sessions.add(session)
+        headers = [("Set-Cookie", f"{COOKIE}={session}; Path=/; HttpOnly"),
+                   ("Location", _path(self.config.LANDING_PAGE))]
+        return "LOGON", 302, "", headers
+
+    def login_page(self, message=""):
+        """
+        :param message : string error to show above the form
+        :return string html logon form with the ConfigXX field and button names
+        """
+        config = self.config
+        return (f'<!DOCTYPE html><html><head><title>Log in</title></head><body><p>{html.escape(message)}</p>'
+                f'<form method="post" action="{html.escape(_path(config.LOGIN_PAGE))}">'
+                f'<input type="text" name="{config.USERNAME_FIELD}">'
+                f'<input type="password" name="{config.PASSWORD_FIELD}">'
+                f'<input type="submit" name="{config.LOGIN_BUTTON}" value="Log in"></form></body></html>')
+
+    def landing_page(self):
+        """
+        :return string html of the landing page / dashboard listing self.jobs jobs
+        """
+        with self._lock:
+            if self._landing is None:
+                self._landing = self._make_landing_page(random.Random(self.seed))
+            return self._landing
+
+    def _make_landing_page(self, rng):
+        raise NotImplementedError
+
+    def job_id(self, method, path, form):
+        """
+        :return int index of the job page asked for or None if the request isn't for a job page
+        """
+        raise NotImplementedError
+
+
+class KaPortal(Portal):
+    """
+    KeyAGENT portal. Job pages are ASP.NET postbacks: the landing page's form posted back to itself with
+    __EVENTARGUMENT "Select$<row>".
+    """
+
+    def __init__(self, config=None, **kwargs):
+        """
+        :param config : ConfigKA or a stand-in. Defaults to ConfigKA
+        :param kwargs : Portal options, see Portal.__init__
+        """
+        if config is None:
+            from EstateAgent import ConfigKA as config
+        super().__init__(config, "KA", **kwargs)
+
+    def _make_landing_page(self, rng):
+        return generator.ka_landing_page(rng, self.jobs, action=_path(self.config.LANDING_PAGE))
+
+    def job_id(self, method, path, form):
+        match = re.fullmatch(r"Select\$(\d+)", form.get("__EVENTARGUMENT", ""))
+        return int(match.group(1)) if method == "POST" and path == self.landing_path and match else None
+
+
+class HsPortal(Portal):
+    """
+    House Simple portal. The logon form and dashboard share a url and job pages are plain links from the dashboard.
+    """
+
+    JOB_PATH = r"/admin/home-visit-supplier/(\d+)/show"
+    FIRST_ID = 300000  # home visit id of the dashboard's first row, as generator.hs_dashboard numbers them
+
+    def __init__(self, config=None, **kwargs):
+        """
+        :param config : ConfigHS or a stand-in. Defaults to ConfigHS
+        :param kwargs : Portal options, see Portal.__init__
+        """
+        if config is None:
+            from EstateAgent import ConfigHS as config
+        super().__init__(config, "HS", **kwargs)
+
+    def _make_landing_page(self, rng):
+        return generator.hs_dashboard(rng, self.jobs, site="")
+
+    def job_id(self, method, path, form):
+        match = re.fullmatch(self.JOB_PATH, path)
+        return int(match.group(1)) - self.FIRST_ID if method == "GET" and match else None
+
+
+# a portal for every client scraper {ConfigXX suffix : Portal class}, as Scrapers.SCRAPERS
+PORTALS = {
+        "KA": KaPortal,
+        "HS": HsPortal
+}
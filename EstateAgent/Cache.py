@@ -0,0 +1,77 @@
+import hashlib
+import os
+import pickle
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".EstateAgent", "cache")  # one cache file per client
+
+
+def fingerprint(*parts):
+    """
+    Make a stable hash of some strings.
+    :param parts : strings
+    :return string : hex digest
+    """
+    return hashlib.sha1("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+
+class JobCache:
+    """
+    Persistent record of what a client's landing page listed on the last scrape and the Jobs parsed from it.
+    Jobs are keyed by their reference (Job.id). Each landing page row is fingerprinted so an unchanged row can be
+    mapped straight back to its Job without visiting the job page again.
+    """
+
+    def __init__(self, client, path=None):
+        """
+        :param client : string ConfigXX.CLIENT
+        :param path   : file to store the cache in. Defaults to CACHE_DIR/<client>.pkl
+        :return: None
+        """
+        self.path = path or os.path.join(CACHE_DIR, client + ".pkl")
+        self.landing = None  # fingerprint of the whole landing page listing
+        self.listing = []  # Jobs in landing page order
+        self.rows = {}  # {row fingerprint : job reference}
+        self.jobs = {}  # {job reference : Job}
+        self.load()
+
+    def load(self):
+        """
+        Read the cache from self.path. A missing or unreadable cache is treated as empty.
+        :return None
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                self.landing, self.listing, self.rows, self.jobs = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, AttributeError):
+            pass
+
+    def save(self):
+        """
+        Write the cache to self.path. Written to a temporary file first so a crash never leaves half a cache.
+        :return None
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp = self.path + ".tmp"
+        with open(temp, 'wb') as f:
+            pickle.dump((self.landing, self.listing, self.rows, self.jobs), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, self.path)
+
+    def lookup(self, row):
+        """
+        :param row : string landing page row fingerprint
+        :return Job or None if the row has not been seen before
+        """
+        return self.jobs.get(self.rows.get(row))
+
+    def update(self, landing, rows, jobs):
+        """
+        Replace the cache contents with the latest scrape. Jobs no longer listed are dropped.
+        :param landing : string landing page fingerprint
+        :param rows    : list of row fingerprints
+        :param jobs    : list of Jobs in the same order as rows
+        :return None
+        """
+        self.landing = landing
+        self.listing = list(jobs)
+        self.rows = {row: job.id for row, job in zip(rows, jobs) if job.id is not None}
+        self.jobs = {job.id: job for job in jobs if job.id is not None}
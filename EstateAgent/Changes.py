@@ -0,0 +1,129 @@
+import hashlib
+import json
+
+from EstateAgent import Classes
+
+PERSON_FIELDS = ("name_1", "name_2", "phone_1", "phone_2", "phone_3")
+
+
+def job_fields(job):
+    """
+    Reduce a Job to plain comparable values, one per field that matters downstream.
+    :param job : Job object
+    :return dict {field : value}
+    """
+    appointment = job.appointment
+    address = appointment.address if appointment is not None else None
+    return {
+            "client":        job.client_name(),
+            "agent":         _person(job.agent) + (getattr(job.agent, "branch", None),),
+            "vendor":        _person(job.vendor),
+            "appointment":   appointment.date.isoformat() if appointment is not None and appointment.date else None,
+            "address":       (getattr(address, "street", None), getattr(address, "postcode", None)),
+            "property_type": job.property_type,
+            "beds":          None if job.beds is None else str(job.beds),
+            "folder":        job.folder,
+            "notes":         tuple(job.notes or ()),
+            "floorplan":     bool(job.floorplan),
+            "photos":        job.photos,
+            "specific_reqs": tuple(sorted((job.specific_reqs or {}).items())),
+            "system_notes":  tuple(tuple(row) for row in job.system_notes or ()),
+            "status":        job.status
+    }
+
+
+def _person(client):
+    """
+    :param client : Client, Agent, Vendor or None
+    :return tuple of names and phone numbers
+    """
+    return tuple(getattr(client, field, None) for field in PERSON_FIELDS)
+
+
+def fingerprint(job):
+    """
+    Stable content hash of a Job. The same content gives the same fingerprint in every process and every run.
+    :param job : Job object
+    :return string hex digest
+    """
+    return hashlib.sha1(json.dumps(job_fields(job), sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def diff(old, new):
+    """
+    Field level differences between two versions of a Job.
+    :param old : Job object
+    :param new : Job object
+    :return dict {field : (old value, new value)} for every field that changed
+    """
+    old_fields, new_fields = job_fields(old), job_fields(new)
+    return {field: (old_fields[field], value) for field, value in new_fields.items() if old_fields[field] != value}
+
+
+class ChangeSet:
+    """
+    What changed between two scrapes.
+    added    : list of Jobs that are new
+    modified : list of (Job, {field : (old value, new value)})
+    removed  : list of Jobs no longer listed, their status set to Job.ARCHIVED
+    """
+
+    def __init__(self, added=None, modified=None, removed=None):
+        self.added = added or []
+        self.modified = modified or []
+        self.removed = removed or []
+
+    def __len__(self):
+        return len(self.added) + len(self.modified) + len(self.removed)
+
+    def jobs(self):
+        """
+        :return list of every Job that needs saving
+        """
+        return self.added + [job for job, _ in self.modified] + self.removed
+
+    def new_system_notes(self):
+        """
+        System note rows added to modified jobs since the last scrape.
+        :return dict {job id : list of new rows}
+        """
+        notes = {}
+        for job, fields in self.modified:
+            if "system_notes" in fields:
+                old = set(fields["system_notes"][0])
+                notes[job.id] = [row for row in fields["system_notes"][1] if row not in old]
+        return notes
+
+    def __str__(self):
+        lines = [f"ADDED: {job.id}" for job in self.added]
+        lines += [f"MODIFIED: {job.id} {', '.join(fields)}" for job, fields in self.modified]
+        lines += [f"REMOVED: {job.id}" for job in self.removed]
+        return "\n".join(lines)
+
+
+def compare(previous, current):
+    """
+    Compare the previous snapshot of a client's jobs with the latest scrape.
+    Fingerprints are compared first so only the jobs that actually changed are diffed field by field.
+    Jobs that have dropped off the site are archived.
+    :param previous : iterable of Job objects from the last scrape
+    :param current  : iterable of Job objects from this scrape
+    :return ChangeSet
+    """
+    before = {job.id: job for job in previous if job.id is not None}
+    changes = ChangeSet()
+    seen = set()
+    for job in current:
+        if job.id is None:
+            continue
+        seen.add(job.id)
+        old = before.get(job.id)
+        if old is None:
+            changes.added.append(job)
+        elif fingerprint(old) != fingerprint(job):
+            changes.modified.append((job, diff(old, job)))
+    for id_, job in before.items():
+        if id_ not in seen and job.status != Classes.Job.ARCHIVED:
+            job.status = Classes.Job.ARCHIVED
+            changes.removed.append(job)
+    return changes
@@ -1,11 +1,18 @@
 import re
+import sys
+import weakref
+from functools import lru_cache
+
+_DEFAULT = object()  # stands in for an argument that wasn't passed so each object gets its own fresh default
 
 
 class Address:
     """
     Store a UK address passed as postcode and street etc. parts
     """
+    __slots__ = ("street", "postcode")
     POSTCODE_REGEXP = r'[A-Z]{1,2}[\dR][\dA-Z]? [\d][A-Z]{2}'
+    POSTCODE_PATTERN = re.compile(POSTCODE_REGEXP)
 
     def __init__(self, street=None, postcode=""):
         """
@@ -25,7 +32,7 @@ class Address:
         """
         try:
             postcode = postcode.upper()  # catches non string postcodes as well
-            return re.fullmatch(Address.POSTCODE_REGEXP, postcode)[0]
+            return Address.POSTCODE_PATTERN.fullmatch(postcode)[0]
         except (AttributeError, TypeError):
             return None
 
@@ -41,16 +48,17 @@ class Appointment:
     """
     Store appointment date and time in 24h format
     """
+    __slots__ = ("address", "date")
 
     TIME_FORMAT = "%a %d %b @ %H:%M"  # datetime formatting Ddd dd Mmm @ HH:MM
 
-    def __init__(self, address=Address(None), dtime=None):
+    def __init__(self, address=_DEFAULT, dtime=None):
         """
-        :param address: Address object
+        :param address: Address object. Defaults to a new empty Address
         :param dtime:   Datetime object
         """
 
-        self.address = address
+        self.address = Address(None) if address is _DEFAULT else address
         self.date = dtime
 
     def __str__(self):
@@ -64,6 +72,94 @@ class Appointment:
             return "TBA"
 
 
+# (space delimited format, regexp of the digits) for every UK number layout.
+# Where several formats match a number the last one listed is the most specific and is the one used
+TEL_FORMATS = [
+        ("01### ##### ", r"01\d{8}"),
+        ("01### ### ###", r"01\d{9}"),
+        ("011# ### ####", r"011\d{8}"),
+        ("01#1 ### ####", r"01\d1\d{7}"),
+        ("013397 #####", r"013397\d{5}"),
+        ("013398 #####", r"013398\d{5}"),
+        ("013873 #####", r"013873\d{5}"),
+        ("015242 #####", r"015242\d{5}"),
+        ("015394 #####", r"015394\d{5}"),
+        ("015395 #####", r"015395\d{5}"),
+        ("015396 #####", r"015396\d{5}"),
+        ("016973 #####", r"016973\d{5}"),
+        ("016974 #####", r"016974\d{5}"),
+        ("016977 #### ", r"016977\d{4}"),
+        ("016977 #####", r"016977\d{5}"),
+        ("017683 #####", r"017683\d{5}"),
+        ("017684 #####", r"017684\d{5}"),
+        ("017687 #####", r"017687\d{5}"),
+        ("019467 #####", r"019467\d{5}"),
+        ("019755 #####", r"019755\d{5}"),
+        ("019756 #####", r"019756\d{5}"),
+        ("02# #### ####", r"02\d{9}"),
+        ("03## ### ####", r"03\d{9}"),
+        ("05### ### ###", r"05\d{9}"),
+        ("07### ### ###", r"07\d{9}")
+]
+TEL_CACHE_SIZE = 4096  # distinct phone numbers remembered by Client.validate_tel
+
+
+def _tel_table(formats):
+    r"""
+    Turn TEL_FORMATS into a lookup on the number of digits.
+    Each regexp is literal digits and \d{n} runs so it reduces to a mask of its leading digits, "?" standing for any
+    digit e.g. 01\d1\d{7} -> "01?1". Only those leading digits need checking once the length is known.
+    :param formats : list [(format, regexp)]
+    :return dict {int number of digits : [(mask, format)]} most specific format first
+    """
+    table = {}
+    for fmt, regexp in formats:
+        mask = re.sub(r"\\d(?:\{(\d+)\})?", lambda m: "?" * int(m.group(1) or 1), regexp)
+        table.setdefault(len(mask), []).insert(0, (mask.rstrip("?"), fmt))
+    return table
+
+
+TEL_TABLE = _tel_table(TEL_FORMATS)
+
+
+def _tel_format(tel):
+    """
+    :param tel : string of digits
+    :return string format from TEL_FORMATS or None if tel is not a UK phone number
+    """
+    if not tel.isdecimal():
+        return None
+    for mask, fmt in TEL_TABLE.get(len(tel), ()):
+        if all(m == "?" or m == d for m, d in zip(mask, tel)):
+            return fmt
+    return None
+
+
+@lru_cache(maxsize=None)
+def _tel_groups(template):
+    """
+    :param template : string format from TEL_FORMATS
+    :return tuple of int digits in each space separated group
+    """
+    return tuple(len(group) for group in template.split())
+
+
+def _validate_tel(tel):
+    """
+    See Client.validate_tel
+    :param tel : string
+    :return string or None
+    """
+    try:
+        tel_digits, tel_format = Client.__get_tel_format__(tel)
+        return Client.__format_tel__(tel_digits, tel_format)
+    except TypeError:
+        return None
+
+
+_validate_tel_cached = lru_cache(maxsize=TEL_CACHE_SIZE)(_validate_tel)
+
+
 class Client:
     """
     Stores contact details for clients.
@@ -71,6 +167,7 @@ class Client:
     If so, then separate Scraper & Parser objects must be created along with a ConfigXX file (XX denotes the client).
     These allow parsing of the jobs into Job objects (defined below) for saving to the database.
     """
+    __slots__ = ("name_1", "name_2", "phone_1", "phone_2", "phone_3", "notes")
 
     def __init__(self, name_1=None, name_2=None, phone_1=None, phone_2=None, phone_3=None, notes=None):
         """
@@ -93,11 +190,19 @@ class Client:
         """ Check tel is a valid UK phone number and return correctly formatted version or None
         :param tel : string
         :return string or None"""
-        try:
-            tel_digits, tel_format = self.__get_tel_format__(tel)
-            return self.__format_tel__(tel_digits, tel_format)
-        except TypeError:
-            return None
+        if isinstance(tel, str):
+            return _validate_tel_cached(tel)  # the same agent numbers turn up on hundreds of jobs
+        return _validate_tel(tel)
+
+    @staticmethod
+    def validate_tels(tels):
+        """
+        Batch version of validate_tel for bulk imports.
+        :param tels : iterable of strings
+        :return list of string or None, one per tel
+        """
+        validate = _validate_tel_cached
+        return [validate(tel) if isinstance(tel, str) else _validate_tel(tel) for tel in tels]
 
     @staticmethod
     def __get_tel_format__(tel):
@@ -109,49 +214,12 @@ class Client:
         :param tel: string
         :return: string , string
         """
-        tel_formats = [
-                ("01### ##### ", "01\d{8}"),
-                ("01### ### ###", "01\d{9}"),
-                ("011# ### ####", "011\d{8}"),
-                ("01#1 ### ####", "01\d1\d{7}"),
-                ("013397 #####", "013397\d{5}"),
-                ("013398 #####", "013398\d{5}"),
-                ("013873 #####", "013873\d{5}"),
-                ("015242 #####", "015242\d{5}"),
-                ("015394 #####", "015394\d{5}"),
-                ("015395 #####", "015395\d{5}"),
-                ("015396 #####", "015396\d{5}"),
-                ("016973 #####", "016973\d{5}"),
-                ("016974 #####", "016974\d{5}"),
-                ("016977 #### ", "016977\d{4}"),
-                ("016977 #####", "016977\d{5}"),
-                ("017683 #####", "017683\d{5}"),
-                ("017684 #####", "017684\d{5}"),
-                ("017687 #####", "017687\d{5}"),
-                ("019467 #####", "019467\d{5}"),
-                ("019755 #####", "019755\d{5}"),
-                ("019756 #####", "019756\d{5}"),
-                ("02# #### ####", "02\d{9}"),
-                ("03## ### ####", "03\d{9}"),
-                ("05### ### ###", "05\d{9}"),
-                ("07### ### ###", "07\d{9}")
-        ]
-
         try:
             # strip non digits
             tel = "".join([n for n in tel if n.isdigit()])
         except TypeError:
             return None
-
-        tel_format = None
-        # compare regexp in tel_formats with tel
-        for fmt, regexp in tel_formats:  # search them all because the last match is the one we want
-            try:
-                tel = re.fullmatch(regexp, tel)[0]
-                tel_format = fmt
-            except (TypeError, AttributeError):
-                continue  # loop if no match
-        return tel, tel_format
+        return tel, _tel_format(tel)
 
     @staticmethod
     def __format_tel__(phone, template):
@@ -166,11 +234,13 @@ class Client:
             assert isinstance(phone, str) and isinstance(template, str)
         except AssertionError:
             return None  # not a valid UK phone number
-        # cast phone to a list
-        phone = list(phone)
-        # build correctly formatted phone by popping first select_drop if matching template character is non blank
-        # strip any whitespace
-        return "".join([phone.pop(0) if c != " " else " " for c in template]).strip()
+        # cut phone into the digit groups of the template
+        groups = []
+        start = 0
+        for size in _tel_groups(template):
+            groups.append(phone[start:start + size])
+            start += size
+        return " ".join(groups)
 
     def __str__(self):
         name1 = f"Primary contact:   {self.name_1:30.40}" if self.name_1 else ""
@@ -186,11 +256,17 @@ class Client:
 
 
 class Vendor(Client):
+    __slots__ = ()
+
     def __init__(self, name_1=None, name_2=None, phone_1=None, phone_2=None, phone_3=None, notes=None):
         super().__init__(name_1, name_2, phone_1, phone_2, phone_3, notes)
         
 
 class Agent(Client):
+    __slots__ = ("address", "branch", "__weakref__")
+
+    _interned = weakref.WeakValueDictionary()  # {agent details : Agent} for every interned Agent still in use
+
     def __init__(self, name_1=None, name_2=None, phone_1=None, phone_2=None, phone_3=None, notes=None, address=None,
                  branch=None):
         """
@@ -207,6 +283,28 @@ class Agent(Client):
         self.address = address
         self.branch = branch
 
+    @classmethod
+    def interned(cls, **kwargs):
+        """
+        Make an Agent and share it with every other job that has exactly the same agent details.
+        The same branch turns up on hundreds of jobs so this keeps one copy of it in memory. Don't modify the result.
+        :param kwargs : as Agent.__init__
+        :return Agent object
+        """
+        return cls.intern(cls(**kwargs))
+
+    @classmethod
+    def intern(cls, agent):
+        """
+        As interned but for an Agent that already exists, e.g. one unpickled from a parse worker process.
+        :param agent : Agent object
+        :return Agent object shared by every job with the same agent details
+        """
+        address = agent.address
+        key = (agent.name_1, agent.name_2, agent.phone_1, agent.phone_2, agent.phone_3, agent.notes, agent.branch,
+               None if address is None else (address.street, address.postcode))
+        return cls._interned.setdefault(key, agent)
+
     def __str__(self):
         branch = f"Branch:\n{self.branch}" if self.branch else ""
         address = f"\nAddress:\n{self.address}" if self.address else ""
@@ -226,17 +324,20 @@ class Job:
     The local folder where taken photos are stored  (os.path object)
     The job status (active / archived)
     """
+    __slots__ = ("id", "client", "agent", "vendor", "appointment", "property_type", "beds", "notes", "floorplan",
+                 "photos", "folder", "specific_reqs", "status", "system_notes")
+
     ACTIVE = 1
     ARCHIVED = 0
 
-    def __init__(self, id_=None, client=Client(None), agent=Agent(None), vendor=None, beds=None, property_type=None,
-                 appointment=Appointment(address=Address(None)), folder=None, notes=None, floorplan=True, photos=0,
-                 specific_reqs=None, system_notes=None):
+    def __init__(self, id_=None, client=_DEFAULT, agent=_DEFAULT, vendor=None, beds=None, property_type=None,
+                 appointment=_DEFAULT, folder=None, notes=None, floorplan=True, photos=0, specific_reqs=None,
+                 system_notes=None):
         """
         :param id_:            string
-        :param client:         Client object
-        :param agent:          Agent object
-        :param appointment:    Appointment object consisting of Address object and time
+        :param client:         Client object or string ConfigXX.CLIENT. Defaults to a new empty Client
+        :param agent:          Agent object. Defaults to a new empty Agent
+        :param appointment:    Appointment object consisting of Address object and time. Defaults to a new empty one
         :param folder:         os.path object
         :param: floorplan:     boolean
         :param: photos:        int
@@ -244,11 +345,13 @@ class Job:
 
         """
         self.id = id_
-        self.client = client
-        self.agent = agent
+        if client is _DEFAULT:
+            client = Client(None)
+        self.client = sys.intern(client) if isinstance(client, str) else client  # one copy of each client name
+        self.agent = Agent(None) if agent is _DEFAULT else agent
         self.vendor = vendor
-        self.appointment = appointment
-        self.property_type = property_type
+        self.appointment = Appointment(address=Address(None)) if appointment is _DEFAULT else appointment
+        self.property_type = sys.intern(property_type) if isinstance(property_type, str) else property_type
         self.beds = beds
         self.notes = notes
         self.floorplan = floorplan
@@ -280,6 +383,13 @@ class Job:
         self.appointment.address.postcode = add.postcode
         return self.appointment.address.street and self.appointment.address.postcode
 
+    def client_name(self):
+        """
+        Name of the client the job came from, whether it is held as a ConfigXX.CLIENT string or a Client object.
+        :return string or None
+        """
+        return self.client if self.client is None or isinstance(self.client, str) else self.client.name_1
+
     def __str__(self):
         """ String representation of Job."""
         try:
@@ -1,4 +1,7 @@
-from EstateAgent import pw
+try:
+    from EstateAgent import pw
+except ImportError:  # pw.py holds the logon details and isn't in the repository
+    pw = None
 
 """Configuration file containing complete specifications for accessing a client's webpage to enable
 scraping of job related data
@@ -13,13 +16,15 @@ CHROME_DRIVER = "/usr/bin/chromedriver" #  "C:/Python36/selenium/webdriver/chrom
 # -------------------------------------------------------------------------------------------------------------------- #
 
 CLIENT = "House Simple"
-USERNAME = pw.USERNAME
-PASSWORD = pw.PASSWORD
+USERNAME = getattr(pw, "USERNAME", None)
+PASSWORD = getattr(pw, "PASSWORD", None)
 LOGIN_PAGE = "https://www.housesimple.com/admin/dashboard"
 LANDING_PAGE = "https://www.housesimple.com/admin/dashboard"
 USERNAME_FIELD = "_username"
 PASSWORD_FIELD = "_password"
 LOGIN_BUTTON = "_submit"
+JOB_PAGE_FETCH = "GET"  # Fetchers.HttpFetcher reads the plain job page hrefs
+JOB_LINK_POSITIONAL = False  # job links carry the home visit id
 
 # -------------------------------------------------------------------------------------------------------------------- #
 # -------------------------------------------------------------------------------------------------------------------- #
@@ -50,6 +55,31 @@ JOB_PAGE_TABLES = {
 JOB_PAGE_BUTTONS = {}
 UPLOAD_PAGE_BUTTONS = {}
 
+# -------------------------------------------------------------------------------------------------------------------- #
+# -------------------------------------------------------------------------------------------------------------------- #
+# --------------------------------------          PAGE READINESS             ----------------------------------------- #
+# -------------------------------------------------------------------------------------------------------------------- #
+# -------------------------------------------------------------------------------------------------------------------- #
+
+# elements Waits.PageReadiness looks for before a page is read {page : {REQUIRED|OPTIONAL : [(locator strategy, value)]}}
+# REQUIRED elements are waited for. OPTIONAL elements are only checked once the page is ready and are never waited for
+PAGE_READY = {
+        "LOGIN_PAGE":   {
+                "REQUIRED": [("name", USERNAME_FIELD), ("name", PASSWORD_FIELD), ("name", LOGIN_BUTTON)],
+                "OPTIONAL": []
+        },
+        "LANDING_PAGE": {
+                "REQUIRED": [],
+                "OPTIONAL": [("tag name", "table")]  # no table when there are no home visits
+        },
+        "JOB_PAGE":     {
+                # the dashboard has a table too so wait for the home visit's Reference key
+                "REQUIRED": [("xpath",
+                              f"//table//*[self::td or self::th][normalize-space()='{JOB_PAGE_DATA['ID']}']")],
+                "OPTIONAL": []
+        }
+}
+
 # -------------------------------------------------------------------------------------------------------------------- #
 # -------------------------------------------------------------------------------------------------------------------- #
 # --------------------------------------          CLIENT SPECIFIC            ----------------------------------------- #
@@ -1,4 +1,7 @@
-from EstateAgent import pw
+try:
+    from EstateAgent import pw
+except ImportError:  # pw.py holds the logon details and isn't in the repository
+    pw = None
 
 """Configuration file containing complete specifications for accessing a client's webpage to enable
 scraping of job related data
@@ -15,14 +18,16 @@ CHROME_DRIVER = '/usr/bin/chromedriver'# "C:/Python36/selenium/webdriver/chrome/
 # -------------------------------------------------------------------------------------------------------------------- #
 
 CLIENT = "KeyAGENT"
-USERNAME = pw.USERNAME
-PASSWORD = pw.PASSWORD
+USERNAME = getattr(pw, "USERNAME", None)
+PASSWORD = getattr(pw, "PASSWORD", None)
 LOGIN_PAGE = "https://www.keyagent-portal.co.uk"
 LANDING_PAGE = "https://www.keyagent-portal.co.uk/Site/Dea/home.aspx?Dea=272ca14b-8535-453f-bf30-10e5c0318651&TAB" \
                "=MYHOME"
 USERNAME_FIELD = "ctl00$main$HipPlatformLogin$Username"
 PASSWORD_FIELD = "ctl00$main$HipPlatformLogin$Password"
 LOGIN_BUTTON = "ctl00$main$HipPlatformLogin$Button1"
+JOB_PAGE_FETCH = "POSTBACK"  # Fetchers.HttpFetcher replays the javascript:__doPostBack() job links
+JOB_LINK_POSITIONAL = True  # job links select a row by its position so Cache.JobCache keys rows by their text
 
 # -------------------------------------------------------------------------------------------------------------------- #
 # -------------------------------------------------------------------------------------------------------------------- #
@@ -41,6 +46,11 @@ REGEXP = {
         "PHONE_EVE":     r"(?:EVE:)(\D*\d{3,12}\D*\d{1,4}\D*\d{1,4})(?:\D*Email)",  # matches Vendor EVE phone no.
         "PHOTO_COUNT":   r"(?:\D*)(\d+)\D*(?:photos)",  # matches number of photos required for job
 }
+# REGEXP keys read from the same scraped field. Parsers.ExtractionPlan pulls them out together in one call
+REGEXP_SOURCES = {
+        "JOB_DATA_AGENT":  ["PHONE_1", "AGENT_MOB", "PHONE_EVE"],
+        "JOB_DATA_VENDOR": ["VENDOR", "PHONE_DAY", "VENDOR_MOB", "PHONE_EVE"]
+}
 
 # -------------------------------------------------------------------------------------------------------------------- #
 # -------------------------------------------------------------------------------------------------------------------- #
@@ -98,6 +108,37 @@ UPLOAD_PAGE_BUTTONS = {
         "UPLOAD_CLOSE":            "ButtonClose",
 }
 
+# -------------------------------------------------------------------------------------------------------------------- #
+# -------------------------------------------------------------------------------------------------------------------- #
+# --------------------------------------          PAGE READINESS             ----------------------------------------- #
+# -------------------------------------------------------------------------------------------------------------------- #
+# -------------------------------------------------------------------------------------------------------------------- #
+
+# elements Waits.PageReadiness looks for before a page is read {page : {REQUIRED|OPTIONAL : [(locator strategy, value)]}}
+# REQUIRED elements are waited for. OPTIONAL elements are only checked once the page is ready and are never waited for
+JOB_PAGE_REQUIRED = ("JOB_DATA_ID", "JOB_DATA_APPOINTMENT", "JOB_DATA_APPOINTMENT_ADDRESS")  # on every job page
+JOB_PAGE_BUTTONS_REQUIRED = ("JOB_CHANGE_APPT", "JOB_BACK")  # on every job page
+PAGE_READY = {
+        "LOGIN_PAGE":       {
+                "REQUIRED": [("name", USERNAME_FIELD), ("name", PASSWORD_FIELD), ("name", LOGIN_BUTTON)],
+                "OPTIONAL": []
+        },
+        "LANDING_PAGE":     {
+                "REQUIRED": [],
+                "OPTIONAL": [("id", "ctl00_text_GridViewOutstandingCases")]  # not shown when there are no jobs
+        },
+        "JOB_PAGE":         {
+                "REQUIRED": [("id", JOB_PAGE_DATA[key]) for key in JOB_PAGE_REQUIRED],
+                "OPTIONAL": [("id", value) for key, value in JOB_PAGE_DATA.items() if key not in JOB_PAGE_REQUIRED] +
+                            [("id", value) for value in JOB_PAGE_TABLES.values()]
+        },
+        "JOB_PAGE_BUTTONS": {
+                "REQUIRED": [("id", JOB_PAGE_BUTTONS[key]) for key in JOB_PAGE_BUTTONS_REQUIRED],
+                "OPTIONAL": [("id", value) for key, value in JOB_PAGE_BUTTONS.items() if
+                             key not in JOB_PAGE_BUTTONS_REQUIRED]
+        }
+}
+
 # -------------------------------------------------------------------------------------------------------------------- #
 # -------------------------------------------------------------------------------------------------------------------- #
 # --------------------------------------          CLIENT SPECIFIC            ----------------------------------------- #
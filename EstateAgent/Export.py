@@ -0,0 +1,182 @@
+"""Stream Jobs out to JSON Lines, CSV and pandas/Parquet.
+Every writer takes any iterable of Jobs (a list, JobStore.load_jobs or a Scraper.iter_jobs generator) and holds at
+most one chunk of rows at a time, so exporting years of job history doesn't build it all in memory first.
+"""
+import contextlib
+import csv
+import json
+import os
+
+CHUNK_SIZE = 10000  # rows per DataFrame / Parquet row group
+
+# Flattening rules, one column per entry:
+#   agent_* and vendor_* are the Client fields, None where the job has no agent or vendor
+#   appointment is the appointment datetime, street and postcode its Address
+#   notes is the list of note strings, specific_reqs the {requirement : quantity} dict and system_notes the list of
+#   [date, author, note] rows. JSON Lines keeps them as JSON lists/objects, CSV and DataFrames hold them JSON encoded
+COLUMNS = ("id", "client", "status", "agent_branch", "agent_name_1", "agent_name_2", "agent_phone_1", "agent_phone_2",
+           "agent_phone_3", "vendor_name_1", "vendor_name_2", "vendor_phone_1", "vendor_phone_2", "vendor_phone_3",
+           "vendor_notes", "appointment", "street", "postcode", "property_type", "beds", "folder", "floorplan",
+           "photos", "notes", "specific_reqs", "system_notes")
+ENCODED = ("notes", "specific_reqs", "system_notes")  # columns written as JSON strings in CSV and DataFrames
+DTYPES = {"status": "int64", "floorplan": "bool", "photos": "int64"}  # columns not listed hold strings or None
+PERSON_FIELDS = ("name_1", "name_2", "phone_1", "phone_2", "phone_3")
+
+
+def flatten_job(job):
+    """
+    Flatten a Job into one row following the rules above COLUMNS.
+    :param job : Job object
+    :return dict {column : value}
+    """
+    agent, vendor = job.agent, job.vendor
+    appointment = job.appointment
+    address = appointment.address if appointment is not None else None
+    row = {"id": job.id, "client": job.client_name(), "status": job.status, "agent_branch": getattr(agent, "branch", None)}
+    for field in PERSON_FIELDS:
+        row["agent_" + field] = getattr(agent, field, None)
+    for field in PERSON_FIELDS:
+        row["vendor_" + field] = getattr(vendor, field, None)
+    row["vendor_notes"] = getattr(vendor, "notes", None)
+    row["appointment"] = appointment.date if appointment is not None else None
+    row["street"] = getattr(address, "street", None)
+    row["postcode"] = getattr(address, "postcode", None)
+    row["property_type"] = job.property_type
+    row["beds"] = None if job.beds is None else str(job.beds)
+    row["folder"] = job.folder
+    row["floorplan"] = bool(job.floorplan)
+    row["photos"] = job.photos
+    row["notes"] = list(job.notes or [])
+    row["specific_reqs"] = dict(job.specific_reqs or {})
+    row["system_notes"] = [list(note) for note in job.system_notes or []]
+    return row
+
+
+def _encode(row):
+    """
+    :param row : dict from flatten_job
+    :return dict with the ENCODED columns as JSON strings and the appointment as an ISO string
+    """
+    for column in ENCODED:
+        row[column] = json.dumps(row[column])
+    if row["appointment"] is not None:
+        row["appointment"] = row["appointment"].isoformat(sep=" ")
+    return row
+
+
+@contextlib.contextmanager
+def _open(target, newline=None):
+    """
+    :param target : path to write to or an open text file, which is left open
+    :return context manager giving a text file
+    """
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, "w", encoding="utf-8", newline=newline) as file:
+            yield file
+    else:
+        yield target
+
+
+def write_jsonl(jobs, target):
+    """
+    Write one JSON object per job per line.
+    :param jobs   : iterable of Job objects
+    :param target : path or open text file
+    :return int number of jobs written
+    """
+    count = 0
+    with _open(target) as file:
+        for job in jobs:
+            row = flatten_job(job)
+            if row["appointment"] is not None:
+                row["appointment"] = row["appointment"].isoformat(sep=" ")
+            file.write(json.dumps(row) + "\n")
+            count += 1
+    return count
+
+
+def write_csv(jobs, target):
+    """
+    Write jobs as CSV with a header row of COLUMNS.
+    :param jobs   : iterable of Job objects
+    :param target : path or open text file (opened with newline="")
+    :return int number of jobs written
+    """
+    count = 0
+    with _open(target, newline="") as file:
+        writer = csv.DictWriter(file, COLUMNS)
+        writer.writeheader()
+        for job in jobs:
+            writer.writerow(_encode(flatten_job(job)))
+            count += 1
+    return count
+
+
+def iter_frames(jobs, chunk_size=CHUNK_SIZE):
+    """
+    Typed pandas DataFrames of jobs, chunk_size rows at a time.
+    Columns are COLUMNS with DTYPES, appointment as datetime64 and everything else as strings.
+    :param jobs       : iterable of Job objects
+    :param chunk_size : int rows per DataFrame
+    :return generator of DataFrames
+    """
+    import pandas as pd
+    rows = []
+    for job in jobs:
+        rows.append(_encode(flatten_job(job)))
+        if len(rows) >= chunk_size:
+            yield _frame(pd, rows)
+            rows = []
+    if rows:
+        yield _frame(pd, rows)
+
+
+def _frame(pd, rows):
+    """
+    :param pd   : pandas module
+    :param rows : list of encoded rows
+    :return DataFrame
+    """
+    frame = pd.DataFrame.from_records(rows, columns=COLUMNS)
+    frame["appointment"] = pd.to_datetime(frame["appointment"])
+    return frame.astype(DTYPES)
+
+
+def to_frame(jobs):
+    """
+    :param jobs : iterable of Job objects
+    :return one typed DataFrame of every job. Use iter_frames for long histories
+    """
+    import pandas as pd
+    frames = list(iter_frames(jobs))
+    if not frames:
+        return pd.DataFrame(columns=COLUMNS).astype(DTYPES)
+    return pd.concat(frames, ignore_index=True)
+
+
+def write_parquet(jobs, path, chunk_size=CHUNK_SIZE):
+    """
+    Write jobs to a Parquet file one row group per chunk. Needs pandas and pyarrow.
+    :param jobs       : iterable of Job objects
+    :param path       : string file path
+    :param chunk_size : int rows per row group
+    :return int number of jobs written
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    # fixed up front so a chunk whose column happens to be all None still matches the others
+    types = {"status": pa.int64(), "floorplan": pa.bool_(), "photos": pa.int64(), "appointment": pa.timestamp("ns")}
+    schema = pa.schema([(column, types.get(column, pa.string())) for column in COLUMNS])
+    count = 0
+    writer = None
+    try:
+        for frame in iter_frames(jobs, chunk_size):
+            table = pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, schema)
+            writer.write_table(table)
+            count += len(frame)
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
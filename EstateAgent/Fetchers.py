@@ -0,0 +1,123 @@
+import re
+import threading
+from urllib.parse import urljoin
+
+import requests
+from bs4 import BeautifulSoup
+
+POSTBACK_REGEXP = r"__doPostBack\('([^']*)','([^']*)'\)"  # matches target and argument of an ASP.NET postback link
+
+
+class FetchError(Exception):
+    """
+    Raised when a job page cannot be fetched over HTTP and the caller should fall back to Selenium.
+    """
+
+
+class HttpFetcher:
+    """
+    Fetch job pages without a browser.
+    The cookies of a logged on Selenium webdriver are copied into keep-alive requests.Sessions so job pages can be
+    read directly from the server:
+    GET the href for sites that link straight to job pages (ConfigXX.JOB_PAGE_FETCH = "GET")
+    replay the __doPostBack form post for ASP.NET sites (ConfigXX.JOB_PAGE_FETCH = "POSTBACK")
+    A requests.Session isn't safe to share between threads so each pool or capture thread gets its own.
+    """
+
+    TIMEOUT = 30  # seconds
+
+    def __init__(self, config, driver, pool_size=10):
+        """
+        :param config    : ConfigXX file tailored to each config
+        :param driver    : logged on Selenium webdriver sitting on the landing page
+        :param pool_size : int max number of kept alive connections per thread
+        :return: None
+        """
+        self.config = config
+        self.method = config.JOB_PAGE_FETCH
+        self.pool_size = pool_size
+        # look like the browser that logged on
+        self.user_agent = driver.execute_script("return navigator.userAgent")
+        self.cookies = driver.get_cookies()
+        self.page_url = driver.current_url  # postbacks are posted back to the page they came from
+        self.form = self._read_form(driver.page_source)
+        self._local = threading.local()  # .session, the calling thread's requests.Session
+        self._sessions = []  # every thread's session, for close()
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """
+        :return requests.Session of the calling thread, made the first time the thread fetches a page
+        """
+        try:
+            return self._local.session
+        except AttributeError:
+            pass
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["User-Agent"] = self.user_agent
+        for cookie in self.cookies:
+            session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"),
+                                path=cookie.get("path", "/"))
+        with self._lock:
+            self._sessions.append(session)
+        self._local.session = session
+        return session
+
+    @staticmethod
+    def _read_form(html):
+        """
+        Read the hidden form fields (__VIEWSTATE, __EVENTVALIDATION etc.) that ASP.NET needs to accept a postback.
+        :param html : string page source
+        :return dict {field name : value}
+        """
+        soup = BeautifulSoup(html, 'lxml')
+        return {tag["name"]: tag.get("value", "") for tag in soup.find_all("input", type="hidden") if tag.get("name")}
+
+    def fetch(self, link):
+        """
+        Fetch the job page pointed to by link.
+        :param link : BeautifulSoup.Tag pointing to job page
+        :return string : html of the job page
+        :raise FetchError if the page could not be fetched or the session has been logged out
+        """
+        href = link["href"]
+        try:
+            if self.method == "POSTBACK":
+                response = self._post_back(href)
+            else:
+                response = self.session.get(urljoin(self.page_url, href), timeout=HttpFetcher.TIMEOUT)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            raise FetchError(f"{href}: {e}") from e
+        # a logon form means the cookies were not accepted
+        if f'name="{self.config.USERNAME_FIELD}"' in response.text:
+            raise FetchError(f"{href}: session not authenticated")
+        return response.text
+
+    def _post_back(self, href):
+        """
+        Replay a javascript:__doPostBack('target','argument') link as a form post.
+        :param href : string
+        :return requests.Response
+        """
+        try:
+            target, argument = re.search(POSTBACK_REGEXP, href).groups()
+        except AttributeError:
+            raise FetchError(f"{href}: not a postback link")
+        data = dict(self.form, __EVENTTARGET=target, __EVENTARGUMENT=argument)
+        return self.session.post(self.page_url, data=data, timeout=HttpFetcher.TIMEOUT)
+
+    def close(self):
+        """
+        Close every thread's pooled connections.
+        :return None
+        """
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._local = threading.local()
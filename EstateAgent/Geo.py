@@ -0,0 +1,308 @@
+"""Where jobs are: postcode centroids from a local file, a grid index for nearest job and radius queries, and
+ordering a day's appointments to cut down the driving.
+Distances are straight line km on a flat projection of the UK, close enough for deciding what is near what.
+"""
+import csv
+import math
+import os
+
+import numpy as np
+
+from EstateAgent import Classes
+
+POSTCODE_FILE = os.path.join(os.path.expanduser("~"), ".EstateAgent", "postcodes.csv")
+EARTH_RADIUS = 6371.0  # km
+REFERENCE_LATITUDE = 54.0  # middle of Great Britain, sets the east-west scale of the projection
+POINTS_PER_CELL = 4  # grid cells are sized so each holds about this many points on average
+
+
+def normalise_postcode(postcode):
+    """
+    :param postcode : string in any case and spacing e.g. "mk44fy"
+    :return string as Address stores it e.g. "MK4 4FY"
+    """
+    postcode = "".join(postcode.split()).upper()
+    return f"{postcode[:-3]} {postcode[-3:]}"
+
+
+def load_centroids(path=POSTCODE_FILE, postcode="postcode", latitude="latitude", longitude="longitude"):
+    """
+    Read a CSV of postcode centroids, such as the ONS postcode directory, from disk. Rows without a position are
+    skipped.
+    :param path      : string file path
+    :param postcode  : string postcode column heading
+    :param latitude  : string latitude column heading
+    :param longitude : string longitude column heading
+    :return dict {postcode : (latitude, longitude)}
+    """
+    centroids = {}
+    with open(path, newline="", encoding="utf-8") as file:
+        for row in csv.DictReader(file):
+            try:
+                centroids[normalise_postcode(row[postcode])] = (float(row[latitude]), float(row[longitude]))
+            except ValueError:
+                continue  # blank or terminated postcode with no position
+    return centroids
+
+
+def project(latitude, longitude):
+    """
+    Flatten latitude / longitude onto a plane measured in km.
+    :param latitude  : float or numpy array of degrees
+    :param longitude : float or numpy array of degrees
+    :return numpy array [[x, y]] km
+    """
+    scale = EARTH_RADIUS * math.pi / 180
+    x = np.asarray(longitude, dtype=float) * scale * math.cos(math.radians(REFERENCE_LATITUDE))
+    y = np.asarray(latitude, dtype=float) * scale
+    return np.column_stack([np.atleast_1d(x), np.atleast_1d(y)])
+
+
+class GridIndex:
+    """
+    Points bucketed into square cells for nearest and radius queries.
+    The points are sorted by cell so each cell is one slice of the coordinate array. A query only measures the
+    points in the cells around it.
+    """
+
+    def __init__(self, points, cell_size=None):
+        """
+        :param points    : numpy array [[x, y]] km, as made by project
+        :param cell_size : float km or None to fit the cells to how spread out the points are
+        :return: None
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        if cell_size is None:
+            width, height = np.ptp(points, axis=0) if len(points) else (0, 0)
+            cell_size = max(math.sqrt(width * height * POINTS_PER_CELL / max(len(points), 1)), 0.1)
+        self.cell_size = cell_size
+        cells = np.floor(points / cell_size).astype(np.int64)
+        self.order = np.lexsort((cells[:, 1], cells[:, 0]))  # position in the original points of each sorted point
+        self.points = points[self.order]
+        cells = cells[self.order]
+        self.cells = {}  # {(cell x, cell y) : (start, end) slice of self.points}
+        if len(cells):
+            starts = np.flatnonzero(np.any(cells[1:] != cells[:-1], axis=1)) + 1
+            bounds = np.concatenate([[0], starts, [len(cells)]]).tolist()
+            for start, end in zip(bounds[:-1], bounds[1:]):
+                self.cells[(int(cells[start, 0]), int(cells[start, 1]))] = (start, end)
+            self.low, self.high = cells.min(axis=0), cells.max(axis=0)
+
+    def __len__(self):
+        return len(self.points)
+
+    def _gather(self, cells):
+        """
+        :param cells : iterable of (cell x, cell y)
+        :return numpy array of indexes into self.points
+        """
+        slices = [np.arange(*self.cells[cell]) for cell in cells if cell in self.cells]
+        return np.concatenate(slices) if slices else np.empty(0, dtype=np.int64)
+
+    def _measure(self, point, found):
+        """
+        :return original indexes and distances of found, nearest first
+        """
+        distances = np.hypot(*(self.points[found] - point).T)
+        nearest = np.argsort(distances, kind="stable")
+        return self.order[found[nearest]], distances[nearest]
+
+    def within(self, point, radius):
+        """
+        :param point  : (x, y) km
+        :param radius : float km
+        :return numpy arrays: indexes of the points within radius of point, their distances. Nearest first
+        """
+        if not self.cells:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        point = np.asarray(point, dtype=float)
+        low = np.floor((point - radius) / self.cell_size).astype(np.int64)
+        high = np.floor((point + radius) / self.cell_size).astype(np.int64)
+        if (high[0] - low[0] + 1) * (high[1] - low[1] + 1) > len(self.cells):  # radius takes in most of the grid
+            found = np.arange(len(self.points))
+        else:
+            found = self._gather((x, y) for x in range(low[0], high[0] + 1) for y in range(low[1], high[1] + 1))
+        indexes, distances = self._measure(point, found)
+        inside = distances <= radius
+        return indexes[inside], distances[inside]
+
+    def nearest(self, point, k=1):
+        """
+        :param point : (x, y) km
+        :param k     : int number of points wanted
+        :return numpy arrays: indexes of the k points nearest point, their distances. Nearest first
+        """
+        if not self.cells:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        point = np.asarray(point, dtype=float)
+        cx, cy = (int(c) for c in np.floor(point / self.cell_size))
+        # rings of cells nearer than first or further out than last hold no points
+        first = int(max(self.low[0] - cx, cx - self.high[0], self.low[1] - cy, cy - self.high[1], 0))
+        last = int(max(abs(cx - self.low[0]), abs(cx - self.high[0]), abs(cy - self.low[1]), abs(cy - self.high[1])))
+        found = []
+        ring = first
+        while True:
+            if ring == 0:
+                cells = [(cx, cy)]
+            else:
+                cells = [(x, y) for x in range(cx - ring, cx + ring + 1) for y in (cy - ring, cy + ring)]
+                cells += [(x, y) for x in (cx - ring, cx + ring) for y in range(cy - ring + 1, cy + ring)]
+            found.append(self._gather(cells))
+            if (2 * ring + 1) ** 2 > len(self.cells):  # sparse points far off: quicker to measure them all
+                found = [np.arange(len(self.points))]
+                break
+            # anything in a cell outside the rings searched is at least this far away
+            edge = min(point[0] - (cx - ring) * self.cell_size, (cx + ring + 1) * self.cell_size - point[0],
+                       point[1] - (cy - ring) * self.cell_size, (cy + ring + 1) * self.cell_size - point[1])
+            count = sum(len(f) for f in found)
+            if ring >= last or count >= k and self._kth(point, found, k) <= edge:
+                break
+            ring += 1
+        indexes, distances = self._measure(point, np.concatenate(found))
+        return indexes[:k], distances[:k]
+
+    def _kth(self, point, found, k):
+        """
+        :return float distance to the kth nearest of found
+        """
+        found = np.concatenate(found)
+        return np.partition(np.hypot(*(self.points[found] - point).T), k - 1)[k - 1]
+
+
+def order_route(points, start=None):
+    """
+    Order stops so the drive between them is short: nearest neighbour to get a route, then 2-opt to take out the
+    crossings.
+    :param points : numpy array [[x, y]] km of the stops
+    :param start  : (x, y) km to set off from or None to start at the first stop
+    :return list of indexes into points in visiting order
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if start is not None:
+        points = np.vstack([start, points])
+    n = len(points)
+    if n < 3:
+        return list(range(n - 1)) if start is not None else list(range(n))
+    distance = np.hypot(*(points[:, None, :] - points[None, :, :]).transpose(2, 0, 1)).tolist()
+
+    # nearest neighbour from the start
+    route = [0]
+    left = set(range(1, n))
+    while left:
+        here = distance[route[-1]]
+        stop = min(left, key=here.__getitem__)
+        route.append(stop)
+        left.remove(stop)
+
+    # 2-opt: reverse any stretch that shortens the route until none does. The start stays first, the end is open
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, n - 1):
+            for j in range(i + 1, n):
+                a, b, c = route[i - 1], route[i], route[j]
+                change = distance[a][c] - distance[a][b]
+                if j + 1 < n:
+                    d = route[j + 1]
+                    change += distance[b][d] - distance[c][d]
+                if change < -1e-9:
+                    route[i:j + 1] = reversed(route[i:j + 1])
+                    improved = True
+    if start is not None:
+        return [stop - 1 for stop in route[1:]]
+    return route
+
+
+class JobMap:
+    """
+    Active jobs placed at their appointment postcode's centroid.
+    Jobs whose postcode isn't in the centroid file are kept in JobMap.unplaced.
+    """
+
+    def __init__(self, jobs, centroids, cell_size=None):
+        """
+        :param jobs      : iterable of Job objects
+        :param centroids : dict {postcode : (latitude, longitude)} from load_centroids
+        :param cell_size : float km side of a grid cell or None to fit it to the jobs
+        :return: None
+        """
+        self.centroids = centroids
+        self.jobs = []
+        self.unplaced = []
+        positions = []
+        for job in jobs:
+            if job.status != Classes.Job.ACTIVE:
+                continue
+            position = self._centroid(job)
+            if position is None:
+                self.unplaced.append(job)
+            else:
+                self.jobs.append(job)
+                positions.append(position)
+        positions = np.array(positions, dtype=float).reshape(-1, 2)
+        self.points = project(positions[:, 0], positions[:, 1])
+        self.index = GridIndex(self.points, cell_size)
+
+    def _centroid(self, job):
+        """
+        :return (latitude, longitude) of the job's postcode or None
+        """
+        address = job.appointment.address if job.appointment is not None else None
+        postcode = getattr(address, "postcode", None)
+        return self.centroids.get(normalise_postcode(postcode)) if postcode else None
+
+    def locate(self, where):
+        """
+        :param where : Job, postcode string or (latitude, longitude)
+        :return numpy array (x, y) km
+        :raise KeyError if the postcode isn't known
+        """
+        if isinstance(where, Classes.Job):
+            where = self._centroid(where)
+            if where is None:
+                raise KeyError("job has no known postcode")
+        elif isinstance(where, str):
+            where = self.centroids[normalise_postcode(where)]
+        return project(*where)[0]
+
+    def nearest(self, where, k=5):
+        """
+        :param where : Job, postcode string or (latitude, longitude)
+        :param k     : int number of jobs wanted
+        :return list [(Job, km)] nearest first, not including where itself if it's a Job
+        """
+        extra = 1 if isinstance(where, Classes.Job) else 0
+        indexes, distances = self.index.nearest(self.locate(where), k + extra)
+        found = [(self.jobs[i], d) for i, d in zip(indexes.tolist(), distances.tolist()) if self.jobs[i] is not where]
+        return found[:k]
+
+    def within(self, where, radius):
+        """
+        :param where  : Job, postcode string or (latitude, longitude)
+        :param radius : float km
+        :return list [(Job, km)] nearest first, not including where itself if it's a Job
+        """
+        indexes, distances = self.index.within(self.locate(where), radius)
+        return [(self.jobs[i], d) for i, d in zip(indexes.tolist(), distances.tolist()) if self.jobs[i] is not where]
+
+    def route(self, jobs, start=None):
+        """
+        Order a day's appointments to keep the driving down. Jobs without a known postcode go on the end.
+        :param jobs  : iterable of Job objects e.g. Schedule.AppointmentIndex.on_day
+        :param start : postcode string or (latitude, longitude) to set off from, or None
+        :return list of Job objects in visiting order
+        """
+        placed, unplaced, positions = [], [], []
+        for job in jobs:
+            position = self._centroid(job)
+            if position is None:
+                unplaced.append(job)
+            else:
+                placed.append(job)
+                positions.append(position)
+        if not placed:
+            return unplaced
+        positions = np.array(positions, dtype=float)
+        points = project(positions[:, 0], positions[:, 1])
+        order = order_route(points, None if start is None else self.locate(start))
+        return [placed[i] for i in order] + unplaced
@@ -0,0 +1,324 @@
+"""Where a scrape's time went and what its pages were missing.
+A Scraper given a Metrics times every stage of every job into histograms:
+  run         : the whole scrape less the time the consumer of Scraper.iter_jobs spends on each Job
+  logon       : Scraper._logon, one per webdriver
+  page_source : reading the page source out of the browser
+  soup        : BeautifulSoup parse of the page source
+  job_links   : reading the job links from the landing page
+  job         : one job from clicking its link to its Job object, covering the stages below
+  capture     : getting a job page out of the site, covering click, fetch, page_source, fields with extract_js and back
+  click       : clicking through to a job page and waiting for it to be ready
+  fetch       : fetching a job page over HTTP instead
+  fields      : reading JOB_PAGE_DATA / JOB_PAGE_TABLES out of the soup, or out of the DOM with extract_js
+  back        : going back to the landing page
+  parse       : Parser.map_job
+  tables      : Tables reading the job page tables, part of parse
+and counts the fields it failed to read. Results are written as JSON or as Prometheus text for node_exporter's
+textfile collector. Scrapers without a Metrics use NULL, which records nothing and costs a method call per stage.
+"""
+import bisect
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)  # seconds, upper bounds
+PREFIX = "estateagent"  # of every Prometheus metric name
+PROMETHEUS_EXTENSIONS = (".prom",)  # files saved in Prometheus text format, anything else is JSON
+
+
+def _postcode(job):
+    address = getattr(job.appointment, "address", None)
+    return getattr(address, "postcode", None)
+
+
+# Job attributes a parser leaves as None when it couldn't read them {failure name : function Job -> value}
+JOB_FIELDS = {
+        "job.id":          lambda job: job.id,
+        "job.appointment": lambda job: getattr(job.appointment, "date", None),
+        "job.postcode":    _postcode
+}
+
+
+class Histogram:
+    """
+    Counts of observed durations in cumulative buckets, as Prometheus histograms hold them.
+    """
+
+    __slots__ = ("buckets", "counts", "count", "total", "max")
+
+    def __init__(self, buckets=BUCKETS):
+        """
+        :param buckets : sorted tuple of bucket upper bounds in seconds. A +Inf bucket is added on the end
+        :return: None
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # per bucket, not cumulative
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        """
+        :param seconds : float
+        :return None
+        """
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def merge(self, other):
+        """
+        Add in the observations of another histogram with the same buckets.
+        :param other : Histogram
+        :return None
+        """
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def cumulative(self):
+        """
+        :return list [(upper bound, count of observations no bigger)] ending with (inf, count)
+        """
+        counts, running = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            running += count
+            counts.append((bound, running))
+        return counts
+
+    def quantile(self, q):
+        """
+        Estimate a quantile by interpolating within its bucket, as Prometheus' histogram_quantile does.
+        :param q : float between 0 and 1
+        :return float seconds or None if nothing has been observed
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        lower, below = 0.0, 0
+        for bound, running in self.cumulative():
+            if running >= rank:
+                upper = min(bound, self.max)
+                inside = running - below
+                return lower + (upper - lower) * (rank - below) / inside if inside else upper
+            lower, below = bound, running
+        return self.max
+
+    def summary(self):
+        """
+        :return dict {count, total, mean, p50, p95, max} seconds
+        """
+        return {"count": self.count, "total": self.total, "mean": self.total / self.count if self.count else None,
+                "p50":   self.quantile(0.5), "p95": self.quantile(0.95), "max": self.max}
+
+
+class Metrics:
+    """
+    Stage timings and field failures of one scrape. Safe to record into from a pool of drivers.
+    """
+
+    def __init__(self, client=None, path=None, buckets=BUCKETS):
+        """
+        :param client  : string ConfigXX.CLIENT, added to every Prometheus metric as a label
+        :param path    : file save() writes to. Prometheus text if it ends in .prom, JSON otherwise
+        :param buckets : histogram bucket upper bounds in seconds
+        :return: None
+        """
+        self.client = client
+        self.path = path
+        self.buckets = buckets
+        self.stages = {}  # {stage : Histogram}
+        self.failures = {}  # {field : count of jobs it couldn't be read from}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # sent back from parse worker processes, the lock can't be pickled
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Time the body of a with statement. Stages that raise are timed as well.
+        :param name : string stage, see the module docstring
+        :return context manager
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def observe(self, name, seconds):
+        """
+        :param name    : string stage
+        :param seconds : float
+        :return None
+        """
+        with self._lock:
+            try:
+                histogram = self.stages[name]
+            except KeyError:
+                histogram = self.stages[name] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def failure(self, field, count=1):
+        """
+        :param field : string name of what couldn't be read
+        :param count : int
+        :return None
+        """
+        with self._lock:
+            self.failures[field] = self.failures.get(field, 0) + count
+
+    def merge(self, other):
+        """
+        Add in the stages and failures recorded by another Metrics, e.g. a parse worker process'.
+        :param other : Metrics
+        :return None
+        """
+        with self._lock:
+            for name, histogram in other.stages.items():
+                if name not in self.stages:
+                    self.stages[name] = Histogram(self.buckets)
+                self.stages[name].merge(histogram)
+            for field, count in other.failures.items():
+                self.failures[field] = self.failures.get(field, 0) + count
+
+    def fields(self, job_dict):
+        """
+        Count the page fields the scraper couldn't find.
+        :param job_dict : dict {ConfigXX.JOB_PAGE|DATA|TABLES key : scraped value} from Scraper._extract_page_fields
+        :return None
+        """
+        for key, value in job_dict.items():
+            if value is None:
+                self.failure(key)
+
+    def job(self, job):
+        """
+        Count the JOB_FIELDS the parser couldn't fill in.
+        :param job : Job object from Parser.map_job
+        :return None
+        """
+        for name, read in JOB_FIELDS.items():
+            if read(job) is None:
+                self.failure(name)
+
+    def summary(self):
+        """
+        :return dict {"client", "jobs", "seconds", "jobs_per_sec", "stages" : {stage : Histogram.summary()},
+                      "failures" : {field : count}}
+        """
+        with self._lock:
+            stages = {name: histogram.summary() for name, histogram in self.stages.items()}
+            failures = dict(self.failures)
+        jobs = stages.get("job", {}).get("count", 0)
+        seconds = stages.get("run", {}).get("total", 0.0)
+        return {"client": self.client, "jobs": jobs, "seconds": seconds,
+                "jobs_per_sec": jobs / seconds if seconds else None, "stages": stages, "failures": failures}
+
+    def to_json(self):
+        """
+        :return string JSON of the summary plus every histogram's cumulative bucket counts
+        """
+        summary = self.summary()
+        with self._lock:
+            for name, histogram in self.stages.items():
+                if name not in summary["stages"]:
+                    continue  # first timed since the summary was taken
+                summary["stages"][name]["buckets"] = [["+Inf" if bound == float("inf") else bound, count]
+                                                      for bound, count in histogram.cumulative()]
+        return json.dumps(summary, indent=2)
+
+    def to_prometheus(self):
+        """
+        :return string Prometheus text exposition format
+        """
+        client = f'client="{self.client}",' if self.client else ""
+        lines = [f"# HELP {PREFIX}_stage_seconds Time spent in each stage of a scrape",
+                 f"# TYPE {PREFIX}_stage_seconds histogram"]
+        with self._lock:
+            for name, histogram in sorted(self.stages.items()):
+                labels = f'{client}stage="{name}"'
+                for bound, count in histogram.cumulative():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{PREFIX}_stage_seconds_bucket{{{labels},le="{le}"}} {count}')
+                lines.append(f"{PREFIX}_stage_seconds_sum{{{labels}}} {histogram.total!r}")
+                lines.append(f"{PREFIX}_stage_seconds_count{{{labels}}} {histogram.count}")
+            lines += [f"# HELP {PREFIX}_field_failures_total Jobs a field couldn't be read from",
+                      f"# TYPE {PREFIX}_field_failures_total counter"]
+            lines += [f'{PREFIX}_field_failures_total{{{client}field="{field}"}} {count}'
+                      for field, count in sorted(self.failures.items())]
+        return "\n".join(lines) + "\n"
+
+    def save(self, path=None):
+        """
+        Write the metrics, replacing the file in one go so a collector never reads half of it.
+        :param path : file to write. Defaults to self.path, nothing is written if neither is set
+        :return None
+        """
+        path = path or self.path
+        if path is None:
+            return
+        text = self.to_prometheus() if path.endswith(PROMETHEUS_EXTENSIONS) else self.to_json()
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp, path)
+
+    def __str__(self):
+        summary = self.summary()
+        rate = f"{summary['jobs_per_sec']:.2f} jobs/s" if summary["jobs_per_sec"] else ""
+        lines = [f"{summary['client'] or ''} {summary['jobs']} jobs {summary['seconds']:.1f}s {rate}".strip()]
+        for name, stage in summary["stages"].items():
+            lines.append(f"  {name:12} {stage['count']:6} x mean {stage['mean'] * 1000:9.2f}ms   "
+                         f"p50 {stage['p50'] * 1000:9.2f}ms   p95 {stage['p95'] * 1000:9.2f}ms   "
+                         f"max {stage['max'] * 1000:9.2f}ms")
+        lines += [f"  failed to read {field}: {count}" for field, count in sorted(summary["failures"].items())]
+        return "\n".join(lines)
+
+
+class NullMetrics:
+    """
+    Stand-in for Metrics when timing is switched off. Every method does nothing and stage() hands back the same
+    reusable empty context manager.
+    """
+
+    _NOTHING = contextlib.nullcontext()
+
+    def stage(self, name):
+        return self._NOTHING
+
+    def observe(self, name, seconds):
+        pass
+
+    def failure(self, field, count=1):
+        pass
+
+    def merge(self, other):
+        pass
+
+    def fields(self, job_dict):
+        pass
+
+    def job(self, job):
+        pass
+
+    def save(self, path=None):
+        pass
+
+
+NULL = NullMetrics()
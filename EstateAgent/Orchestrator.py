@@ -0,0 +1,80 @@
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from EstateAgent import Scrapers, Store
+
+
+class ScrapeResult:
+    """
+    Outcome of scraping one client's site.
+    """
+
+    def __init__(self, client, jobs=None, seconds=0.0, error=None):
+        """
+        :param client  : string key of Scrapers.SCRAPERS
+        :param jobs    : list of Job objects scraped
+        :param seconds : float wall time taken
+        :param error   : string traceback if the scrape failed else None
+        """
+        self.client = client
+        self.jobs = jobs or []
+        self.seconds = seconds
+        self.error = error
+
+    def __str__(self):
+        status = "FAILED" if self.error else "OK"
+        return f"{self.client:20.20} {status:6} {len(self.jobs):4} jobs {self.seconds:8.1f}s"
+
+
+def _scrape(client, options):
+    """
+    Run one registered scraper. Runs in its own process so it gets its own driver(s).
+    Any failure is returned rather than raised so it can't block the other clients.
+    :param client  : string key of Scrapers.SCRAPERS
+    :param options : dict of Scraper options
+    :return ScrapeResult
+    """
+    start = time.perf_counter()
+    try:
+        # scrape_site quits the drivers however the scrape ends, see Scraper.iter_jobs
+        jobs = Scrapers.SCRAPERS[client](**options).scrape_site()
+        return ScrapeResult(client, jobs, time.perf_counter() - start)
+    except Exception:
+        return ScrapeResult(client, seconds=time.perf_counter() - start, error=traceback.format_exc())
+
+
+def scrape_all(clients=None, store=None, **options):
+    """
+    Scrape several client sites concurrently, one process per client.
+    :param clients : list of keys of Scrapers.SCRAPERS. Defaults to every registered scraper
+    :param store   : path of a Store.JobStore database. The merged jobs are upserted into it once every client has
+                     finished so the scraper processes never contend for the database
+    :param options : Scraper options passed to every scraper, see Scraper.__init__
+    :return list of Job objects from every client, list of ScrapeResult one per client
+    """
+    if clients is None:
+        clients = list(Scrapers.SCRAPERS)
+    results = []
+    with ProcessPoolExecutor(max_workers=max(1, len(clients))) as executor:
+        futures = [(client, executor.submit(_scrape, client, options)) for client in clients]
+        for client, future in futures:
+            try:
+                results.append(future.result())
+            except Exception:  # the worker process itself died
+                results.append(ScrapeResult(client, error=traceback.format_exc()))
+    jobs = [job for result in results for job in result.jobs]
+    if store is not None:
+        job_store = Store.JobStore(store)
+        job_store.upsert_jobs(jobs)
+        job_store.close()
+    return jobs, results
+
+
+if __name__ == '__main__':
+    all_jobs, all_results = scrape_all()
+    for result in all_results:
+        print(result)
+        if result.error:
+            print(result.error)
+    print(f"{len(all_jobs)} jobs in total")
@@ -1,9 +1,113 @@
 import datetime as dt
 import re
 
-import pandas as pd
+from EstateAgent import Classes, Metrics, Tables
 
-from EstateAgent import ConfigHS, ConfigKA, Classes
+# the ConfigXX files are imported when their parser is first instantiated so importing this module stays cheap
+
+
+def split_address(address):
+    """
+    Partition a full UK address into street address and postcode parts.
+    :param address : string
+    :return string street, string postcode or "" if there isn't one
+    """
+    # get valid postcode (first occurrence)
+    match = Classes.Address.POSTCODE_PATTERN.search(address)
+    postcode = match[0] if match else ""
+    # strip out postcode and any trailing spaces
+    street = address.replace(postcode, "").strip()
+    if street.endswith(","):
+        street = street.strip(",")  # poorly entered addresses can have extra commas
+    return street, postcode
+
+
+class ExtractionPlan:
+    """
+    ConfigXX.REGEXP compiled once per config and reused for every job.
+    Patterns that read the same scraped field are grouped by ConfigXX.REGEXP_SOURCES so one call pulls out every
+    field of that source. Each field is found exactly as a separate re.search would find it.
+    ConfigXX.JOB_PAGE_SITE_VISIT_ABBRS is applied to whole columns of the history table at a time.
+    """
+
+    SEPARATOR = "\n"  # joins the cells of a column. Table cells have their whitespace collapsed so never contain it
+
+    _plans = {}  # {config module name : ExtractionPlan}
+
+    def __init__(self, config):
+        """
+        :param config : ConfigXX file tailored to each config
+        :return: None
+        """
+        self.patterns = {name: re.compile(regexp) for name, regexp in getattr(config, "REGEXP", {}).items()}
+        # {JOB_PAGE_DATA key : [(REGEXP key, compiled pattern)]}
+        self.sources = {source: [(name, self.patterns[name]) for name in names]
+                        for source, names in getattr(config, "REGEXP_SOURCES", {}).items()}
+        self.unwanted = tuple(getattr(config, "UNWANTED_NOTES", []))  # a note is unwanted if it contains any of them
+        # applied in order: later abbreviations can match text made by earlier ones
+        self.abbreviations = list(getattr(config, "JOB_PAGE_SITE_VISIT_ABBRS", {}).items())
+        # a column can only be joined if no abbreviation could match or make a separator
+        self.joinable = all(jargon and self.SEPARATOR not in jargon + abbreviation
+                            for jargon, abbreviation in self.abbreviations)
+
+    @classmethod
+    def for_config(cls, config):
+        """
+        :param config : ConfigXX file tailored to each config
+        :return ExtractionPlan compiled the first time the config is used
+        """
+        try:
+            return cls._plans[config.__name__]
+        except KeyError:
+            plan = cls._plans[config.__name__] = cls(config)
+            return plan
+
+    def extract(self, source, string):
+        """
+        Pull every field read from one scraped field.
+        The patterns are searched separately: each starts with a literal (TEL:, MOB: etc.) that the regex engine
+        scans for quickly, which a single combined pattern would lose.
+        :param source : string key of ConfigXX.REGEXP_SOURCES
+        :param string : the scraped text
+        :return dict {REGEXP key : string or None}
+        """
+        fields = {}
+        for name, pattern in self.sources[source]:
+            match = pattern.search(string) if string is not None else None
+            fields[name] = match.group(1) if match else None
+        return fields
+
+    def unwanted_notes(self, notes):
+        """
+        Find the notes containing any of ConfigXX.UNWANTED_NOTES.
+        Each unwanted string is first looked for in all the notes joined together so only those actually present are
+        tested against every note.
+        :param notes : iterable of strings
+        :return set of the unwanted notes
+        """
+        notes = list(notes)
+        column = self.SEPARATOR.join(notes)
+        present = [unwanted for unwanted in self.unwanted if unwanted in column]
+        return {note for note in notes for unwanted in present if unwanted in note}
+
+    def abbreviate(self, strings):
+        """
+        Abbreviate jargon in a column of strings using ConfigXX.JOB_PAGE_SITE_VISIT_ABBRS.
+        The column is joined into one string so each abbreviation is one str.replace over the lot. The result is the
+        same as replacing each abbreviation in turn in each string.
+        :param strings : list of strings
+        :return list of strings
+        """
+        if not self.abbreviations or not strings:
+            return list(strings)
+        if not self.joinable or any(self.SEPARATOR in string for string in strings):
+            return [self._abbreviate(string) for string in strings]  # can't be joined safely
+        return self._abbreviate(self.SEPARATOR.join(strings)).split(self.SEPARATOR)
+
+    def _abbreviate(self, string):
+        for jargon, abbreviation in self.abbreviations:
+            string = string.replace(jargon, abbreviation)
+        return string
 
 
 class Parser:
@@ -13,12 +117,13 @@ class Parser:
     Parser maps 'ConfigXx.JOB_PAGE_DATA(and/or JOB_PAGE_TABLES)' to Job class attributes
     """
 
-    def __init__(self,scraper_data, config=None):
+    def __init__(self,scraper_data, config=None, metrics=None):
         """
         :param scraper_data : dict mirroring ConfigXx.JOB_PAGE_DATA.
                                It contains a complete description of a job scraped from a config's website
         :param config       : Master configuration file detailing how the parser should read the scraped data.
                                Edit this if the config website structure changes.
+        :param metrics      : Metrics.Metrics to time reading the tables in. None for no timing
         """
         self.config = config
         self.client = config.CLIENT
@@ -26,6 +131,8 @@ class Parser:
         self.time = None
         self.address = None
         self.job = Classes.Job()
+        self.plan = ExtractionPlan.for_config(config)  # precompiled ConfigXX.REGEXP
+        self.metrics = metrics or Metrics.NULL
 
     def map_job(self):
         """
@@ -135,24 +242,35 @@ class Parser:
         :param address : string
         :return : Address object
         """
-        try:
-            # get valid postcode  ([0] is first occurrence)
-            postcode = (re.findall(Classes.Address.POSTCODE_REGEXP, address))[0]
-        except IndexError:
-            # no match
-            postcode = ""
-        # strip out postcode and any trailing  spaces
-        street = address.replace(postcode, "").strip()
-        while street[-1] == ",":
-            street = street.strip(",")  # poorly entered addresses can have extra commas
+        street, postcode = split_address(address)
         # make Address object
         return Classes.Address(street, postcode)
 
+    @staticmethod
+    def set_addresses(addresses):
+        """
+        Batch version of set_address for backfilling old jobs and importing agent lists.
+        Entries that are not strings (None, NaN) give None street and postcode.
+        :param addresses : sequence or pandas Series of strings
+        :return (list of street, list of postcode) or for a Series a DataFrame with street and postcode columns
+        """
+        split = split_address
+        streets, postcodes = [], []
+        for address in addresses:
+            street, postcode = split(address) if isinstance(address, str) else (None, "")
+            streets.append(street)
+            postcodes.append(postcode or None)  # as Address.__validate_postcode__ leaves it
+        if hasattr(addresses, "str"):  # pandas Series
+            import pandas as pd
+            return pd.DataFrame({"street": streets, "postcode": postcodes}, index=addresses.index)
+        return streets, postcodes
+
     @staticmethod
     def parse(regexp, string):
         """
         Find regexp in string.
         This is the main method for extracting cleaned data from a config's web page.
+        :param regexp : string or precompiled pattern (see ExtractionPlan)
         :return string or None
         """
         try:
@@ -170,8 +288,9 @@ class KaParser(Parser):
     Job attributes are parsed by cross referencing this table.
     """
 
-    def __init__(self, scraper_data):
-        super().__init__(scraper_data, config=ConfigKA)
+    def __init__(self, scraper_data, metrics=None):
+        from EstateAgent import ConfigKA
+        super().__init__(scraper_data, config=ConfigKA, metrics=metrics)
 
     def map_job(self):
         """
@@ -209,26 +328,22 @@ class KaParser(Parser):
         """
         # parse agent name from notes as this contains branch name info
         notes = self.scraper_data["JOB_DATA_NOTES"]
-        agent_name = self.parse(self.config.REGEXP["AGENT"], notes).strip()
+        agent_name = self.parse(self.plan.patterns["AGENT"], notes).strip()
 
         # parse agent for phone numbers
-        agent = self.scraper_data["JOB_DATA_AGENT"]
-        tel = self.parse(self.config.REGEXP["PHONE_1"], agent)
-        mob = self.parse(self.config.REGEXP["AGENT_MOB"], agent)
-        eve = self.parse(self.config.REGEXP["PHONE_EVE"], agent)
-        return Classes.Agent(branch=agent_name, phone_1=tel, phone_2=mob, phone_3=eve)
+        agent = self.plan.extract("JOB_DATA_AGENT", self.scraper_data["JOB_DATA_AGENT"])
+        return Classes.Agent.interned(branch=agent_name, phone_1=agent["PHONE_1"], phone_2=agent["AGENT_MOB"],
+                                      phone_3=agent["PHONE_EVE"])
 
     def _extract_vendor(self):
         """
         Parse vendor name and three telephone numbers if present.
         :return Vendor object
         """
-        vendor = self.scraper_data["JOB_DATA_VENDOR"]
-        vendor_name = self.parse(self.config.REGEXP["VENDOR"], vendor)
-        tel = self.parse(self.config.REGEXP["PHONE_DAY"], vendor)
-        mob = self.parse(self.config.REGEXP["VENDOR_MOB"], vendor)
-        eve = self.parse(self.config.REGEXP["PHONE_EVE"], vendor)
-        return Classes.Vendor(name_1=vendor_name, phone_1=tel, phone_2=mob, phone_3=eve)
+        # parse vendor name and phone numbers
+        vendor = self.plan.extract("JOB_DATA_VENDOR", self.scraper_data["JOB_DATA_VENDOR"])
+        return Classes.Vendor(name_1=vendor["VENDOR"], phone_1=vendor["PHONE_DAY"], phone_2=vendor["VENDOR_MOB"],
+                              phone_3=vendor["PHONE_EVE"])
 
     def _extract_property_type(self):
         """
@@ -258,7 +373,7 @@ class KaParser(Parser):
         """
         photos = self.scraper_data["JOB_DATA_PHOTOS"]
         try:
-            return int(self.parse(self.config.REGEXP["PHOTO_COUNT"], photos).strip())
+            return int(self.parse(self.plan.patterns["PHOTO_COUNT"], photos).strip())
         except ValueError:
             return 0
 
@@ -272,7 +387,7 @@ class KaParser(Parser):
         notes = set(notes.replace("/", "").split("\n"))
         # loop through each line of notes
         # mark unwanted lines for deletion by adding to a new set
-        unwanted_notes = {note for note in notes for unwanted in ConfigKA.UNWANTED_NOTES if unwanted in note}
+        unwanted_notes = self.plan.unwanted_notes(notes)
         # delete them
         notes = sorted(list(notes.difference(unwanted_notes)))  # set.difference() is the lines only in notes.
         # remove all blank entries
@@ -298,7 +413,7 @@ class KaParser(Parser):
         :return Datetime object
         """
         time = self.scraper_data["JOB_DATA_APPOINTMENT"]
-        time_format = ConfigKA.TIME_FORMAT
+        time_format = self.config.TIME_FORMAT
         return self.set_time(time, time_format)
 
     # Client specific methods
@@ -309,14 +424,19 @@ class KaParser(Parser):
         Currently this is only used for streetscape but it could be expanded to cover any specific photo requirements.
        :return dict {requirement : quantity}
        """
-        # make pandas dataframe from table
+        # read the table rows into dicts keyed by the column headings
         table = self.scraper_data["JOB_DATA_SPECIFIC_REQS_TABLE"]
         try:
-            df = pd.read_html(str(table), header=0)[0]  # pandas dataframe
+            with self.metrics.stage("tables"):
+                rows = Tables.read_table(table)
         except ValueError:
             return None
-        # read the table into a dict and return it
-        return {row['Specific Requirement']: row['Files required'] for _, row in df.iterrows()}
+        # read the table into a dict and return it. Quantities are whole numbers
+        reqs = {}
+        for row in rows:
+            quantity = row['Files required']
+            reqs[row['Specific Requirement']] = int(quantity) if quantity.isdigit() else quantity
+        return reqs
 
     def _extract_system_notes(self):
         """
@@ -324,34 +444,30 @@ class KaParser(Parser):
         Abbreviate jargon using Config.JOB_PAGE_SITE_VISIT_ABBRS
        :return list [Date, Author, Note]
        """
-
-        def abbreviate(string):
-            for k, v in ConfigKA.JOB_PAGE_SITE_VISIT_ABBRS.items():
-                string = string.replace(k, v)
-            return string
-
-        # make pandas dataframe from table
+        # read the table rows into dicts keyed by the column headings
         table = self.scraper_data["JOB_DATA_HISTORY_TABLE"]
         try:
-            df = pd.read_html(str(table), header=0)[0]  # pandas dataframe
+            with self.metrics.stage("tables"):
+                rows = Tables.read_table(table)
         except ValueError:
             return None
-        # read the table into a list and abbreviate
-        return [[abbreviate(row['Date Created']), abbreviate(row['Created By']), abbreviate(row['Note'])] for _, row in
-                df.iterrows()]
+        # abbreviate the three columns in one go then cut them back into rows
+        cells = self.plan.abbreviate([row[column] for row in rows for column in ('Date Created', 'Created By', 'Note')])
+        return [cells[i:i + 3] for i in range(0, len(cells), 3)]
 
 
 class HsParser(Parser):
     """
     House Simple parser.
-    All House simple fields are elements of one of two tables: Home Visit and Owner.
-    These two tables are concatenated into the pandas dataframe object self.table.
+    All House simple fields are elements of one of two key/value tables: Home Visit and Owner.
+    These two tables are read into the dict self.table.
     Job attributes are parsed from this table.
     """
 
-    def __init__(self, scraper_data):
-        super().__init__(scraper_data, config=ConfigHS)
-        self.table = None  # maps to ConfigHS.JOB_PAGE_DATA
+    def __init__(self, scraper_data, metrics=None):
+        from EstateAgent import ConfigHS
+        super().__init__(scraper_data, config=ConfigHS, metrics=metrics)
+        self.table = None  # {ConfigHS.JOB_PAGE_DATA value : cell text}
 
     def map_job(self):
         """
@@ -359,9 +475,9 @@ class HsParser(Parser):
         :return Job object
         """
 
-        # get the data and read it into a pandas table
-        df = pd.read_html(str(self.scraper_data["JOB_DATA_TABLE"]), index_col=0)
-        self.table = pd.concat([pd.DataFrame(df[i]) for i in range(len(df))]).T  # Transpose the table
+        # get the data and read it into a {key : value} table
+        with self.metrics.stage("tables"):
+            self.table = Tables.read_key_values(self.scraper_data["JOB_DATA_TABLE"])
         self.job.client = self.client
         self.job.id = self._extract_id()
         self.job.vendor = self._extract_vendor()
@@ -381,8 +497,8 @@ class HsParser(Parser):
         :return string
         """
         try:
-            # extract the series corresponding to the ID key in the Config file
-            id_ = self.table[ConfigHS.JOB_PAGE_DATA["ID"]].values[0]  # return the first item in the series
+            # extract the value corresponding to the ID key in the Config file
+            id_ = self.table[self.config.JOB_PAGE_DATA["ID"]]
         except KeyError:
             id_ = None
         return id_
@@ -394,7 +510,7 @@ class HsParser(Parser):
         :return Vendor object
         """
         try:
-            vendor = self.table[ConfigHS.JOB_PAGE_DATA["VENDOR"]].values[0]
+            vendor = self.table[self.config.JOB_PAGE_DATA["VENDOR"]]
         except KeyError:
             vendor = None
         return Classes.Client(name_1=vendor)
@@ -405,8 +521,8 @@ class HsParser(Parser):
         :return string
         """
         try:
-            # extract the series corresponding to the Property key in the Config file
-            p_type = self.table[ConfigHS.JOB_PAGE_DATA["PROPERTY"]].values[0]  # return the first item in the series
+            # extract the value corresponding to the Property key in the Config file
+            p_type = self.table[self.config.JOB_PAGE_DATA["PROPERTY"]]
         except KeyError:
             p_type = None
         return p_type
@@ -417,8 +533,8 @@ class HsParser(Parser):
         :return string
         """
         try:
-            # extract the series corresponding to the Beds key in the Config file
-            beds = self.table[ConfigHS.JOB_PAGE_DATA["BEDS"]].values[0]  # return the first item in the series
+            # extract the value corresponding to the Beds key in the Config file
+            beds = self.table[self.config.JOB_PAGE_DATA["BEDS"]]
         except KeyError:
             beds = None
         return beds
@@ -428,7 +544,7 @@ class HsParser(Parser):
         Extract address field from scraper_data and send it to base Parser.set_address().
         :return Address object
         """
-        address = self.table[ConfigHS.JOB_PAGE_DATA["ADDRESS"]].values[0].strip()
+        address = self.table[self.config.JOB_PAGE_DATA["ADDRESS"]].strip()
         return self.set_address(address)
 
     def _extract_time(self):
@@ -437,6 +553,6 @@ class HsParser(Parser):
         Define Datetime format for that data and send these to base Parser.set_time().
         :return Datetime object
         """
-        time = self.table[ConfigHS.JOB_PAGE_DATA["APPOINTMENT"]].values[0]
+        time = self.table[self.config.JOB_PAGE_DATA["APPOINTMENT"]]
         time_format = "%d/%m/%Y @ %H:%M"
         return self.set_time(time, time_format)
@@ -0,0 +1,281 @@
+"""Record and replay the pages a Scraper sees so a whole scrape can be rerun offline without Chrome or credentials.
+A capture is a directory holding one html file per page plus capture.jsonl, a journal with a line per recorded page
+mapping the url or job link that led to it to its file.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+
+INDEX = "capture.jsonl"  # appended to as pages are recorded so recording costs the same for every page
+XPATH_HREF_REGEXP = r'//a\[@href="(.*)"\]'  # matches the xpath Scraper.extract_job uses to find a job link
+
+
+class ReplayError(LookupError):
+    """
+    Raised when a replayed scrape asks for a page or link that is not in the capture.
+    """
+
+
+class Capture:
+    """
+    On-disk store of recorded pages.
+    urls  : {url passed to driver.get() : [page file of each visit]}. A url can serve a different page on a later visit,
+            e.g. House Simple's logon form and dashboard share a url
+    links : {href of a clicked job link : page file}
+    """
+
+    def __init__(self, path):
+        """
+        :param path : capture directory. Created when the first page is recorded
+        :return: None
+        """
+        self.path = path
+        self.urls = {}
+        self.links = {}
+        self._pages = {}  # {page file : html} read cache so replays run at parser speed
+        self._lock = threading.Lock()  # pooled drivers record into the same capture
+        try:
+            with open(os.path.join(path, INDEX), 'r', encoding='utf-8') as f:
+                for line in f:
+                    self._index(**json.loads(line))
+        except OSError:
+            pass
+
+    def add(self, html, url=None, href=None, visit=0):
+        """
+        Save a page and map it to the url or job link that led to it.
+        :param html  : string page source
+        :param url   : string url passed to driver.get()
+        :param href  : string href of the clicked job link
+        :param visit : int how many times the driver had already been to url
+        :return None
+        """
+        page = hashlib.sha1(html.encode("utf-8")).hexdigest()[:16] + ".html"  # identical pages are stored once
+        entry = {"page": page, "url": url, "href": href, "visit": visit}
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            if page not in self._pages:
+                with open(os.path.join(self.path, page), 'w', encoding='utf-8') as f:
+                    f.write(html)
+                self._pages[page] = html
+            self._index(**entry)
+            with open(os.path.join(self.path, INDEX), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def _index(self, page, url=None, href=None, visit=0):
+        """
+        Map a recorded page to the url or job link that led to it. A later entry for the same visit or link wins.
+        :param page  : page file name
+        :param url   : string url passed to driver.get()
+        :param href  : string href of the clicked job link
+        :param visit : int how many times the driver had already been to url
+        :return None
+        """
+        if url is not None:
+            pages = self.urls.setdefault(url, [])
+            pages.extend([page] * (visit + 1 - len(pages)))
+            pages[visit] = page
+        if href is not None:
+            self.links[href] = page
+
+    def page(self, url, visit=0):
+        """
+        :param url   : string url passed to driver.get()
+        :param visit : int how many times the driver had already been to url. Past the last visit recorded the last
+                       page is served again
+        :return string page file name
+        :raise ReplayError if url was never recorded
+        """
+        try:
+            pages = self.urls[url]
+        except KeyError:
+            raise ReplayError(f"url not captured: {url}")
+        return pages[min(visit, len(pages) - 1)]
+
+    def read(self, page):
+        """
+        :param page : page file name
+        :return string : html
+        """
+        try:
+            return self._pages[page]
+        except KeyError:
+            with open(os.path.join(self.path, page), 'r', encoding='utf-8') as f:
+                html = self._pages[page] = f.read()
+            return html
+
+
+class RecordingDriver:
+    """
+    Wrap a Selenium webdriver and record every page it loads into a Capture.
+    Anything not recorded is passed straight through to the wrapped driver.
+    """
+
+    def __init__(self, driver, capture):
+        """
+        :param driver  : Selenium webdriver
+        :param capture : Capture to record into
+        :return: None
+        """
+        self._driver = driver
+        self._capture = capture
+        self._clicked = None  # href of a clicked job link waiting for its page to be read
+        self._visits = {}  # {url : times driver.get() has loaded it}
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def get(self, url):
+        self._driver.get(url)
+        visit = self._visits.get(url, 0)
+        self._visits[url] = visit + 1
+        self._capture.add(self._driver.page_source, url=url, visit=visit)
+
+    @property
+    def page_source(self):
+        return self.record()
+
+    def record(self):
+        """
+        Read the page source, saving it if it is the page a clicked job link led to. Called directly by a scraper
+        that reads the page's fields without its source, e.g. with extract_js.
+        :return string html
+        """
+        html = self._driver.page_source
+        if self._clicked is not None:
+            # the scraper reads the page once it has loaded so this is the page the link leads to
+            self._capture.add(html, href=self._clicked)
+            self._clicked = None
+        return html
+
+    def find_element_by_xpath(self, xpath):
+        return self._wrap(xpath, self._driver.find_element_by_xpath(xpath))
+
+    def find_elements(self, by, value):
+        elements = self._driver.find_elements(by, value)
+        return [self._wrap(value, element) for element in elements] if by == "xpath" else elements
+
+    def _wrap(self, xpath, element):
+        match = re.fullmatch(XPATH_HREF_REGEXP, xpath)
+        return _RecordingElement(self, element, match.group(1)) if match else element
+
+
+class _RecordingElement:
+    """
+    Wrap a job link WebElement so the page it leads to is recorded against its href.
+    """
+
+    def __init__(self, driver, element, href):
+        self._driver = driver
+        self._element = element
+        self._href = href
+
+    def __getattr__(self, name):
+        return getattr(self._element, name)
+
+    def click(self):
+        self._element.click()
+        self._driver._clicked = self._href
+
+
+class ReplayDriver:
+    """
+    Stand-in for a Selenium webdriver that serves pages from a Capture.
+    Implements the subset of the WebDriver API used by Scraper.
+    """
+
+    def __init__(self, capture):
+        """
+        :param capture : Capture to replay
+        :return: None
+        """
+        self.capture = capture
+        self.history = []  # page files visited, last is current
+        self.visits = {}  # {url : times get() has loaded it}, as recorded by RecordingDriver
+        self._trees = {}  # {page file : lxml tree} for find_elements
+
+    def _goto(self, page):
+        self.history.append(page)
+
+    @property
+    def page_source(self):
+        try:
+            return self.capture.read(self.history[-1])
+        except IndexError:
+            return "<html></html>"  # nothing loaded yet, like a fresh browser
+
+    @property
+    def current_url(self):
+        pages = {page: url for url, visits in self.capture.urls.items() for page in visits}
+        return pages.get(self.history[-1], "about:blank") if self.history else "about:blank"
+
+    def get(self, url):
+        visit = self.visits.get(url, 0)
+        self._goto(self.capture.page(url, visit))
+        self.visits[url] = visit + 1
+
+    def implicitly_wait(self, time_to_wait):
+        pass
+
+    def find_element_by_name(self, name):
+        return ReplayElement(self)
+
+    def find_element_by_id(self, id_):
+        return ReplayElement(self)
+
+    def find_element_by_xpath(self, xpath):
+        match = re.fullmatch(XPATH_HREF_REGEXP, xpath)
+        try:
+            return ReplayElement(self, self.capture.links[match.group(1)])
+        except (AttributeError, KeyError):
+            raise ReplayError(f"link not captured: {xpath}")
+
+    def find_elements(self, by, value):
+        if by == "xpath" and re.fullmatch(XPATH_HREF_REGEXP, value):
+            try:
+                return [self.find_element_by_xpath(value)]
+            except ReplayError:
+                return []
+        xpath = {"id": f'//*[@id="{value}"]', "name": f'//*[@name="{value}"]', "tag name": f"//{value}"}.get(by, value)
+        return [ReplayElement(self) for _ in self._tree().xpath(xpath)]
+
+    def _tree(self):
+        """
+        :return lxml tree of the current page, parsed once per page file
+        """
+        import lxml.html
+        page = self.history[-1] if self.history else None
+        try:
+            return self._trees[page]
+        except KeyError:
+            tree = self._trees[page] = lxml.html.fromstring(self.page_source)
+            return tree
+
+    def execute_script(self, script, *args):
+        if script == "window.history.go(-1)" and len(self.history) > 1:
+            self.history.pop()
+
+    def quit(self):
+        self.history = []
+
+
+class ReplayElement:
+    """
+    Stand-in for a WebElement. Form fields accept input and do nothing, job links navigate to their captured page.
+    """
+
+    def __init__(self, driver, page=None):
+        self._driver = driver
+        self._page = page
+
+    def send_keys(self, *value):
+        pass
+
+    def clear(self):
+        pass
+
+    def click(self):
+        if self._page is not None:
+            self._driver._goto(self._page)
@@ -0,0 +1,174 @@
+import bisect
+import datetime as dt
+
+from EstateAgent import Classes
+
+# how long a shoot takes: travel and setting up, then time per photo, per bedroom and for a floorplan
+BASE_DURATION = dt.timedelta(minutes=20)
+PHOTO_DURATION = dt.timedelta(minutes=2)
+BED_DURATION = dt.timedelta(minutes=5)
+FLOORPLAN_DURATION = dt.timedelta(minutes=15)
+
+
+def estimate_duration(job):
+    """
+    Estimate how long an appointment will take from what the job asks for.
+    :param job : Job object
+    :return timedelta
+    """
+    try:
+        beds = int(job.beds)
+    except (TypeError, ValueError):
+        beds = 0  # studio, "N/A" or not given
+    return BASE_DURATION + PHOTO_DURATION * (job.photos or 0) + BED_DURATION * beds + \
+        (FLOORPLAN_DURATION if job.floorplan else dt.timedelta(0))
+
+
+class AppointmentIndex:
+    """
+    Active jobs' appointments held as intervals sorted on start time.
+    Queries bisect into the sorted starts so they only look at the appointments near the time asked about. Jobs are
+    added, moved and removed one at a time (or a Changes.ChangeSet at a time) as scrapes come in.
+    The starts are a plain sorted list: with n appointments a lookup is O(log n) but add and remove are O(n), as
+    inserting into or deleting from the list shifts everything after that point. For a diary's worth of
+    appointments that shift is a memmove of a few thousand pointers, around a microsecond.
+    """
+
+    def __init__(self, jobs=(), duration=estimate_duration):
+        """
+        :param jobs     : iterable of Job objects to start with
+        :param duration : function Job -> timedelta
+        :return: None
+        """
+        self.duration = duration
+        self._starts = []  # sorted [(start, job id)]
+        self._intervals = {}  # {job id : (start, end, Job)}
+        self._longest = dt.timedelta(0)  # no interval is longer so overlap searches can start this far back
+        for job in jobs:
+            self.add(job)
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def __contains__(self, job_id):
+        return job_id in self._intervals
+
+    def add(self, job):
+        """
+        Add a job or move it if its appointment has changed. Jobs that are archived or have no appointment date are
+        removed instead. O(n), see the class docstring.
+        :param job : Job object
+        :return bool True if the job is in the index
+        """
+        self.remove(job.id)
+        appointment = job.appointment
+        if job.id is None or job.status != Classes.Job.ACTIVE or appointment is None or appointment.date is None:
+            return False
+        start = appointment.date
+        length = self.duration(job)
+        self._longest = max(self._longest, length)
+        bisect.insort(self._starts, (start, job.id))
+        self._intervals[job.id] = (start, start + length, job)
+        return True
+
+    def remove(self, job_id):
+        """
+        O(n), see the class docstring.
+        :param job_id : string Job.id
+        :return Job removed or None if it wasn't there
+        """
+        try:
+            start, _, job = self._intervals.pop(job_id)
+        except KeyError:
+            return None
+        i = bisect.bisect_left(self._starts, (start, job_id))
+        del self._starts[i]
+        return job
+
+    def apply(self, changes):
+        """
+        Bring the index up to date with a scrape's change feed.
+        :param changes : Changes.ChangeSet
+        :return None
+        """
+        for job in changes.added:
+            self.add(job)
+        for job, _ in changes.modified:
+            self.add(job)
+        for job in changes.removed:
+            self.remove(job.id)
+
+    def interval(self, job_id):
+        """
+        :param job_id : string Job.id
+        :return (start, end) datetimes
+        """
+        start, end, _ = self._intervals[job_id]
+        return start, end
+
+    def _between(self, start, end):
+        """
+        :return list of job ids whose appointments start in [start, end)
+        """
+        i = bisect.bisect_left(self._starts, (start,))
+        j = bisect.bisect_left(self._starts, (end,), i)
+        return [job_id for _, job_id in self._starts[i:j]]
+
+    def on_day(self, day):
+        """
+        :param day : date or datetime
+        :return list of Jobs with appointments that day in start order
+        """
+        start = dt.datetime(day.year, day.month, day.day)
+        return [self._intervals[job_id][2] for job_id in self._between(start, start + dt.timedelta(days=1))]
+
+    def overlapping(self, start, end):
+        """
+        :param start : datetime
+        :param end   : datetime
+        :return list of Jobs whose appointments overlap [start, end) in start order
+        """
+        # looks back by the longest duration ever added, which removing that job doesn't shrink
+        ids = self._between(start - self._longest, end)
+        return [self._intervals[job_id][2] for job_id in ids if self._intervals[job_id][1] > start]
+
+    def first_free_slot(self, length, after, before=None):
+        """
+        Find the earliest gap of at least length that begins at or after a time.
+        After a bisect to 'after' this walks forward through back to back appointments until it reaches a gap, so it
+        costs O(log n + k) for k appointments between 'after' and the slot. On a fully booked diary k can be every
+        appointment left.
+        :param length : timedelta
+        :param after  : datetime
+        :param before : datetime the slot must end by or None for no limit
+        :return datetime start of the slot or None if there is no room before 'before'
+        """
+        free = after
+        for job in self.overlapping(after, after + dt.timedelta(microseconds=1)):
+            free = max(free, self._intervals[job.id][1])
+        i = bisect.bisect_left(self._starts, (after,))
+        while i < len(self._starts):
+            start, job_id = self._starts[i]
+            if start - free >= length:
+                break
+            free = max(free, self._intervals[job_id][1])
+            i += 1
+        if before is not None and free + length > before:
+            return None
+        return free
+
+    def clashes(self, cross_client=True):
+        """
+        Pairs of appointments that overlap.
+        :param cross_client : bool only report pairs booked by different clients e.g. KeyAgent and House Simple
+        :return list [(Job, Job)] in start order
+        """
+        pairs = []
+        running = []  # [(end, Job)] of appointments still going at the current start
+        for start, job_id in self._starts:
+            _, end, job = self._intervals[job_id]
+            running = [(other_end, other) for other_end, other in running if other_end > start]
+            pairs += [(other, job) for _, other in running
+                      if not cross_client or other.client_name() != job.client_name()]
+            running.append((end, job))
+        return pairs
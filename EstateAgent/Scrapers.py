@@ -1,12 +1,17 @@
 # import sys  # only used when running pickle dumps
+import importlib
+import multiprocessing
 import pickle
 import re
+import threading
+import time
+import types
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor, ThreadPoolExecutor
 
-import pandas as pd
-from bs4 import BeautifulSoup
-from selenium import webdriver
+from EstateAgent import Cache, Changes, Classes, Metrics, Parsers, Replay, Sessions, Store, Tables, Waits
 
-from EstateAgent import ConfigKA, ConfigHS, Parsers
+# selenium, BeautifulSoup, requests and the ConfigXX files are imported where they are first needed
+# so importing this module stays cheap
 
 
 class Scraper:
@@ -16,15 +21,72 @@ class Scraper:
     Crawl through jobs matching Config.REGEXP['job_page_link'] and create a Job object for each one.
     Store a list of all Jobs in self.jobs"""
 
-    def __init__(self, config, parser):
+    # read every field and table named in ConfigXX.JOB_PAGE_DATA/JOB_PAGE_TABLES in one round trip to the browser
+    # arguments[0] : {key : id of text field}, arguments[1] : {key : id of table}
+    FIELDS_SCRIPT = """
+        var fields = arguments[0], tables = arguments[1], result = {}, key, element;
+        for (key in fields) {
+            element = document.getElementById(fields[key]);
+            result[key] = element ? element.textContent : null;
+        }
+        for (key in tables) {
+            element = document.getElementById(tables[key]);
+            result[key] = element ? element.outerHTML : null;
+        }
+        return result;"""
+
+    def __init__(self, config, parser, pool_size=1, http_fetch=False, incremental=False, cache_path=None,
+                 record=None, replay=None, persist_session=False, extract_js=False, store=None, headless=False,
+                 metrics=None, parse_workers=0, parse_queue=None):
         """
-        :param config : ConfigXX file tailored to each config
-        :param parser : Parser object specific to each config to convert scraped data into Job attributes
+        :param config     : ConfigXX file tailored to each config
+        :param parser     : Parser object specific to each config to convert scraped data into Job attributes
+        :param pool_size  : number of logged on webdrivers used to extract job pages in parallel
+        :param http_fetch : if True fetch job pages over HTTP with the logged on session cookies.
+                            Selenium is used as the fallback for any page that can't be fetched
+        :param incremental: if True only visit job pages whose landing page row has changed since the last run.
+                            Unchanged jobs are rehydrated from a Cache.JobCache
+        :param cache_path : file for the job cache. Defaults to Cache.CACHE_DIR/<ConfigXX.CLIENT>.pkl
+        :param record     : capture directory. If set every page the scraper sees is saved there for replay
+        :param replay     : capture directory. If set the scrape runs offline from a Replay.ReplayDriver
+        :param persist_session : if True reuse the cookies of the last logon and only fill in the logon form
+                                 when that session has expired. Off by default: the cookies are saved unencrypted,
+                                 readable only by the user, in ~/.EstateAgent/sessions/<ConfigXX.CLIENT>.json
+                                 (see Sessions.SESSION_DIR)
+        :param extract_js : if True read job page fields with one javascript call instead of parsing the whole
+                            page source with BeautifulSoup. Tables are returned as html strings
+        :param store      : Store.JobStore or path to its database file. Scraped jobs are upserted into it
+        :param headless   : if True run Chrome without a window, e.g. on a server with no display
+        :param metrics    : Metrics.Metrics to time each stage of the scrape in, or path of a file to save them to
+                            once the drivers are closed (.prom for Prometheus text, JSON otherwise). None for no timing
+        :param parse_workers : number of processes parsing job pages while the drivers carry on capturing the next
+                               ones. 0 to parse each page in the thread that captured it
+        :param parse_queue   : most job pages captured but not yet yielded, parsed or not, before the drivers wait
+                               for the parsers and the caller to catch up. Defaults to twice parse_workers
         :return: None
         """
         self.parser = parser
         self.config = config
+        self.pool_size = max(1, pool_size)
+        self.http_fetch = http_fetch
+        self.incremental = incremental
+        self.cache_path = cache_path
+        self.record = record
+        self.replay = replay
+        self.capture = Replay.Capture(replay or record) if (replay or record) else None
+        # replayed pages have no cookies to restore
+        self.sessions = Sessions.SessionStore(config) if persist_session and not replay else None
+        # explicit waits and per page ready latency. Replayed pages are complete as soon as they are served
+        self.readiness = Waits.PageReadiness(config, timeout=0 if replay else Waits.PageReadiness.TIMEOUT)
+        self.extract_js = extract_js and not replay  # replayed pages have no DOM to run javascript in
+        self.store = Store.JobStore(store) if isinstance(store, str) else store
+        self.headless = headless
+        self.metrics = Metrics.Metrics(config.CLIENT, metrics) if isinstance(metrics, str) else metrics or Metrics.NULL
+        self.parse_workers = parse_workers
+        self.parse_queue = max(1, parse_queue or 2 * parse_workers)
         self.driver = None  # Selenium webdriver
+        self.drivers = []  # extra Selenium webdrivers when running as a pool
+        self.fetcher = None  # Fetchers.HttpFetcher when http_fetch is True
 
     def scrape_site(self):
         """
@@ -32,53 +94,128 @@ class Scraper:
         Uses Selenium to log on and scrape data from the website specified in ConfigfXX.
         :return: list of Job objects
         """
-        # get list of links to jobs
-        links = self.extract_job_links()
-        # parse the linked pages into Job instances
-        jobs = self.extract_jobs(links)
-        self._process_jobs(jobs)
-        self.scraper_close()
-        return jobs
+        return list(self._process_jobs(self.iter_jobs()))
 
-    def scraper_close(self):
+    def scrape_changes(self):
+        """
+        Scrape a whole site and compare it with the jobs last stored for this client in self.store.
+        Only the new, changed and archived jobs are written back.
+        :return Changes.ChangeSet
+        """
+        if self.store is None:
+            raise ValueError("scrape_changes needs a store to compare against")
+        previous = self.store.load_jobs(client=self.config.CLIENT, status=Classes.Job.ACTIVE)
+        changes = Changes.compare(previous, self.iter_jobs())
+        self.store.upsert_jobs(changes.jobs())
+        return changes
+
+    def iter_jobs(self):
+        """
+        Scrape a whole site, yielding each Job as soon as its page has been parsed, in landing page order.
+        The drivers are closed once the last Job has been yielded or as soon as the consumer stops early.
+        :return generator of Job objects
+        """
+        jobs = None
+        run, start = 0.0, time.perf_counter()  # the "run" stage leaves out the time the consumer has each Job
+        try:
+            # get list of links to jobs
+            links = self.extract_job_links()
+            # parse the linked pages into Job instances
+            jobs = self.iter_jobs_incremental(links) if self.incremental else self.iter_extract_jobs(links)
+            for job in jobs:
+                run += time.perf_counter() - start
+                start = None
+                yield job
+                start = time.perf_counter()
+        finally:
+            if jobs is not None:
+                jobs.close()  # stop the pool before its drivers are quit
+            if start is not None:
+                run += time.perf_counter() - start
+            self.metrics.observe("run", run)
+            self.scraper_close()
 
-        self.driver.quit()
+    def scraper_close(self):
+        """
+        Quit every webdriver this scraper has logged on, including any pool drivers.
+        :return None
+        """
+        if self.fetcher is not None:
+            self.fetcher.close()
+            self.fetcher = None
+        for driver in [self.driver] + self.drivers:
+            if driver is not None:
+                driver.quit()
+        self.driver = None
+        self.drivers = []
+        self.metrics.save()
 
     def _logon(self, landing_pg=None):
         """
-        Logon to a web site using credentials and web addresses from ConfigXX
+        Logon to a web site using credentials and web addresses from ConfigXX.
+        A saved session is restored instead if there is one that is still logged on.
         :return Selenium webdriver
         """
-        # create a selenium browser driver
-        driver = webdriver.Chrome(self.config.CHROME_DRIVER)
-        driver.implicitly_wait(10)  # wait for up to 10 secs
-
-        # read credential and addresses
-        username = self.config.USERNAME
-        password = self.config.PASSWORD
-        login_pg = self.config.LOGIN_PAGE
-        username_field = self.config.USERNAME_FIELD
-        password_field = self.config.PASSWORD_FIELD
-        login_btn = self.config.LOGIN_BUTTON
-
-        # set landing page
-        if landing_pg is None:
-            landing_pg = self.config.LANDING_PAGE
-
-        # Navigate to the config home page
-        driver.get(login_pg)
-
-        # find input fields and log on
-        username_field = driver.find_element_by_name(username_field)
-        password_field = driver.find_element_by_name(password_field)
-        username_field.send_keys(username)
-        password_field.send_keys(password)
-        driver.find_element_by_name(login_btn).click()
-
-        # navigate to the landing page with the list of all jobs
-        driver.get(landing_pg)
-
-        # return the selenium browser driver
+        with self.metrics.stage("logon"):
+            # create a selenium browser driver. No implicit wait, pages are waited for explicitly by self.readiness
+            driver = self._create_driver()
+
+            # read credential and addresses
+            username = self.config.USERNAME
+            password = self.config.PASSWORD
+            login_pg = self.config.LOGIN_PAGE
+            username_field = self.config.USERNAME_FIELD
+            password_field = self.config.PASSWORD_FIELD
+            login_btn = self.config.LOGIN_BUTTON
+
+            # set landing page
+            if landing_pg is None:
+                landing_pg = self.config.LANDING_PAGE
+
+            # skip the logon form if the last session is still valid
+            if self.sessions is not None and self.sessions.restore(driver, landing_pg):
+                self.readiness.wait(driver, "LANDING_PAGE")
+                return driver
+
+            # Navigate to the config home page. Where it is also the landing page, as for House Simple, a browser that
+            # is still logged on goes straight to the jobs and there is no form to fill in
+            driver.get(login_pg)
+            if not Sessions.is_logged_on(self.config, driver):
+                self.readiness.wait(driver, "LOGIN_PAGE")
+
+                # find input fields and log on
+                username_field = driver.find_element_by_name(username_field)
+                password_field = driver.find_element_by_name(password_field)
+                username_field.send_keys(username)
+                password_field.send_keys(password)
+                driver.find_element_by_name(login_btn).click()
+
+            # navigate to the landing page with the list of all jobs
+            driver.get(landing_pg)
+            self.readiness.wait(driver, "LANDING_PAGE")
+            if self.sessions is not None:
+                self.sessions.save(driver)
+
+            # return the selenium browser driver
+            return driver
+
+    def _create_driver(self):
+        """
+        Start a Chrome webdriver, wrapped to record its pages if self.record is set,
+        or a Replay.ReplayDriver if self.replay is set.
+        :return Selenium webdriver or stand-in
+        """
+        if self.replay:
+            return Replay.ReplayDriver(self.capture)
+        from selenium import webdriver
+        options = webdriver.ChromeOptions()
+        if self.headless:
+            # containers have no sandbox support and too small a /dev/shm for Chrome
+            for argument in ("--headless", "--no-sandbox", "--disable-dev-shm-usage"):
+                options.add_argument(argument)
+        driver = webdriver.Chrome(self.config.CHROME_DRIVER, options=options)
+        if self.record:
+            driver = Replay.RecordingDriver(driver, self.capture)
         return driver
 
     def extract_job_links(self, html=None):
@@ -91,75 +228,373 @@ class Scraper:
         self.driver = self._logon()
         # get html to read if none passed
         if html is None:
-            html = BeautifulSoup(self.driver.page_source, 'lxml')
+            html = self._read_page(self.driver)
+        with self.metrics.stage("job_links"):
+            return self.job_links(html)
+
+    def job_links(self, html):
+        """
+        Read the links to job pages from an already loaded landing page. No logon needed.
+        :param html : BeautifulSoup of the landing page
+        :return list of hrefs to job pages
+        """
         # find all links pointing to job pages from the landing page
         return html.find_all('a', href=re.compile(self.config.REGEXP["JOB_PAGE_LINK"]))
 
     def extract_jobs(self, links):
         """
         Take a list of job hrefs and return a list of Job objects containing data scraped from the href
+        If self.pool_size > 1 the links are shared out between a pool of logged on webdrivers.
         :param links: list of html <a> tags containing href to page with details of a job
-        :return list : Job objects, one for each link
+        :return list : Job objects, one for each link, in the same order as links
         """
-        return [self.extract_job(link) for link in links]
+        return list(self.iter_extract_jobs(links))
 
-    def extract_job(self, link):
+    def iter_extract_jobs(self, links):
         """
-        Scrape the web page specified by 'link' and parse it into a Job object.
+        As extract_jobs but yield each Job as soon as it has been parsed.
+        :param links: list of html <a> tags containing href to page with details of a job
+        :return generator of Job objects in the same order as links
+        """
+        if self.http_fetch and self.fetcher is None and not self.replay:
+            # copy the session out of the driver while it is still on the landing page
+            from EstateAgent import Fetchers
+            self.fetcher = Fetchers.HttpFetcher(self.config, self.driver)
+        if self.parse_workers > 0:
+            yield from self._iter_jobs_parallel_parse(links)
+        elif self.pool_size < 2 or len(links) < 2:
+            for link in links:
+                yield self.extract_job(link)
+        else:
+            yield from self._iter_jobs_pooled(links)
+
+    def extract_jobs_incremental(self, links):
+        """
+        As extract_jobs but only visit the job pages whose landing page row has changed since the last run.
+        If the landing page listing is unchanged then no job pages are visited at all.
+        :param links: list of html <a> tags containing href to page with details of a job
+        :return list : Job objects, one for each link, in the same order as links
+        """
+        return list(self.iter_jobs_incremental(links))
+
+    def iter_jobs_incremental(self, links):
+        """
+        As extract_jobs_incremental but yield each Job as soon as it has been parsed or read from the cache.
+        The cache is only updated once every Job has been yielded.
+        :param links: list of html <a> tags containing href to page with details of a job
+        :return generator of Job objects in the same order as links
+        """
+        cache = Cache.JobCache(self.config.CLIENT, self.cache_path)
+        rows = [self._row_fingerprint(link) for link in links]
+        landing = Cache.fingerprint(*rows)
+        if landing == cache.landing:
+            yield from cache.listing
+            return
+        # visit only the rows the cache doesn't recognise and slot the new Jobs back in between the cached ones
+        cached = [cache.lookup(row) for row in rows]
+        fresh = self.iter_extract_jobs([link for link, job in zip(links, cached) if job is None])
+        jobs = []
+        try:
+            for job in cached:
+                job = job if job is not None else next(fresh)
+                jobs.append(job)
+                yield job
+        finally:
+            fresh.close()
+        cache.update(landing, rows, jobs)
+        cache.save()
+
+    def _row_fingerprint(self, link):
+        """
+        Fingerprint the landing page table row holding a job link.
+        The row text carries the job reference, status and appointment columns so any change to the job listing
+        changes the fingerprint. Where ConfigXX.JOB_LINK_POSITIONAL is set the href only says which row the link is
+        on, e.g. KeyAgent's __doPostBack(...,'Select$3'), so it is left out and a job keeps its fingerprint when rows
+        are added or removed above it.
         :param link : BeautifulSoup.Tag pointing to job page
+        :return string
+        """
+        row = link.find_parent("tr")
+        text = " ".join(row.stripped_strings) if row is not None else link.get_text()
+        if getattr(self.config, "JOB_LINK_POSITIONAL", False):
+            return Cache.fingerprint(text)
+        return Cache.fingerprint(link["href"], text)
+
+    def _iter_jobs_pooled(self, links, extract=None):
+        """
+        Log on enough extra webdrivers to make up the pool then deal the links out between them round robin.
+        Each driver works through its share serially so every browser keeps its own history for the back button.
+        :param links   : list of html <a> tags containing href to page with details of a job
+        :param extract : function (link, driver) -> result, run for each link. Defaults to self.extract_job
+        :return generator of Job objects, or whatever extract returns, in the same order as links
+        """
+        if not links:
+            return
+        size = max(1, min(self.pool_size, len(links)))
+        results = [Future() for _ in links]  # one per link, filled in by whichever driver has that link
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=size)
+        try:
+            # self.driver is already logged on by extract_job_links so only the extra drivers are needed
+            self._logon_pool(executor, size - 1)
+            for i, driver in enumerate([self.driver] + self.drivers):
+                executor.submit(self._extract_share, driver, links[i::size], results[i::size], stop,
+                                extract or self.extract_job)
+            for result in results:
+                yield result.result()
+        finally:
+            # consumer finished or stopped early. Let each driver finish its current page then stop
+            stop.set()
+            executor.shutdown(wait=True)
+
+    def _iter_jobs_parallel_parse(self, links):
+        """
+        Capture job pages with the driver(s) and parse them in a pool of self.parse_workers processes, so the browsers
+        never wait for BeautifulSoup and the parsing is spread over every core.
+        A job page is only captured once it is fewer than self.parse_queue links ahead of the next Job to be yielded,
+        so at most self.parse_queue pages or parsed Jobs are held at once however slow one page is to come back.
+        :param links: list of html <a> tags containing href to page with details of a job
+        :return generator of Job objects in the same order as links
+        """
+        position = {id(link): i for i, link in enumerate(links)}
+        yielded = 0  # links whose Job has been handed to the consumer
+        closed = False
+        window = threading.Condition()
+        # spawned rather than forked: forking copies the state of the driver threads, which isn't safe
+        parsers = ProcessPoolExecutor(self.parse_workers, mp_context=multiprocessing.get_context("spawn"),
+                                      initializer=_start_parse_worker,
+                                      initargs=(type(self), _config_reference(self.config),
+                                                self.metrics is not Metrics.NULL))
+
+        def capture(link, driver):
+            with window:
+                # the next link to be yielded is always inside the window so a driver can't wait on itself
+                window.wait_for(lambda: closed or position[id(link)] < yielded + self.parse_queue)
+            if closed:
+                raise CancelledError()
+            start = time.perf_counter()
+            parsed = parsers.submit(parse_page, self._capture_page(link, driver))
+            parsed.add_done_callback(lambda _: self.metrics.observe("job", time.perf_counter() - start))
+            return parsed
+
+        captured = self._iter_jobs_pooled(links, capture)
+        try:
+            for parsed in captured:
+                job, metrics = parsed.result()
+                if metrics is not None:
+                    self.metrics.merge(metrics)
+                if isinstance(job.agent, Classes.Agent):
+                    job.agent = Classes.Agent.intern(job.agent)  # share it again after the trip from the worker
+                with window:
+                    yielded += 1
+                    window.notify_all()
+                yield job
+        finally:
+            with window:  # don't leave a driver waiting for a window that will never move
+                closed = True
+                window.notify_all()
+            # stop the drivers before the parsers they feed
+            captured.close()
+            parsers.shutdown(wait=True)
+
+    def _logon_pool(self, executor, count):
+        """
+        Log on 'count' extra webdrivers in parallel and add them to self.drivers.
+        Drivers that did log on are kept so scraper_close can quit them even if another logon failed.
+        :param executor : ThreadPoolExecutor to run the logons in
+        :param count    : int number of extra drivers
+        :return None
+        """
+        futures = [executor.submit(self._logon) for _ in range(count)]
+        error = None
+        for future in futures:
+            try:
+                self.drivers.append(future.result())
+            except Exception as e:  # keep collecting so no logged on driver is orphaned
+                error = error or e
+        if error is not None:
+            raise error
+
+    def _extract_share(self, driver, links, results, stop, extract):
+        """
+        Extract a share of the job links using a single pool driver.
+        :param driver  : Selenium webdriver sitting on the landing page
+        :param links   : list of html <a> tags
+        :param results : list of Futures, one per link, to put the Jobs in
+        :param stop    : threading.Event set when the consumer no longer wants any more Jobs
+        :param extract : function (link, driver) -> result e.g. self.extract_job
+        :return None
+        """
+        share = iter(zip(links, results))
+        for link, result in share:
+            if stop.is_set():
+                result.cancel()
+                break
+            try:
+                result.set_result(extract(link, driver))
+            except Exception as e:
+                # the driver may be lost on the wrong page so this share stops here
+                result.set_exception(e)
+                break
+        # nothing will fill in the rest of the share, so don't leave anyone waiting on it
+        for _, result in share:
+            result.cancel()
+
+    def extract_job(self, link, driver=None):
+        """
+        Scrape the web page specified by 'link' and parse it into a Job object.
+        :param link   : BeautifulSoup.Tag pointing to job page
+        :param driver : Selenium webdriver to use. If None then self.driver is used
         :return job : Job object containing all scraped and cleaned data from the visited page
 
         """
-        # crawl to Job page
-        python_button = self.driver.find_element_by_xpath('//a[@href="' + link['href'] + '"]')
-        python_button.click()
-        # create a dict of scraped page data matching ConfigXX specifications
-        job_dict = self._extract_page_fields()
+        with self.metrics.stage("job"):
+            return self._parse_page(self._capture_page(link, driver))
+
+    def _capture_page(self, link, driver=None):
+        """
+        Get the job page specified by 'link' out of the site without parsing it, leaving the driver back on the
+        landing page.
+        :param link   : BeautifulSoup.Tag pointing to job page
+        :param driver : Selenium webdriver to use. If None then self.driver is used
+        :return string html of the job page or, with extract_js, the dict of its fields. Either can be pickled
+        :raise Waits.PageNotReady if the link or the job page's REQUIRED elements never appeared
+        """
+        if driver is None:
+            driver = self.driver
+        metrics = self.metrics
+        with metrics.stage("capture"):
+            page = self._fetch_page(link) if self.fetcher is not None else None
+            if page is not None and self.record:
+                # a replay clicks the link, so file the fetched page under it as a browser would have loaded it
+                self.capture.add(page, href=link["href"])
+            if page is None:
+                # crawl to Job page. Wait for the link as the landing page may still be reloading after the last job
+                with metrics.stage("click"):
+                    python_button = self.readiness.find(driver, "xpath", '//a[@href="' + link['href'] + '"]')
+                    python_button.click()
+                    self.readiness.wait(driver, "JOB_PAGE")
+                if self.extract_js:
+                    if self.record:
+                        driver.record()  # the fields are read without the page source that would have saved it
+                    with metrics.stage("fields"):
+                        page = self._extract_page_fields_js(driver)
+                else:
+                    with metrics.stage("page_source"):
+                        page = driver.page_source
+                # click the back button
+                with metrics.stage("back"):
+                    driver.execute_script("window.history.go(-1)")
+        return page
+
+    def _parse_page(self, page):
+        """
+        Parse a captured job page into a Job object.
+        :param page : string html of a job page or dict of its fields, as returned by _capture_page
+        :return job : Job object containing all scraped and cleaned data from the page
+        """
+        metrics = self.metrics
+        if isinstance(page, dict):
+            job_dict = page
+        else:
+            from bs4 import BeautifulSoup
+            with metrics.stage("soup"):
+                html = BeautifulSoup(page, 'lxml')
+            # create a dict of scraped page data matching ConfigXX specifications
+            job_dict = self._extract_page_fields(html)
+        metrics.fields(job_dict)
         # instantiate a Parser and map the scraped page data stored in job_dict onto a new Job object
-        p = self.parser(job_dict)  # todo make this parser a variable imported from Config
-        job = p.map_job()
-        # click the back button
-        self.driver.execute_script("window.history.go(-1)")
+        p = self.parser(job_dict, metrics=metrics)  # todo make this parser a variable imported from Config
+        try:
+            with metrics.stage("parse"):
+                job = p.map_job()
+        except Exception:
+            metrics.failure("map_job")
+            raise
+        metrics.job(job)
         return job
 
-    def _extract_page_fields(self, html=None):
+    def _fetch_page(self, link):
+        """
+        Fetch the job page over HTTP.
+        :param link : BeautifulSoup.Tag pointing to job page
+        :return string html or None if the page could not be fetched
+        """
+        from EstateAgent import Fetchers
+        try:
+            with self.metrics.stage("fetch"):
+                return self.fetcher.fetch(link)
+        except Fetchers.FetchError:
+            return None
+
+    def _extract_page_fields(self, html=None, driver=None):
         """
         Read required data from ConfigXX.JOB_PAGE_DATA and ConfigXX.JOB_PAGE_TABLES.
         Scrape that data into a dict.
         :param html the html page containing data to be scraped.
         If None then Beautiful soup will parse the current Selenium webdriver.page source
+        :param driver : Selenium webdriver to read the page source from. If None then self.driver is used
         :return dict {ConfigXX.JOB_PAGE|DATA|TABLES[key] : scraped value}
         """
+        if html is None and self.extract_js:
+            with self.metrics.stage("fields"):
+                return self._extract_page_fields_js(driver or self.driver)
         job_dict = {}
         if html is None:
-            html = BeautifulSoup(self.driver.page_source, 'lxml')
-        data = self.config.JOB_PAGE_DATA
-        # scrape the text fields
-        for key in data.keys():
-            try:
-                value = html.find(id=data[key]).get_text()
-                job_dict[key] = value
-            except(IndexError, AttributeError):
-                job_dict[key] = None
-        # scrape the tables
-        data = self.config.JOB_PAGE_TABLES
-        for key in data.keys():
-            try:
-                table = html.find(id=data[key])
-                job_dict[key] = table
-            except (IndexError, AttributeError):
-                job_dict[key] = None
+            html = self._read_page(driver or self.driver)
+        with self.metrics.stage("fields"):
+            data = self.config.JOB_PAGE_DATA
+            # scrape the text fields
+            for key in data.keys():
+                try:
+                    value = html.find(id=data[key]).get_text()
+                    job_dict[key] = value
+                except(IndexError, AttributeError):
+                    job_dict[key] = None
+            # scrape the tables
+            data = self.config.JOB_PAGE_TABLES
+            for key in data.keys():
+                try:
+                    table = html.find(id=data[key])
+                    job_dict[key] = table
+                except (IndexError, AttributeError):
+                    job_dict[key] = None
         return job_dict
 
-    @staticmethod
-    def _process_jobs(jobs):
+    def _read_page(self, driver):
         """
-        Placeholder for further processing.
-        Will eventually store the jobs in a DB via Django.
-        :return None
+        Read the page the driver is on into BeautifulSoup.
+        :param driver : Selenium webdriver
+        :return BeautifulSoup
+        """
+        from bs4 import BeautifulSoup
+        with self.metrics.stage("page_source"):
+            source = driver.page_source
+        with self.metrics.stage("soup"):
+            return BeautifulSoup(source, 'lxml')
+
+    def _extract_page_fields_js(self, driver):
+        """
+        As _extract_page_fields but the browser reads the fields itself so the page source never has to be
+        serialised and parsed. Text fields are the element's textContent, tables are their outerHTML.
+        :param driver : Selenium webdriver on a job page
+        :return dict {ConfigXX.JOB_PAGE|DATA|TABLES[key] : scraped value}
+        """
+        return driver.execute_script(self.FIELDS_SCRIPT, self.config.JOB_PAGE_DATA, self.config.JOB_PAGE_TABLES)
+
+    def _process_jobs(self, jobs):
         """
+        Upsert the jobs into self.store in batches as they arrive, committing each batch, and pass them on.
+        Without a store the jobs are printed.
+        :param jobs : iterable of Job objects
+        :return generator of the same Job objects
+        """
+        if self.store is not None:
+            yield from self.store.upsert_iter(jobs)
+            return
         for job in jobs:
             print(job, sep="\n")
+            yield job
 
     # ------------------------------------------------------------------------------------------------------------------
     # ------------------------------------------------------------------------------------------------------------------
@@ -203,8 +638,15 @@ class KaScraper(Scraper):
     KeyAgent Scraper
     """
 
-    def __init__(self):
-        super().__init__(config=ConfigKA, parser=Parsers.KaParser)
+    def __init__(self, config=None, **kwargs):
+        """
+        :param config : ConfigKA or a copy pointing somewhere else e.g. Benchmarks.portal.local_config.
+                        Defaults to ConfigKA
+        :param kwargs : Scraper options, see Scraper.__init__
+        """
+        if config is None:
+            from EstateAgent import ConfigKA as config
+        super().__init__(config=config, parser=Parsers.KaParser, **kwargs)
 
 
 class HsScraper(Scraper):
@@ -212,8 +654,28 @@ class HsScraper(Scraper):
     House Simple Scraper
     """
 
-    def __init__(self):
-        super().__init__(config=ConfigHS, parser=Parsers.HsParser)
+    # arguments[0] : {key : tag name of tables}. All tables with that tag are joined into one html string
+    FIELDS_SCRIPT = """
+        var tables = arguments[0], result = {}, key, elements, i, html;
+        for (key in tables) {
+            elements = document.getElementsByTagName(tables[key]);
+            html = [];
+            for (i = 0; i < elements.length; i++) {
+                html.push(elements[i].outerHTML);
+            }
+            result[key] = html.join("");
+        }
+        return result;"""
+
+    def __init__(self, config=None, **kwargs):
+        """
+        :param config : ConfigHS or a copy pointing somewhere else e.g. Benchmarks.portal.local_config.
+                        Defaults to ConfigHS
+        :param kwargs : Scraper options, see Scraper.__init__
+        """
+        if config is None:
+            from EstateAgent import ConfigHS as config
+        super().__init__(config=config, parser=Parsers.HsParser, **kwargs)
 
     def extract_job_links(self, html=None):
         """
@@ -229,37 +691,105 @@ class HsScraper(Scraper):
 
         # get html to read if none passed
         if html is None:
-            html = BeautifulSoup(self.driver.page_source, 'lxml')
-        # get table - any live jobs found will be in the first table
-        table = html.find_all(ConfigHS.CONFIRMED_HOME_VISIT_TABLE)[0]
-        # convert to a pandas dataframe - we're only interested in the first select_drop
-        # this is a table of addresses and job statuses etc.
-        df = pd.read_html(str(table), encoding='utf-8', header=0)[0]
-        # pandas will strip out the href data so we add it back in:
-        df["href"] = [tag for tag in table.find_all('a')]
-        # all live jobs have a status of "confirmed" so make a list of those [] = table headings
-        return [row["href"] for _, row in df.iterrows() if row[ConfigHS.JOB_STATUS] == ConfigHS.JOB_OPEN]
+            html = self._read_page(self.driver)
+        with self.metrics.stage("job_links"):
+            return self.job_links(html)
 
-    def _extract_page_fields(self, html=None):
+    def job_links(self, html):
+        """
+        Read the links to confirmed jobs from an already loaded dashboard. No logon needed.
+        :param html : BeautifulSoup of the dashboard
+        :return list of hrefs to job pages
+        """
+        # get table - any live jobs found will be in the first table
+        table = html.find_all(self.config.CONFIRMED_HOME_VISIT_TABLE)[0]
+        # this is a table of addresses and job statuses etc. The first row holds the column headings
+        rows = Tables.table_rows(table)
+        if not rows:
+            return []
+        status = rows[0][1].index(self.config.JOB_STATUS)
+        # all live jobs have a status of "confirmed" so make a list of the links in those rows
+        return [tr.find('a') for tr, cells in rows[1:]
+                if len(cells) > status and cells[status] == self.config.JOB_OPEN and tr.find('a') is not None]
+
+    def _extract_page_fields(self, html=None, driver=None):
         """
         Read required data from ConfigHS.JOB_PAGE_TABLES.
         Scrape that data into a dict.
+        :param driver : Selenium webdriver to read the page source from. If None then self.driver is used
         :return dict {ConfigHS.JOB_PAGE_TABLES[key] : scraped value}
         """
+        if html is None and self.extract_js:
+            with self.metrics.stage("fields"):
+                return self._extract_page_fields_js(driver or self.driver)
         job_dict = {}
         # read html page data
         if html is None:
-            html = BeautifulSoup(self.driver.page_source, 'lxml')
+            html = self._read_page(driver or self.driver)
         # scrape the tables
-        data = self.config.JOB_PAGE_TABLES
-        for key in data.keys():
-            try:
-                table = html.findAll(data[key])
-                job_dict[key] = table
-            except (IndexError, AttributeError):
-                job_dict[key] = None
+        with self.metrics.stage("fields"):
+            data = self.config.JOB_PAGE_TABLES
+            for key in data.keys():
+                try:
+                    table = html.findAll(data[key])
+                    job_dict[key] = table
+                except (IndexError, AttributeError):
+                    job_dict[key] = None
         return job_dict  # just a copy of the job page table. All data extracted in the parser.
 
+    def _extract_page_fields_js(self, driver):
+        """
+        As _extract_page_fields but the browser returns the tables as one html string.
+        :param driver : Selenium webdriver on a job page
+        :return dict {ConfigHS.JOB_PAGE_TABLES[key] : html string of all matching tables}
+        """
+        return driver.execute_script(self.FIELDS_SCRIPT, self.config.JOB_PAGE_TABLES)
+
+
+# the scraper each parse worker process parses with, made once per process by _start_parse_worker
+_parse_worker = None
+
+
+def _config_reference(config):
+    """
+    :param config : ConfigXX file or a stand-in for it
+    :return the module's name, which unlike the module can be sent to another process, or the stand-in itself
+    """
+    return config.__name__ if isinstance(config, types.ModuleType) else config
+
+
+def _start_parse_worker(scraper_class, config, timed):
+    """
+    Make the scraper a parse worker process parses with. Runs once in each new worker.
+    :param scraper_class : client Scraper subclass e.g. KaScraper
+    :param config        : ConfigXX module name or stand-in, from _config_reference
+    :param timed         : bool True to time the parse stages
+    :return None
+    """
+    global _parse_worker
+    if isinstance(config, str):
+        config = importlib.import_module(config)
+    _parse_worker = scraper_class(config=config, persist_session=False, metrics=Metrics.Metrics() if timed else None)
+
+
+def parse_page(page):
+    """
+    Parse one captured job page in a parse worker process: BeautifulSoup, _extract_page_fields and map_job.
+    :param page : string html of a job page or dict of its fields, as returned by Scraper._capture_page
+    :return Job object, Metrics.Metrics of this page's parse stages or None if they aren't being timed
+    """
+    scraper = _parse_worker
+    if scraper.metrics is Metrics.NULL:
+        return scraper._parse_page(page), None
+    scraper.metrics = metrics = Metrics.Metrics()  # a fresh one each page so nothing is sent back twice
+    return scraper._parse_page(page), metrics
+
+
+# every client scraper the Orchestrator can run {ConfigXX suffix : Scraper class}
+SCRAPERS = {
+        "KA": KaScraper,
+        "HS": HsScraper
+}
 
 if __name__ == '__main__':
     k = KaScraper()
@@ -0,0 +1,99 @@
+import json
+import os
+import re
+import tempfile
+import time
+
+SESSION_DIR = os.path.join(os.path.expanduser("~"), ".EstateAgent", "sessions")  # one cookie file per client
+
+
+class SessionStore:
+    """
+    Save the cookies of a logged on webdriver so later drivers can skip the logon form.
+    Sessions are stored per client config and checked against ConfigXX.LANDING_PAGE before use.
+    """
+
+    def __init__(self, config, path=None):
+        """
+        :param config : ConfigXX file tailored to each config
+        :param path   : file to store the cookies in. Defaults to SESSION_DIR/<ConfigXX.CLIENT>.json
+        :return: None
+        """
+        self.config = config
+        self.path = path or os.path.join(SESSION_DIR, re.sub(r"\W+", "_", config.CLIENT) + ".json")
+
+    def load(self):
+        """
+        Read the saved cookies, dropping any that have expired.
+        :return list of cookie dicts as returned by webdriver.get_cookies()
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                cookies = json.load(f)
+        except (OSError, ValueError):
+            return []
+        now = time.time()
+        return [cookie for cookie in cookies if cookie.get("expiry", now + 1) > now]
+
+    def save(self, driver):
+        """
+        Save the cookies of a logged on driver. Written to a temporary file first as pooled drivers may save at once.
+        :param driver : Selenium webdriver
+        :return None
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(driver.get_cookies(), f)
+        os.replace(temp, self.path)
+
+    def clear(self):
+        """
+        Forget the saved session.
+        :return None
+        """
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def restore(self, driver, landing_pg):
+        """
+        Load the saved cookies into driver and navigate to landing_pg.
+        :param driver     : Selenium webdriver
+        :param landing_pg : string url of the page to finish on
+        :return bool True if the session is still logged on else False
+        """
+        cookies = self.load()
+        if not cookies:
+            return False
+        # cookies can only be added for the domain the driver is on
+        driver.get(self.config.LOGIN_PAGE)
+        for cookie in cookies:
+            try:
+                driver.add_cookie(cookie)
+            except Exception:  # selenium rejects cookies for other domains, skip them
+                continue
+        driver.get(landing_pg)
+        if self.is_logged_on(driver):
+            return True
+        self.clear()
+        return False
+
+    def is_logged_on(self, driver):
+        """
+        An expired session is sent back to the logon form so look for its username field.
+        :param driver : Selenium webdriver
+        :return bool
+        """
+        return is_logged_on(self.config, driver)
+
+
+def is_logged_on(config, driver):
+    """
+    True if driver is past the logon form, which is shown instead of any page of the site until the driver logs on.
+    :param config : ConfigXX file tailored to each config
+    :param driver : Selenium webdriver
+    :return bool
+    """
+    return f'name="{config.USERNAME_FIELD}"' not in driver.page_source
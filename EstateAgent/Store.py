@@ -0,0 +1,285 @@
+import contextlib
+import datetime as dt
+import json
+import os
+import sqlite3
+
+from EstateAgent import Classes
+
+DB_PATH = os.path.join(os.path.expanduser("~"), ".EstateAgent", "jobs.db")
+BATCH_SIZE = 500  # jobs written per executemany
+MAX_VARIABLES = 900  # stay under SQLite's limit on ? placeholders in one statement
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS address (
+    id          INTEGER PRIMARY KEY,
+    street      TEXT NOT NULL,
+    postcode    TEXT NOT NULL,
+    UNIQUE (street, postcode)
+);
+CREATE INDEX IF NOT EXISTS address_postcode ON address (postcode);
+
+CREATE TABLE IF NOT EXISTS agent (
+    id          INTEGER PRIMARY KEY,
+    branch      TEXT NOT NULL,
+    name_1      TEXT NOT NULL,
+    name_2      TEXT NOT NULL,
+    phone_1     TEXT NOT NULL,
+    phone_2     TEXT NOT NULL,
+    phone_3     TEXT NOT NULL,
+    UNIQUE (branch, name_1, name_2, phone_1, phone_2, phone_3)
+);
+
+CREATE TABLE IF NOT EXISTS job (
+    id              TEXT PRIMARY KEY,
+    client          TEXT,
+    agent_id        INTEGER REFERENCES agent (id),
+    property_type   TEXT,
+    beds            TEXT,
+    folder          TEXT,
+    floorplan       INTEGER,
+    photos          INTEGER,
+    status          INTEGER,
+    notes           TEXT,
+    specific_reqs   TEXT,
+    system_notes    TEXT
+);
+CREATE INDEX IF NOT EXISTS job_client ON job (client);
+CREATE INDEX IF NOT EXISTS job_status ON job (status);
+
+CREATE TABLE IF NOT EXISTS vendor (
+    job_id      TEXT PRIMARY KEY REFERENCES job (id),
+    name_1      TEXT,
+    name_2      TEXT,
+    phone_1     TEXT,
+    phone_2     TEXT,
+    phone_3     TEXT,
+    notes       TEXT
+);
+
+CREATE TABLE IF NOT EXISTS appointment (
+    job_id      TEXT PRIMARY KEY REFERENCES job (id),
+    date        TEXT,
+    address_id  INTEGER REFERENCES address (id)
+);
+CREATE INDEX IF NOT EXISTS appointment_date ON appointment (date);
+"""
+
+JOB_COLUMNS = ("id", "client", "agent_id", "property_type", "beds", "folder", "floorplan", "photos", "status", "notes",
+               "specific_reqs", "system_notes")
+VENDOR_COLUMNS = ("job_id", "name_1", "name_2", "phone_1", "phone_2", "phone_3", "notes")
+APPOINTMENT_COLUMNS = ("job_id", "date", "address_id")
+
+
+def _upsert(table, columns, key):
+    """
+    Build an INSERT that updates the existing row when key is already there.
+    :param table   : string
+    :param columns : tuple of column names
+    :param key     : string primary key column
+    :return string SQL
+    """
+    updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column != key)
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) " \
+        f"ON CONFLICT ({key}) DO UPDATE SET {updates}"
+
+
+class JobStore:
+    """
+    Local SQLite store of Job objects.
+    Jobs are written with batched upserts, all in one transaction or one transaction per batch when streamed.
+    Agents and Addresses are stored once and shared between jobs. Indexed on job id, client, status, appointment date
+    and postcode.
+    """
+
+    def __init__(self, path=DB_PATH):
+        """
+        :param path : database file. ":memory:" for a throwaway store
+        :return: None
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path, isolation_level=None)  # transactions are managed explicitly
+        self.connection.executescript(SCHEMA)
+        self._ids = {"address": {}, "agent": {}}  # {table : {natural key : row id}} saves a lookup per job
+
+    def close(self):
+        self.connection.close()
+
+    def upsert_jobs(self, jobs, batch_size=BATCH_SIZE):
+        """
+        Insert or update jobs in a single transaction.
+        :param jobs       : iterable of Job objects. Jobs without an id can't be keyed and are skipped
+        :param batch_size : int jobs per batch
+        :return int number of jobs written
+        """
+        count = 0
+        batch = []
+        with self._transaction():
+            for job in jobs:
+                if job.id is None:
+                    continue
+                batch.append(job)
+                if len(batch) >= batch_size:
+                    self._write(batch)
+                    count += len(batch)
+                    batch = []
+            self._write(batch)
+        return count + len(batch)
+
+    def upsert_iter(self, jobs, batch_size=BATCH_SIZE):
+        """
+        As upsert_jobs but pass each Job on as it arrives so it can sit in a streaming pipeline.
+        Each batch is committed in its own transaction so none is left open while the consumer has the job. If the
+        consumer stops early the jobs it was given are still written. If jobs raises, the jobs of the unfinished batch
+        are dropped and the batches already committed are kept.
+        :param jobs       : iterable of Job objects
+        :param batch_size : int jobs per batch
+        :return generator of the Job objects written
+        """
+        batch = []
+        try:
+            for job in jobs:
+                if job.id is None:
+                    continue
+                batch.append(job)
+                if len(batch) >= batch_size:
+                    with self._transaction():
+                        self._write(batch)
+                    batch = []
+                yield job
+        except GeneratorExit:
+            with self._transaction():
+                self._write(batch)
+            raise
+        with self._transaction():
+            self._write(batch)
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """
+        Commit the writes made in the body of a with statement, or roll them all back if it raises.
+        :return context manager
+        """
+        self.connection.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            self._ids = {"address": {}, "agent": {}}  # rolled back rows no longer exist
+            raise
+        self.connection.execute("COMMIT")
+
+    def _write(self, jobs):
+        """
+        Write one batch of jobs.
+        :param jobs : list of Job objects with ids
+        :return None
+        """
+        if not jobs:
+            return
+        addresses = self._row_ids("address", ("street", "postcode"),
+                                  [self._address_key(job.appointment.address) for job in jobs])
+        agents = self._row_ids("agent", ("branch", "name_1", "name_2", "phone_1", "phone_2", "phone_3"),
+                               [self._agent_key(job.agent) for job in jobs])
+        self.connection.executemany(_upsert("job", JOB_COLUMNS, "id"), [
+                (job.id, job.client_name(), agents.get(self._agent_key(job.agent)), job.property_type,
+                 None if job.beds is None else str(job.beds), job.folder, int(bool(job.floorplan)), job.photos,
+                 job.status, json.dumps(job.notes), json.dumps(job.specific_reqs), json.dumps(job.system_notes))
+                for job in jobs])
+        self.connection.executemany(_upsert("vendor", VENDOR_COLUMNS, "job_id"), [
+                (job.id, job.vendor.name_1, job.vendor.name_2, job.vendor.phone_1, job.vendor.phone_2,
+                 job.vendor.phone_3, job.vendor.notes) for job in jobs if job.vendor is not None])
+        # a job whose vendor is no longer known mustn't be loaded with the last one stored
+        self.connection.executemany("DELETE FROM vendor WHERE job_id = ?",
+                                    [(job.id,) for job in jobs if job.vendor is None])
+        self.connection.executemany(_upsert("appointment", APPOINTMENT_COLUMNS, "job_id"), [
+                (job.id, job.appointment.date.isoformat(sep=" ") if job.appointment.date else None,
+                 addresses.get(self._address_key(job.appointment.address))) for job in jobs])
+
+    def _row_ids(self, table, columns, keys):
+        """
+        Insert any new natural keys into a shared table and return the row ids of all of them.
+        :param table   : string "address" or "agent"
+        :param columns : tuple of natural key columns
+        :param keys    : list of natural key tuples, None where the job has no such object
+        :return dict {natural key : row id}
+        """
+        known = self._ids[table]
+        new = list({key for key in keys if key is not None and key not in known})
+        if new:
+            self.connection.executemany(
+                    f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                    new)
+            # read the ids back in chunks small enough for the placeholder limit
+            chunk = MAX_VARIABLES // len(columns)
+            row = f"({', '.join('?' * len(columns))})"
+            for i in range(0, len(new), chunk):
+                part = new[i:i + chunk]
+                sql = f"SELECT id, {', '.join(columns)} FROM {table} " \
+                    f"WHERE ({', '.join(columns)}) IN (VALUES {', '.join([row] * len(part))})"
+                for found in self.connection.execute(sql, [value for key in part for value in key]):
+                    known[tuple(found[1:])] = found[0]
+        return known
+
+    @staticmethod
+    def _address_key(address):
+        if address is None or not (address.street or address.postcode):
+            return None
+        return address.street or "", address.postcode or ""
+
+    @staticmethod
+    def _agent_key(agent):
+        if agent is None:
+            return None
+        return tuple(value or "" for value in
+                     (agent.branch, agent.name_1, agent.name_2, agent.phone_1, agent.phone_2, agent.phone_3))
+
+    def load_jobs(self, client=None, status=None):
+        """
+        Read jobs back out of the store.
+        :param client : string ConfigXX.CLIENT to filter on or None for all clients
+        :param status : Job.ACTIVE or Job.ARCHIVED to filter on or None for both
+        :return list of Job objects
+        """
+        sql = """
+            SELECT job.id, job.client, job.property_type, job.beds, job.folder, job.floorplan, job.photos, job.status,
+                   job.notes, job.specific_reqs, job.system_notes,
+                   agent.branch, agent.name_1, agent.name_2, agent.phone_1, agent.phone_2, agent.phone_3,
+                   vendor.name_1, vendor.name_2, vendor.phone_1, vendor.phone_2, vendor.phone_3, vendor.notes,
+                   appointment.date, address.street, address.postcode
+            FROM job
+            LEFT JOIN agent ON agent.id = job.agent_id
+            LEFT JOIN vendor ON vendor.job_id = job.id
+            LEFT JOIN appointment ON appointment.job_id = job.id
+            LEFT JOIN address ON address.id = appointment.address_id
+            WHERE (:client IS NULL OR job.client = :client) AND (:status IS NULL OR job.status = :status)
+            ORDER BY job.id"""
+        return [self._job(row) for row in self.connection.execute(sql, {"client": client, "status": status})]
+
+    @staticmethod
+    def _job(row):
+        """
+        Rebuild a Job from a row of load_jobs.
+        :param row : tuple
+        :return Job object
+        """
+        (id_, client, property_type, beds, folder, floorplan, photos, status, notes, specific_reqs, system_notes,
+         branch, agent_1, agent_2, agent_tel_1, agent_tel_2, agent_tel_3,
+         vendor_1, vendor_2, vendor_tel_1, vendor_tel_2, vendor_tel_3, vendor_notes, date, street, postcode) = row
+        agent = None
+        if branch is not None:
+            agent = Classes.Agent.interned(name_1=agent_1 or None, name_2=agent_2 or None,
+                                           phone_1=agent_tel_1 or None, phone_2=agent_tel_2 or None,
+                                           phone_3=agent_tel_3 or None, branch=branch or None)
+        vendor = None
+        if vendor_1 is not None or vendor_tel_1 is not None:
+            vendor = Classes.Vendor(vendor_1, vendor_2, vendor_tel_1, vendor_tel_2, vendor_tel_3, vendor_notes)
+        address = Classes.Address(street or None, postcode or None) if street or postcode else Classes.Address(None)
+        appointment = Classes.Appointment(address, dt.datetime.fromisoformat(date) if date else None)
+        job = Classes.Job(id_=id_, client=client, agent=agent, vendor=vendor, beds=beds, property_type=property_type,
+                          appointment=appointment, folder=folder, notes=json.loads(notes), floorplan=bool(floorplan),
+                          photos=photos, specific_reqs=json.loads(specific_reqs),
+                          system_notes=json.loads(system_notes))
+        job.status = status
+        return job
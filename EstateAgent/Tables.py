@@ -0,0 +1,78 @@
+"""Read html tables straight from BeautifulSoup into lists and dicts.
+A lightweight replacement for pandas.read_html on tables the scrapers already hold as parsed Tags.
+"""
+
+
+def find_tables(source):
+    """
+    Find all <table> tags in source.
+    :param source : BeautifulSoup Tag, html string, list of either or None
+    :return list of BeautifulSoup Tags
+    """
+    if source is None:
+        return []
+    if isinstance(source, str):
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(source, 'lxml').find_all("table")
+    if isinstance(source, (list, tuple)):  # includes bs4 ResultSet
+        return [table for item in source for table in find_tables(item)]
+    return [source] if source.name == "table" else source.find_all("table")
+
+
+def cell_text(cell):
+    """
+    Text of a table cell with runs of whitespace collapsed to a single space, as pandas.read_html gives it.
+    :param cell : BeautifulSoup Tag <td> or <th>
+    :return string
+    """
+    return " ".join(cell.get_text().split())
+
+
+def table_rows(table):
+    """
+    Read every row of a table that has cells. Rows of nested tables are not included.
+    :param table : BeautifulSoup Tag <table>
+    :return list [(<tr> Tag, [cell text])]
+    """
+    rows = []
+    for tr in table.find_all("tr"):
+        if tr.find_parent("table") is not table:
+            continue
+        cells = tr.find_all(["td", "th"], recursive=False)
+        if cells:
+            rows.append((tr, [cell_text(cell) for cell in cells]))
+    return rows
+
+
+def read_table(source, header=0):
+    """
+    Read the first table in source into a list of row dicts keyed by the header row.
+    :param source : anything find_tables accepts
+    :param header : int index of the header row
+    :return list [{heading : cell text}]
+    :raise ValueError if there is no table, as pandas.read_html does
+    """
+    try:
+        rows = [cells for _, cells in table_rows(find_tables(source)[0])]
+    except IndexError:
+        raise ValueError("No tables found")
+    try:
+        headings = rows[header]
+    except IndexError:
+        return []
+    return [dict(zip(headings, cells)) for cells in rows[header + 1:]]
+
+
+def read_key_values(source):
+    """
+    Read tables laid out as one key/value pair per row (first cell key, second cell value) into a single dict.
+    Where a key appears more than once the first value is kept.
+    :param source : anything find_tables accepts
+    :return dict {key : value}
+    """
+    pairs = {}
+    for table in find_tables(source):
+        for _, cells in table_rows(table):
+            if len(cells) > 1:
+                pairs.setdefault(cells[0], cells[1])
+    return pairs
@@ -0,0 +1,86 @@
+import time
+
+
+class PageNotReady(LookupError):
+    """
+    Raised when a page's REQUIRED elements don't appear within the timeout, e.g. the site sent back an error page.
+    """
+
+
+class PageReadiness:
+    """
+    Wait explicitly for the elements ConfigXX.PAGE_READY lists for each page instead of relying on implicit waits.
+    REQUIRED elements are waited for up to the timeout. OPTIONAL elements are looked for once the required ones are
+    there and never waited for, so absent optional data costs nothing.
+    Records how long each page took to become ready so slow pages can be told apart from missing data.
+    """
+
+    TIMEOUT = 10  # seconds
+
+    def __init__(self, config, timeout=TIMEOUT):
+        """
+        :param config  : ConfigXX file tailored to each config
+        :param timeout : default seconds to wait for required elements. 0 to look once without waiting, as for a
+                         Replay.ReplayDriver whose pages are always fully loaded
+        :return: None
+        """
+        self.pages = getattr(config, "PAGE_READY", {})
+        self.timeout = timeout
+        self.latency = {}  # {page : [seconds to ready]}
+        self.timeouts = {}  # {page : count of pages whose required elements never appeared}
+        self.missing = {}  # {page : {optional locator value : count of pages it was absent from}}
+
+    def wait(self, driver, page, timeout=None):
+        """
+        Wait until page is ready to be read.
+        :param driver  : Selenium webdriver
+        :param page    : string key of ConfigXX.PAGE_READY
+        :param timeout : seconds to wait for required elements. Defaults to self.timeout
+        :return dict {optional locator value : bool present}
+        :raise PageNotReady if a required element never appeared
+        """
+        spec = self.pages.get(page, {})
+        start = time.perf_counter()
+        try:
+            for by, value in spec.get("REQUIRED", []):
+                self.find(driver, by, value, timeout)
+        except PageNotReady as e:
+            self.timeouts[page] = self.timeouts.get(page, 0) + 1
+            self.latency.setdefault(page, []).append(time.perf_counter() - start)
+            raise PageNotReady(f"{page} not ready: {e}") from e
+        present = {value: bool(driver.find_elements(by, value)) for by, value in spec.get("OPTIONAL", [])}
+        missing = self.missing.setdefault(page, {})
+        for value in (value for value, found in present.items() if not found):
+            missing[value] = missing.get(value, 0) + 1
+        self.latency.setdefault(page, []).append(time.perf_counter() - start)
+        return present
+
+    def find(self, driver, by, value, timeout=None):
+        """
+        Wait for an element to be present and return it.
+        :param driver  : Selenium webdriver
+        :param by      : string locator strategy ("id", "name", "xpath", "tag name")
+        :param value   : string locator
+        :param timeout : seconds to wait. Defaults to self.timeout
+        :return WebElement
+        :raise PageNotReady
+        """
+        elements = driver.find_elements(by, value)  # usually there already, so no need to start waiting
+        if elements:
+            return elements[0]
+        timeout = self.timeout if timeout is None else timeout
+        if timeout > 0:
+            from selenium.common.exceptions import TimeoutException
+            from selenium.webdriver.support.ui import WebDriverWait
+            try:
+                return WebDriverWait(driver, timeout).until(lambda d: d.find_elements(by, value))[0]
+            except TimeoutException:
+                pass
+        raise PageNotReady(f"no {by} {value!r} after {timeout}s")
+
+    def summary(self):
+        """
+        :return dict {page : (count, mean seconds to ready, max seconds to ready, timeouts)}
+        """
+        return {page: (len(times), sum(times) / len(times), max(times), self.timeouts.get(page, 0))
+                for page, times in self.latency.items()}
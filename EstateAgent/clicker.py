@@ -46,6 +46,6 @@ s = Scrapers.KaScraper()
 driver = s._logon(
         landing_pg="https://www.keyagent-portal.co.uk/Site/Dea/Dea.aspx?DEA=272ca14b-8535-453f-bf30-10e5c0318651&Quote"
                    "=8972d072-238a-4b2a-aaea-5dd7c8a53892&Logged=True")
-driver.implicitly_wait(30)
+s.readiness.wait(driver, "JOB_PAGE_BUTTONS", timeout=30)
 new_appt = datetime(2018, 12, 24, 13, 45)
 change_appt(new_appt)
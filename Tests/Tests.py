@@ -1,22 +1,53 @@
+import csv
+import io
+import json
+import os
+import pickle
+import tempfile
 import unittest
 
+from bs4 import BeautifulSoup
+
 from EstateAgent.Classes import *
 from EstateAgent.Parsers import *
 from EstateAgent.Scrapers import *
+from EstateAgent import Changes, Export, Geo, Metrics, Schedule, Store, Tables
 
+try:
+    import pyarrow.parquet
+except ImportError:  # only needed for the Parquet export
+    pyarrow = None
 
-def import_test_data():
-    # import test data
-    with open('obj/' + "job_dict_hs" + '.pkl', 'rb') as f:
-        hs = pickle.load(f)
-        # print(hs)
-    with open('obj/' + "job_dict_ka" + '.pkl', 'rb') as f:
-        ka = pickle.load(f)
-        # print(ka)
-        return hs, ka
+
+OBJ_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "obj")  # pages saved from the live sites
 
 
-JOB_DICT_HS, JOB_DICT_KA = import_test_data()
+def import_test_data():
+    """
+    Read the scraped job dicts pickled from the live sites. They hold customer details so aren't in the repository,
+    the tests that need them are skipped without them.
+    :return tuple (House Simple dict, KeyAgent dict)
+    """
+    try:
+        with open(os.path.join(OBJ_DIR, "job_dict_hs.pkl"), 'rb') as f:
+            hs = pickle.load(f)
+        with open(os.path.join(OBJ_DIR, "job_dict_ka.pkl"), 'rb') as f:
+            ka = pickle.load(f)
+    except FileNotFoundError as e:
+        raise unittest.SkipTest(f"no test data: {e.filename}")
+    return hs, ka
+
+
+def import_test_page(name):
+    """
+    :param name : file name of a page saved from the live sites into OBJ_DIR
+    :return BeautifulSoup
+    """
+    try:
+        with open(os.path.join(OBJ_DIR, name), "r") as f:
+            return BeautifulSoup(f, "lxml")
+    except FileNotFoundError as e:
+        raise unittest.SkipTest(f"no test page: {e.filename}")
 
 
 class TestAddress(unittest.TestCase):
@@ -27,6 +58,15 @@ class TestAddress(unittest.TestCase):
         self.assertEqual("MK5 1FZ", test_pc.__validate_postcode__("mk5 1Fz"))
         self.assertEqual(None, test_pc.__validate_postcode__("mk44FY"))
 
+    def test_set_addresses(self):
+        addresses = ["29, Test Street, Milton Keynes, MK4 4FY", "37 Testy Road,, MK41 5DA", ",, MK4 4FY", "No postcode"]
+        streets, postcodes = Parser.set_addresses(addresses)
+        self.assertEqual(["29, Test Street, Milton Keynes", "37 Testy Road", "", "No postcode"], streets)
+        self.assertEqual(["MK4 4FY", "MK41 5DA", "MK4 4FY", None], postcodes)
+        for address, street, postcode in zip(addresses, streets, postcodes):
+            a = Parser.set_address(address)
+            self.assertEqual((street, postcode), (a.street, a.postcode))
+
 
 class TestAppointment(unittest.TestCase):
     def test__validate_time__(self):
@@ -62,11 +102,32 @@ class TestClient(unittest.TestCase):
         ]
         for tel in tels:
             self.assertEqual(tel[1], test_client.validate_tel(tel[0]))
+        self.assertEqual([tel[1] for tel in tels], Client.validate_tels(tel[0] for tel in tels))
+
+    def test__validate_tel__invalid(self):
+        self.assertEqual([None, None, None, None], Client.validate_tels([None, "", "019085014", "08001234567"]))
+
+
+class TestJob(unittest.TestCase):
+    def test_fresh_defaults(self):
+        job_1, job_2 = Job(), Job()
+        job_1.set_appointment_address("29, Test Street", "MK4 4FY")
+        self.assertEqual(None, job_2.appointment.address.street)
+        self.assertIsNot(job_1.agent, job_2.agent)
+
+    def test_interned_agent(self):
+        self.assertIs(Agent.interned(branch="Connells", phone_1="01908 222 343"),
+                      Agent.interned(branch="Connells", phone_1="01908222343"))
+        self.assertIsNot(Agent.interned(branch="Connells"), Agent.interned(branch="Connells - Stony Stratford"))
+        agent = Agent.interned(branch="Connells", phone_1="01908 222 343")
+        self.assertIs(agent, Agent.intern(pickle.loads(pickle.dumps(agent))))
 
 
 class TestKaParser(unittest.TestCase):
-    test_parser = KaParser(Job(), JOB_DICT_KA)
-    test_parser.map_job()
+    @classmethod
+    def setUpClass(cls):
+        cls.test_parser = KaParser(import_test_data()[1])
+        cls.test_parser.map_job()
 
     def test_set_id(self):
         i = TestKaParser.test_parser._extract_id()
@@ -124,8 +185,10 @@ class TestKaParser(unittest.TestCase):
 
 
 class TestHsParser(unittest.TestCase):
-    test_parser = HsParser(Job(), JOB_DICT_HS)
-    test_parser.map_job()  # run this first to make the pandas dataframe table used to store all scraped data
+    @classmethod
+    def setUpClass(cls):
+        cls.test_parser = HsParser(import_test_data()[0])
+        cls.test_parser.map_job()  # run this first to make the table used to store all scraped data
 
     def test_set_id(self):
         i = TestHsParser.test_parser._extract_id()
@@ -147,20 +210,231 @@ class TestHsParser(unittest.TestCase):
         self.assertEqual("Sat 08 Dec @ 15:00", a.__str__())
 
 
+class TestTables(unittest.TestCase):
+    html = "<table><tr><th>Specific Requirement</th><th>Files required</th></tr>" \
+           "<tr><td> StreetScape </td><td>1</td></tr><tr><td>Garden</td><td>2</td></tr></table>" \
+           "<table><tr><td>Reference</td><td>HSS103120</td></tr><tr><td>Reference</td><td>ignored</td></tr></table>"
+
+    def test_read_table(self):
+        rows = Tables.read_table(TestTables.html)
+        self.assertEqual([{"Specific Requirement": "StreetScape", "Files required": "1"},
+                          {"Specific Requirement": "Garden", "Files required": "2"}], rows)
+        self.assertRaises(ValueError, Tables.read_table, None)
+
+    def test_read_key_values(self):
+        pairs = Tables.read_key_values(BeautifulSoup(TestTables.html, "lxml").find_all("table"))
+        self.assertEqual("HSS103120", pairs["Reference"])
+        self.assertEqual("1", pairs["StreetScape"])
+
+
+class TestJobStore(unittest.TestCase):
+    def test_upsert_jobs(self):
+        store = Store.JobStore(":memory:")
+        job = Job(id_="1000623765", client="KeyAGENT", agent=Agent(branch="Connells", phone_1="01908222343"),
+                  vendor=Vendor(name_1="Mrs Sue Blogs"), notes=["Take every angle."], specific_reqs={"StreetScape": 1},
+                  appointment=Appointment(Address("29, Test Street", "MK4 4FY"), dt.datetime(2019, 2, 8, 10, 0)))
+        self.assertEqual(1, store.upsert_jobs([job, Job()]))  # jobs without an id are skipped
+        job.photos = 20
+        store.upsert_jobs([job])
+        jobs = store.load_jobs(client="KeyAGENT")
+        self.assertEqual(1, len(jobs))
+        self.assertEqual(20, jobs[0].photos)
+        self.assertEqual("01908 222 343", jobs[0].agent.phone_1)
+        self.assertEqual("MK4 4FY", jobs[0].appointment.address.postcode)
+        self.assertEqual("Fri 08 Feb @ 10:00", str(jobs[0].appointment))
+        self.assertEqual({"StreetScape": 1}, jobs[0].specific_reqs)
+        job.vendor = None
+        store.upsert_jobs([job])
+        self.assertIsNone(store.load_jobs()[0].vendor)
+
+    def test_client(self):
+        store = Store.JobStore(":memory:")
+        store.upsert_jobs([Job(id_="X1"), Job(id_="X2", client=Client("Acme Lettings")), Job(id_="X3", client="KA")])
+        self.assertEqual([None, "Acme Lettings", "KA"], [job.client for job in store.load_jobs()])
+        for job in store.load_jobs():
+            self.assertEqual(job.client, Changes.job_fields(job)["client"])
+            self.assertEqual(job.client, Export.flatten_job(job)["client"])
+
+    def test_upsert_iter(self):
+        store = Store.JobStore(":memory:")
+        written = store.upsert_iter((Job(id_=str(i), client="KA") for i in range(5)), batch_size=2)
+        self.assertEqual(["0", "1", "2"], [next(written).id for _ in range(3)])
+        self.assertFalse(store.connection.in_transaction)  # nothing held open while the consumer has the job
+        written.close()  # stopping early keeps the jobs already passed on
+        self.assertEqual(["0", "1", "2"], [job.id for job in store.load_jobs()])
+
+        def failing():
+            yield from (Job(id_=str(i), client="KA") for i in range(5, 8))
+            raise ValueError("scrape failed")
+
+        self.assertRaises(ValueError, list, store.upsert_iter(failing(), batch_size=2))
+        self.assertEqual(["0", "1", "2", "5", "6"], [job.id for job in store.load_jobs()])
+
+
+class TestChanges(unittest.TestCase):
+    def test_compare(self):
+        def job(id_, hour, notes):
+            return Job(id_=id_, appointment=Appointment(Address("29 Test Street", "MK4 4FY"),
+                                                        dt.datetime(2019, 2, 8, hour)), system_notes=notes)
+
+        previous = [job("1", 10, [["08/02", "SC", "Confirmed"]]), job("2", 11, []), job("3", 12, [])]
+        current = [job("1", 14, [["08/02", "SC", "Confirmed"], ["09/02", "SC", "Changed"]]), job("2", 11, []),
+                   job("4", 9, [])]
+        changes = Changes.compare(previous, current)
+        self.assertEqual(["4"], [j.id for j in changes.added])
+        self.assertEqual(["3"], [j.id for j in changes.removed])
+        self.assertEqual(Job.ARCHIVED, changes.removed[0].status)
+        modified, fields = changes.modified[0]
+        self.assertEqual("1", modified.id)
+        self.assertEqual({"appointment", "system_notes"}, set(fields))
+        self.assertEqual({"1": [("09/02", "SC", "Changed")]}, changes.new_system_notes())
+        self.assertEqual(Changes.fingerprint(previous[1]), Changes.fingerprint(current[1]))
+
+
+class TestExport(unittest.TestCase):
+    job = Job(id_="1000623765", client="KA", agent=Agent(branch="Connells", phone_1="01908222343"),
+              appointment=Appointment(Address("29, Test Street", "MK4 4FY"), dt.datetime(2019, 2, 8, 10)),
+              specific_reqs={"StreetScape": 1}, system_notes=[["08/02/2019 10:00", "Steve", "Changed"]])
+
+    def test_write_jsonl(self):
+        file = io.StringIO()
+        self.assertEqual(2, Export.write_jsonl(iter([self.job, Job(id_="2", agent=None)]), file))
+        row = json.loads(file.getvalue().splitlines()[0])
+        self.assertEqual("01908 222 343", row["agent_phone_1"])
+        self.assertEqual("2019-02-08 10:00:00", row["appointment"])
+        self.assertEqual([["08/02/2019 10:00", "Steve", "Changed"]], row["system_notes"])
+
+    def test_write_csv(self):
+        file = io.StringIO()
+        Export.write_csv([self.job], file)
+        row = next(csv.DictReader(io.StringIO(file.getvalue())))
+        self.assertEqual(list(Export.COLUMNS), list(row))
+        self.assertEqual("MK4 4FY", row["postcode"])
+        self.assertEqual({"StreetScape": 1}, json.loads(row["specific_reqs"]))
+
+    def test_to_frame(self):
+        frame = Export.to_frame([self.job, Job(id_="2", agent=None)])
+        self.assertEqual(list(Export.COLUMNS), list(frame.columns))
+        self.assertEqual(["int64", "bool", "int64"], [str(frame[column].dtype) for column in Export.DTYPES])
+        self.assertEqual("datetime64", str(frame["appointment"].dtype)[:10])
+        self.assertEqual(dt.datetime(2019, 2, 8, 10), frame["appointment"][0])
+        self.assertTrue(frame["appointment"].isna()[1])
+        self.assertEqual("01908 222 343", frame["agent_phone_1"][0])
+        empty = Export.to_frame([])
+        self.assertEqual((0, len(Export.COLUMNS)), empty.shape)
+
+    def test_iter_frames(self):
+        jobs = [Job(id_=str(n)) for n in range(5)]
+        frames = list(Export.iter_frames(iter(jobs), chunk_size=2))
+        self.assertEqual([2, 2, 1], [len(frame) for frame in frames])
+        self.assertEqual(["4"], list(frames[-1]["id"]))
+        self.assertEqual([], list(Export.iter_frames([], chunk_size=2)))
+
+    @unittest.skipUnless(pyarrow, "needs pyarrow")
+    def test_write_parquet(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "jobs.parquet")
+            jobs = [self.job] + [Job(id_=str(n), agent=None) for n in range(4)]
+            self.assertEqual(5, Export.write_parquet(iter(jobs), path, chunk_size=2))
+            file = pyarrow.parquet.ParquetFile(path)
+            self.assertEqual(3, file.num_row_groups)
+            frame = file.read().to_pandas()
+        self.assertEqual(list(Export.COLUMNS), list(frame.columns))
+        self.assertEqual(["1000623765", "0", "1", "2", "3"], list(frame["id"]))
+        self.assertEqual(dt.datetime(2019, 2, 8, 10), frame["appointment"][0])
+        self.assertEqual("int64", str(frame["photos"].dtype))
+
+
+class TestSchedule(unittest.TestCase):
+    @staticmethod
+    def job(id_, client, hour, minute=0):
+        appointment = Appointment(Address(None), dt.datetime(2019, 2, 8, hour, minute))
+        return Job(id_=id_, client=client, beds="3", photos=10, appointment=appointment)  # 70 minutes
+
+    def test_appointment_index(self):
+        index = Schedule.AppointmentIndex([self.job("1", "KA", 10), self.job("2", "HS", 10, 30),
+                                           self.job("3", "KA", 11), self.job("4", "KA", 15)])
+        self.assertEqual(["1", "2", "3", "4"], [job.id for job in index.on_day(dt.date(2019, 2, 8))])
+        self.assertEqual(["2", "3"], [job.id for job in index.overlapping(dt.datetime(2019, 2, 8, 11, 30),
+                                                                           dt.datetime(2019, 2, 8, 12))])
+        self.assertEqual(dt.datetime(2019, 2, 8, 12, 10),
+                         index.first_free_slot(dt.timedelta(hours=1), dt.datetime(2019, 2, 8, 10)))
+        self.assertEqual([("1", "2"), ("2", "3")], [(a.id, b.id) for a, b in index.clashes()])
+        index.apply(Changes.ChangeSet(modified=[(self.job("2", "HS", 13), {})]))
+        self.assertEqual([], index.clashes())
+
+
+class TestGeo(unittest.TestCase):
+    centroids = {"MK4 4FY": (52.0175, -0.7924), "MK41 5DA": (52.1602, -0.4518), "MK11 1AA": (52.0565, -0.8529),
+                 "SW1A 1AA": (51.5010, -0.1416)}
+
+    @staticmethod
+    def job(id_, postcode):
+        return Job(id_=id_, appointment=Appointment(Address("Test Street", postcode)))
+
+    def test_job_map(self):
+        jobs = [self.job("1", "MK4 4FY"), self.job("2", "MK41 5DA"), self.job("3", "MK11 1AA"),
+                self.job("4", "SW1A 1AA"), self.job("5", "MK5 1FZ")]
+        job_map = Geo.JobMap(jobs, self.centroids)
+        self.assertEqual(["5"], [job.id for job in job_map.unplaced])
+        self.assertEqual(["3", "2"], [job.id for job, _ in job_map.nearest(jobs[0], k=2)])
+        self.assertEqual(["1", "3"], [job.id for job, _ in job_map.within("mk44fy", 10)])
+        self.assertEqual(["4", "1", "3", "2", "5"], [job.id for job in job_map.route(jobs, start="SW1A 1AA")])
+
+
+class TestMetrics(unittest.TestCase):
+    def test_metrics(self):
+        metrics = Metrics.Metrics("KeyAGENT")
+        for seconds in (0.0005, 0.003, 0.02, 0.02, 2.0):
+            metrics.observe("soup", seconds)
+        with metrics.stage("parse"):
+            pass
+        metrics.fields({"JOB_DATA_ID": "1", "JOB_DATA_AGENT": None})
+        metrics.job(Job(id_="1", appointment=Appointment(Address("Test Street", None))))
+        summary = metrics.summary()
+        self.assertEqual(5, summary["stages"]["soup"]["count"])
+        self.assertAlmostEqual(0.01375, summary["stages"]["soup"]["p50"])
+        self.assertEqual(1, summary["stages"]["parse"]["count"])
+        self.assertEqual({"JOB_DATA_AGENT": 1, "job.appointment": 1, "job.postcode": 1}, summary["failures"])
+        text = metrics.to_prometheus()
+        self.assertIn('estateagent_stage_seconds_bucket{client="KeyAGENT",stage="soup",le="0.005"} 2', text)
+        self.assertIn('estateagent_stage_seconds_count{client="KeyAGENT",stage="soup"} 5', text)
+        self.assertIn('estateagent_field_failures_total{client="KeyAGENT",field="JOB_DATA_AGENT"} 1', text)
+        self.assertEqual(["+Inf", 5], json.loads(metrics.to_json())["stages"]["soup"]["buckets"][-1])
+
+    def test_merge(self):
+        metrics = Metrics.Metrics("KeyAGENT")
+        metrics.observe("soup", 0.003)
+        worker = Metrics.Metrics()
+        worker.observe("soup", 0.02)
+        worker.observe("parse", 0.004)
+        worker.failure("JOB_DATA_AGENT")
+        metrics.merge(pickle.loads(pickle.dumps(worker)))  # as sent back from a parse worker process
+        summary = metrics.summary()
+        self.assertEqual(2, summary["stages"]["soup"]["count"])
+        self.assertAlmostEqual(0.023, summary["stages"]["soup"]["total"])
+        self.assertEqual(1, summary["stages"]["parse"]["count"])
+        self.assertEqual({"JOB_DATA_AGENT": 1}, summary["failures"])
+
+    def test_null_metrics(self):
+        with Metrics.NULL.stage("parse"):
+            Metrics.NULL.failure("JOB_DATA_ID")
+        Metrics.NULL.save("never_written.json")
+        self.assertFalse(os.path.exists("never_written.json"))
+
+
 class TestHsScraper(unittest.TestCase):
     s = HsScraper()
 
     def test__get_job_links__(self):
         test_link = '<a href="https://www.housesimple.com/admin/home-visit-supplier/303133/show">'
-        with open("G:/EstateAgent/Tests/obj/HS_dashboard.html", "r") as f:
-            html = BeautifulSoup(f, "lxml")
+        html = import_test_page("HS_dashboard.html")
         links = TestHsScraper.s.extract_job_links(html)
         self.assertIn(test_link, str(links[0]))
 
     def test__get_page_fields__(self):
         test_string = "Northamptonshire, NN5 5DA"
-        with open("G:/EstateAgent/Tests/obj/HS_job_page.html", "r") as f:
-            html = BeautifulSoup(f, "lxml")
+        html = import_test_page("HS_job_page.html")
         job_dict = TestHsScraper.s._extract_page_fields(html)
         self.assertIn(test_string, str(job_dict["JOB_DATA_TABLE"][0]))
 
@@ -170,8 +444,7 @@ class TestKaScraper(unittest.TestCase):
 
     def test__get_job_links__(self):
         test_link = "javascript:__doPostBack('ctl00$text$GridViewOutstandingCases','Select$0')"
-        with open("G:/EstateAgent/Tests/obj/KA_Welcome_page.html", "r") as f:
-            html = BeautifulSoup(f, "lxml")
+        html = import_test_page("KA_Welcome_page.html")
         links = TestKaScraper.s.extract_job_links(html)
         self.assertIn(test_link, str(links[0]))
 
@@ -180,8 +453,7 @@ class TestKaScraper(unittest.TestCase):
         date_test = "Fri-08 Feb 19 0000"
         history_test = "THIS IS A PLACEHOLDER APPOINTMENT"
 
-        with open("G:/EstateAgent/Tests/obj/KA_job_page.html", "r") as f:
-            html = BeautifulSoup(f, "lxml")
+        html = import_test_page("KA_job_page.html")
         job_dict = TestKaScraper.s._extract_page_fields(html)
         self.assertEqual(job_dict["JOB_DATA_AGENT"], agent_test)
         self.assertEqual(job_dict["JOB_DATA_APPOINTMENT"], date_test)
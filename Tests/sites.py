@@ -0,0 +1,91 @@
+"""
+Small hand built copies of the client sites for tests that drive the scrapers without a browser.
+"""
+import re
+
+from bs4 import BeautifulSoup
+
+from EstateAgent import ConfigKA, Replay
+
+KA_GRID = "ctl00$text$GridViewOutstandingCases"
+
+
+def ka_landing_page(references):
+    """
+    KeyAgent landing page listing one job per reference. Rows are selected by position as on the real site.
+    :param references : list of job reference strings
+    :return string : html
+    """
+    rows = "".join(f"<tr><td><a href=\"javascript:__doPostBack('{KA_GRID}','Select${i}')\">Select</a></td>"
+                   f"<td>{reference}</td><td>1 Test Street, Milton Keynes, MK4 4FY</td></tr>"
+                   for i, reference in enumerate(references))
+    return f'<html><body><table id="{KA_GRID.replace("$", "_")}">' \
+           f'<tr><th></th><th>Hipref</th><th>Address</th></tr>{rows}</table></body></html>'
+
+
+def ka_links(html):
+    """
+    :param html : string KeyAgent landing page
+    :return list : BeautifulSoup <a> tags pointing to job pages
+    """
+    return BeautifulSoup(html, "lxml").find_all('a', href=re.compile(ConfigKA.REGEXP["JOB_PAGE_LINK"]))
+
+
+def login_form(config):
+    """
+    :param config : ConfigXX file
+    :return string : html logon form with the fields Scraper._logon fills in
+    """
+    return f'<html><body><form><input name="{config.USERNAME_FIELD}"><input name="{config.PASSWORD_FIELD}">' \
+           f'<input name="{config.LOGIN_BUTTON}"></form></body></html>'
+
+
+def ka_job_page(reference):
+    """
+    KeyAgent job page with every ConfigKA.JOB_PAGE_DATA field and JOB_PAGE_TABLES table.
+    :param reference : string job reference
+    :return string : html
+    """
+    ids = ConfigKA.JOB_PAGE_DATA
+    fields = {
+            "JOB_DATA_AGENT":               "Mr Joe Blogs of Connells - Bedford  MOB:07777 123456  TEL:01234 "
+                                            "567890  EVE:N/A",
+            "JOB_DATA_VENDOR":              f"Mrs Sue Brown DAY: 01908 501401  MOB: N/A  EVE: N/A  Email: "
+                                            f"vendor{reference}@example.com",
+            "JOB_DATA_FLOORPLAN":           "Yes",
+            "JOB_DATA_PHOTOS":              "Up to 12 photos",
+            "JOB_DATA_PROPERTY_TYPE":       "House",
+            "JOB_DATA_BEDS":                "3",
+            "JOB_DATA_NOTES":               "Agency Branch: Connells - Bedford\nVendor has a dog",
+            "JOB_DATA_BRANCH_NOTES":        "",
+            "JOB_DATA_SENT":                "01/02/2019",
+            "JOB_DATA_CONFIRMED":           "02/02/2019",
+            "JOB_DATA_APPOINTMENT":         "Mon-04 Feb 19 1030",
+            "JOB_DATA_APPOINTMENT_ADDRESS": "29, Test Street, Milton Keynes, MK4 4FY",
+            "JOB_DATA_ID":                  reference
+    }
+    body = "".join(f'<textarea id="{ids[key]}">{value}</textarea>' if key == "JOB_DATA_NOTES" else
+                   f'<span id="{ids[key]}">{value}</span>' for key, value in fields.items())
+    tables = ConfigKA.JOB_PAGE_TABLES
+    body += f'<table id="{tables["JOB_DATA_SPECIFIC_REQS_TABLE"]}"><tr><th>Specific Requirement</th>' \
+            f'<th>Files required</th></tr><tr><td>Garden</td><td>2</td></tr></table>'
+    body += f'<table id="{tables["JOB_DATA_HISTORY_TABLE"]}"><tr><th>Date Created</th><th>Created By</th>' \
+            f'<th>Note</th></tr><tr><td>02/02/2019 09:00</td><td>Steve Caballero</td>' \
+            f'<td>The Supplier has confirmed the Appointment</td></tr></table>'
+    return f"<html><body><form>{body}</form></body></html>"
+
+
+def ka_capture(path, references):
+    """
+    Capture a KeyAgent site listing references for KaScraper(replay=path).
+    :param path       : capture directory
+    :param references : list of job reference strings
+    :return Replay.Capture
+    """
+    capture = Replay.Capture(path)
+    landing = ka_landing_page(references)
+    capture.add(login_form(ConfigKA), url=ConfigKA.LOGIN_PAGE)
+    capture.add(landing, url=ConfigKA.LANDING_PAGE)
+    for link, reference in zip(ka_links(landing), references):
+        capture.add(ka_job_page(reference), href=link["href"])
+    return capture
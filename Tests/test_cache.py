@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from EstateAgent.Classes import Job
+from EstateAgent.Scrapers import KaScraper
+from Tests import sites
+
+
+class TestIncremental(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.TemporaryDirectory()
+        self.visited = []
+
+    def tearDown(self):
+        self.path.cleanup()
+
+    def scrape(self, references):
+        # job pages are "visited" by reading the reference out of the landing page row the link sits in
+        def extract_job(link, driver=None):
+            reference = link.find_parent("tr").find_all("td")[1].get_text()
+            self.visited.append(reference)
+            return Job(id_=reference)
+
+        scraper = KaScraper(incremental=True, cache_path=os.path.join(self.path.name, "cache.pkl"))
+        scraper.extract_job = extract_job
+        del self.visited[:]
+        return [job.id for job in scraper.extract_jobs_incremental(sites.ka_links(sites.ka_landing_page(references)))]
+
+    def test_first_run(self):
+        self.assertEqual(["KA1", "KA2"], self.scrape(["KA1", "KA2"]))
+        self.assertEqual(["KA1", "KA2"], self.visited)
+
+    def test_unchanged(self):
+        self.scrape(["KA1", "KA2"])
+        self.assertEqual(["KA1", "KA2"], self.scrape(["KA1", "KA2"]))
+        self.assertEqual([], self.visited)
+
+    def test_appended(self):
+        self.scrape(["KA1", "KA2"])
+        self.assertEqual(["KA1", "KA2", "KA3"], self.scrape(["KA1", "KA2", "KA3"]))
+        self.assertEqual(["KA3"], self.visited)
+
+    def test_inserted_at_top(self):
+        self.scrape(["KA1", "KA2"])
+        # every row below moves down one so their Select$N links change
+        self.assertEqual(["KA0", "KA1", "KA2"], self.scrape(["KA0", "KA1", "KA2"]))
+        self.assertEqual(["KA0"], self.visited)
+
+    def test_removed(self):
+        self.scrape(["KA1", "KA2", "KA3"])
+        self.assertEqual(["KA2", "KA3"], self.scrape(["KA2", "KA3"]))
+        self.assertEqual([], self.visited)
+
+
+if __name__ == '__main__':
+    unittest.main()
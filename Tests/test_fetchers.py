@@ -0,0 +1,93 @@
+import tempfile
+import threading
+import unittest
+
+import requests
+from bs4 import BeautifulSoup
+
+from EstateAgent import Fetchers, Replay
+from EstateAgent.Scrapers import SCRAPERS, KaScraper
+from Benchmarks import portal
+from Tests import sites
+
+
+class Browser:
+    # stands in for the webdriver HttpFetcher copies its session from, logged on to a portal over plain HTTP
+    def __init__(self, config, logon=True):
+        session = requests.Session()
+        if logon:
+            session.post(config.LOGIN_PAGE, data={config.USERNAME_FIELD: config.USERNAME,
+                                                  config.PASSWORD_FIELD: config.PASSWORD, config.LOGIN_BUTTON: "Log in"})
+        self.page_source = session.get(config.LANDING_PAGE).text
+        self.current_url = config.LANDING_PAGE
+        self.cookies = [{"name": c.name, "value": c.value, "domain": c.domain, "path": c.path} for c in session.cookies]
+        session.close()
+
+    def execute_script(self, script, *args):
+        return "Mozilla/5.0"
+
+    def get_cookies(self):
+        return self.cookies
+
+
+class TestHttpFetcher(unittest.TestCase):
+    def fetch(self, kind, jobs=6):
+        with portal.PORTALS[kind](jobs=jobs) as site:
+            config = site.local_config()
+            browser = Browser(config)
+            fetcher = Fetchers.HttpFetcher(config, browser)
+            links = SCRAPERS[kind]().job_links(BeautifulSoup(browser.page_source, "lxml"))
+            self.assertTrue(links)
+            pages = [None] * len(links)
+
+            def share(i):
+                # each pool driver fetches every other page on its own thread
+                for n in range(i, len(links), 2):
+                    pages[n] = fetcher.fetch(links[n])
+
+            threads = [threading.Thread(target=share, args=(i,)) for i in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(2, len(fetcher._sessions))  # one session per thread
+            fetcher.close()
+            self.assertEqual([], fetcher._sessions)
+            self.assertEqual(len(links), site.requests["JOB_PAGE"])
+            return pages
+
+    def test_post_back(self):
+        pages = self.fetch("KA")
+        self.assertTrue(all(f">{1000000000 + i}<" in page for i, page in enumerate(pages)))
+
+    def test_get(self):
+        pages = self.fetch("HS")
+        self.assertTrue(all(page.count("<table") for page in pages))
+
+    def test_logged_out(self):
+        with portal.KaPortal(jobs=1) as site:
+            config = site.local_config()
+            fetcher = Fetchers.HttpFetcher(config, Browser(config, logon=False))
+            link = BeautifulSoup(sites.ka_landing_page(["KA1"]), "lxml").a
+            with self.assertRaises(Fetchers.FetchError):
+                fetcher.fetch(link)
+            fetcher.close()
+
+    def test_record(self):
+        class Fetcher:
+            def fetch(self, link):
+                return sites.ka_job_page("KA1")
+
+        with tempfile.TemporaryDirectory() as path:
+            link = sites.ka_links(sites.ka_landing_page(["KA1"]))[0]
+            scraper = KaScraper(record=path, http_fetch=True)
+            scraper.fetcher = Fetcher()
+            page = scraper._capture_page(link)
+            # a replay clicks the link the page was fetched for
+            driver = Replay.ReplayDriver(Replay.Capture(path))
+            driver.find_element_by_xpath('//a[@href="' + link["href"] + '"]').click()
+            self.assertEqual(page, driver.page_source)
+
+
+if __name__ == '__main__':
+    unittest.main()
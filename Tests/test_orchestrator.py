@@ -0,0 +1,29 @@
+import os
+import tempfile
+import unittest
+
+from EstateAgent import Orchestrator, Store
+from Tests import sites
+
+
+class TestScrapeAll(unittest.TestCase):
+    def test_scrape_all(self):
+        with tempfile.TemporaryDirectory() as path:
+            sites.ka_capture(path, ["KA1", "KA2", "KA3"])
+            database = os.path.join(path, "jobs.db")
+            # both scrapers replay the KeyAGENT capture, which House Simple's logon page isn't in
+            jobs, results = Orchestrator.scrape_all(["KA", "HS"], store=database, replay=path, persist_session=False)
+            self.assertEqual(["KA", "HS"], [result.client for result in results])
+            ka, hs = results
+            self.assertIsNone(ka.error)
+            self.assertEqual(["KA1", "KA2", "KA3"], [job.id for job in ka.jobs])
+            self.assertIn("ReplayError", hs.error)  # one client failing doesn't stop the others
+            self.assertEqual([], hs.jobs)
+            self.assertEqual(["KA1", "KA2", "KA3"], [job.id for job in jobs])
+            store = Store.JobStore(database)
+            self.assertEqual(["KA1", "KA2", "KA3"], sorted(job.id for job in store.load_jobs()))
+            store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import re
+import unittest
+
+from EstateAgent import ConfigKA
+from EstateAgent.Parsers import ExtractionPlan, KaParser
+
+
+class TestExtractionPlan(unittest.TestCase):
+    plan = ExtractionPlan.for_config(ConfigKA)
+
+    def test_for_config(self):
+        self.assertIs(self.plan, ExtractionPlan.for_config(ConfigKA))  # compiled once
+
+    def test_extract(self):
+        strings = {"JOB_DATA_AGENT":  ["H Brown of Connells  MOB:01908 563 993  TEL:01908 563 993  EVE:N/A",
+                                       "Mr Joe Blogs of Your Move - Olney  MOB:07777123456  TEL:(01234) 567890  "
+                                       "EVE:N/A", "", None],
+                   "JOB_DATA_VENDOR": ["Mrs Sue Blogs DAY: 01908 222343 MOB:07700 900123 EVE: N/A Email: sue@x.com",
+                                       "Dr Wei Khan DAY: 01908-501-401  MOB: N/A  EVE: 01908 501401  Email: ",
+                                       "", None]}
+        for source, names in ConfigKA.REGEXP_SOURCES.items():
+            for string in strings[source]:
+                # as each ConfigKA.REGEXP used to be searched for on its own
+                expected = {}
+                for name in names:
+                    match = re.search(ConfigKA.REGEXP[name], string) if string is not None else None
+                    expected[name] = match.group(1) if match else None
+                self.assertEqual(expected, self.plan.extract(source, string))
+
+    def test_abbreviate(self):
+        def abbreviate(string):
+            # the old loop, one cell at a time
+            for jargon, abbreviation in ConfigKA.JOB_PAGE_SITE_VISIT_ABBRS.items():
+                string = string.replace(jargon, abbreviation)
+            return string
+
+        cells = ["08/02/2019 10:00", "Steve Caballero",
+                 "Appointment date ammended due to the reason Changed at Vendors request",
+                 "Changed at Vendors (DEA)request", "Appointment booked (DEA)", "", "Floorplan required"]
+        self.assertEqual([abbreviate(cell) for cell in cells], self.plan.abbreviate(cells))
+        self.assertEqual("", self.plan.abbreviate(cells)[3])  # later abbreviations match the results of earlier ones
+        cells.append("Added by the Supplier:\nI will call again")  # can't be joined, abbreviated cell by cell
+        self.assertEqual([abbreviate(cell) for cell in cells], self.plan.abbreviate(cells))
+        self.assertEqual([], self.plan.abbreviate([]))
+
+    def test_unwanted_notes(self):
+        def unwanted_notes(notes):
+            # the old filter, every unwanted string against every note
+            return {note for note in notes for unwanted in ConfigKA.UNWANTED_NOTES if unwanted in note}
+
+        notes = ["Key with agent", "Parking: NA", "Sample Selector: 3", "Agency Branch: Connells", "Vendor has a dog"]
+        self.assertEqual(unwanted_notes(notes), self.plan.unwanted_notes(notes))
+        self.assertEqual(set(), self.plan.unwanted_notes(["Key with agent", ""]))
+        everything = ["Parking: NA", "AA Prestige property", "Sample Selector: 3"]
+        self.assertEqual(set(everything), self.plan.unwanted_notes(everything))
+        parser = KaParser({"JOB_DATA_NOTES": "\n".join(everything + [""])})
+        self.assertEqual([], parser._extract_notes())  # every note filtered out
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+
+from EstateAgent import ConfigHS, Replay
+from EstateAgent.Scrapers import KaScraper
+from Tests import sites
+
+
+def summary(job):
+    return job.id, str(job), job.notes, job.system_notes
+
+
+class TestReplay(unittest.TestCase):
+    def test_replay(self):
+        with tempfile.TemporaryDirectory() as path:
+            sites.ka_capture(path, ["KA1", "KA2", "KA3"])
+            scraper = KaScraper(replay=path)
+            jobs = scraper.extract_jobs(scraper.extract_job_links())
+            scraper.scraper_close()
+            self.assertEqual(["KA1", "KA2", "KA3"], [job.id for job in jobs])
+
+    def test_record_replay(self):
+        with tempfile.TemporaryDirectory() as path:
+            site, recorded = os.path.join(path, "site"), os.path.join(path, "recorded")
+            sites.ka_capture(site, ["KA1", "KA2", "KA3", "KA4"])
+            # the capture stands in for Chrome on the live site
+            live = KaScraper(replay=site, pool_size=2)
+            recording = Replay.Capture(recorded)
+            live._create_driver = lambda: Replay.RecordingDriver(Replay.ReplayDriver(live.capture), recording)
+            jobs = live.extract_jobs(live.extract_job_links())
+            live.scraper_close()
+            replay = KaScraper(replay=recorded, pool_size=2)
+            replayed = replay.extract_jobs(replay.extract_job_links())
+            replay.scraper_close()
+            self.assertEqual(4, len(jobs))
+            self.assertEqual([summary(job) for job in jobs], [summary(job) for job in replayed])
+
+    def test_visits(self):
+        with tempfile.TemporaryDirectory() as path:
+            site, recorded = os.path.join(path, "site"), os.path.join(path, "recorded")
+            capture = Replay.Capture(site)
+            # House Simple's logon form and dashboard share a url
+            capture.add(sites.login_form(ConfigHS), url=ConfigHS.LOGIN_PAGE)
+            capture.add("<html><body>Dashboard</body></html>", url=ConfigHS.LOGIN_PAGE, visit=1)
+            driver = Replay.RecordingDriver(Replay.ReplayDriver(capture), Replay.Capture(recorded))
+            pages = []
+            for _ in range(3):
+                driver.get(ConfigHS.LOGIN_PAGE)
+                pages.append(driver.page_source)
+            self.assertEqual(pages[1], pages[2])  # past the last visit recorded the last page is served again
+            replay = Replay.ReplayDriver(Replay.Capture(recorded))
+            for page in pages:
+                replay.get(ConfigHS.LOGIN_PAGE)
+                self.assertEqual(page, replay.page_source)
+            self.assertEqual(3, len(Replay.Capture(recorded).urls[ConfigHS.LOGIN_PAGE]))
+
+    def test_record_extract_js(self):
+        with tempfile.TemporaryDirectory() as path:
+            site, recorded = os.path.join(path, "site"), os.path.join(path, "recorded")
+            sites.ka_capture(site, ["KA1"])
+            scraper = KaScraper(record=recorded, extract_js=True)
+            scraper._create_driver = lambda: Replay.RecordingDriver(Replay.ReplayDriver(Replay.Capture(site)),
+                                                                    scraper.capture)
+            scraper._extract_page_fields_js = lambda driver: {}  # a replayed page has no DOM to run javascript in
+            link = scraper.extract_job_links()[0]
+            scraper._capture_page(link)
+            scraper.scraper_close()
+            capture = Replay.Capture(recorded)
+            self.assertEqual(sites.ka_job_page("KA1"), capture.read(capture.links[link["href"]]))
+
+    def test_journal(self):
+        with tempfile.TemporaryDirectory() as path:
+            capture = Replay.Capture(path)
+            capture.add("<html>1</html>", url="https://example.com")
+            capture.add("<html>2</html>", href="job")
+            capture.add("<html>3</html>", href="job")  # the link was recorded again, the last page wins
+            with open(os.path.join(path, Replay.INDEX)) as f:
+                self.assertEqual(3, len(f.readlines()))  # one line per page, nothing rewritten
+            reopened = Replay.Capture(path)
+            self.assertEqual((capture.urls, capture.links), (reopened.urls, reopened.links))
+            self.assertEqual("<html>3</html>", reopened.read(reopened.links["job"]))
+
+    def test_missing_page(self):
+        with tempfile.TemporaryDirectory() as path:
+            driver = Replay.ReplayDriver(Replay.Capture(path))
+            with self.assertRaises(Replay.ReplayError):
+                driver.get("https://example.com")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import Future
+
+from bs4 import BeautifulSoup
+
+from EstateAgent import Changes, Metrics
+from EstateAgent.Scrapers import SCRAPERS, KaScraper
+from Benchmarks import generator
+from Tests import sites
+
+
+class TestIterJobs(unittest.TestCase):
+    def test_iter_jobs(self):
+        with tempfile.TemporaryDirectory() as path:
+            sites.ka_capture(path, ["KA1", "KA2", "KA3"])
+            scraper = KaScraper(replay=path)
+            self.assertEqual(["KA1", "KA2", "KA3"], [job.id for job in scraper.iter_jobs()])
+            self.assertIsNone(scraper.driver)  # closed once the last Job has been yielded
+
+    def test_close_early(self):
+        with tempfile.TemporaryDirectory() as path:
+            sites.ka_capture(path, [f"KA{i}" for i in range(8)])
+            scraper = KaScraper(replay=path, pool_size=2)
+            jobs = scraper.iter_jobs()
+            next(jobs)
+            drivers = [scraper.driver] + scraper.drivers
+            self.assertEqual(2, len(drivers))
+            jobs.close()
+            self.assertEqual(([], []), tuple(driver.history for driver in drivers))  # every driver has quit
+            self.assertEqual((None, []), (scraper.driver, scraper.drivers))
+
+    def test_run_stage(self):
+        with tempfile.TemporaryDirectory() as path:
+            sites.ka_capture(path, ["KA1", "KA2", "KA3"])
+            metrics = Metrics.Metrics()
+            for _ in KaScraper(replay=path, metrics=metrics).iter_jobs():
+                time.sleep(0.1)  # a slow consumer
+            run = metrics.summary()["stages"]["run"]
+            self.assertEqual(1, run["count"])
+            self.assertLess(run["total"], 0.3)  # the consumer's time isn't scrape time
+
+
+class TestScraperPool(unittest.TestCase):
+    def test_order(self):
+        with tempfile.TemporaryDirectory() as path:
+            sites.ka_capture(path, [f"KA{i}" for i in range(10)])
+            serial = list(KaScraper(replay=path).iter_jobs())
+            pooled = list(KaScraper(replay=path, pool_size=3).iter_jobs())
+            self.assertEqual(10, len(serial))
+            self.assertEqual([Changes.fingerprint(job) for job in serial], [Changes.fingerprint(job) for job in pooled])
+
+    def test_error(self):
+        def extract(link, driver):
+            extracted.append(link)
+            if link == 2:
+                raise ValueError("lost the landing page")
+            return link
+
+        with tempfile.TemporaryDirectory() as path:
+            sites.ka_capture(path, ["KA1"])
+            scraper = KaScraper(replay=path, pool_size=2)
+            scraper.driver = scraper._logon()
+            extracted, jobs = [], scraper._iter_jobs_pooled(list(range(6)), extract)
+            self.assertEqual([0, 1], [next(jobs), next(jobs)])
+            self.assertRaises(ValueError, next, jobs)
+            self.assertEqual(1, len(scraper.drivers))
+            self.assertNotIn(4, extracted)  # the failed driver's share stops
+            scraper.scraper_close()
+            self.assertEqual([], scraper.drivers)
+
+            results = [Future() for _ in range(3)]
+            scraper._extract_share(None, [0, 2, 4], results, threading.Event(), extract)
+            self.assertIsInstance(results[1].exception(), ValueError)
+            self.assertTrue(results[2].cancelled())  # not left unset for a consumer to wait on forever
+
+
+class Browser:
+    # runs Scraper.FIELDS_SCRIPT on a page the way a browser would: textContent of each field, outerHTML of tables
+    def __init__(self, page):
+        self.html = BeautifulSoup(page, "lxml")
+
+    def execute_script(self, script, *args):
+        if len(args) == 2:  # Scraper: {key : element id} fields and tables
+            fields, tables = args
+            result = {key: self._element(id=value, text=True) for key, value in fields.items()}
+            result.update({key: self._element(id=value) for key, value in tables.items()})
+            return result
+        tables, = args  # HsScraper: {key : tag name} of every table on the page
+        return {key: "".join(str(element) for element in self.html.find_all(value)) for key, value in tables.items()}
+
+    def _element(self, text=False, **attributes):
+        element = self.html.find(**attributes)
+        if element is None:
+            return None
+        return element.get_text() if text else str(element)
+
+
+class TestExtractJs(unittest.TestCase):
+    def test_same_jobs(self):
+        for kind in SCRAPERS:
+            scraper = SCRAPERS[kind](extract_js=True)
+            for page in generator.pages(kind, 20):
+                fields = scraper._extract_page_fields(driver=Browser(page))
+                self.assertIsInstance(fields, dict)
+                expected = scraper._parse_page(page)  # BeautifulSoup on the page source
+                self.assertIsNotNone(expected.id)
+                self.assertEqual(Changes.fingerprint(expected), Changes.fingerprint(scraper._parse_page(fields)))
+
+
+class TestParallelParse(unittest.TestCase):
+    def test_order(self):
+        with tempfile.TemporaryDirectory() as path:
+            sites.ka_capture(path, [f"KA{i}" for i in range(12)])
+            serial = list(KaScraper(replay=path).iter_jobs())
+            metrics = Metrics.Metrics()
+            parsed = list(KaScraper(replay=path, pool_size=2, parse_workers=2, metrics=metrics).iter_jobs())
+            self.assertEqual([Changes.fingerprint(job) for job in serial], [Changes.fingerprint(job) for job in parsed])
+            self.assertEqual(12, metrics.summary()["stages"]["parse"]["count"])  # sent back from the workers
+            self.assertIs(serial[0].agent, parsed[0].agent)  # interned again after the trip
+
+    def test_window(self):
+        with tempfile.TemporaryDirectory() as path:
+            sites.ka_capture(path, [f"KA{i}" for i in range(12)])
+            scraper = KaScraper(replay=path, pool_size=2, parse_workers=1, parse_queue=2)
+            captured = []
+            capture_page = scraper._capture_page
+            scraper._capture_page = lambda link, driver: captured.append(link) or capture_page(link, driver)
+            jobs = scraper.iter_jobs()
+            next(jobs)
+            time.sleep(0.5)  # give the drivers time to run ahead if they could
+            self.assertLessEqual(len(captured), 1 + 2)
+            self.assertEqual(11, len(list(jobs)))
+            self.assertEqual(12, len(captured))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+
+from EstateAgent import ConfigHS, ConfigKA, Replay, Sessions
+from EstateAgent.Scrapers import HsScraper
+from Tests import sites
+
+
+class Driver:
+    # a browser on a site that shows its logon form until it is sent the "valid" session cookie
+    def __init__(self, *cookies):
+        self.cookies = list(cookies)
+        self.page_source = "<html></html>"
+
+    def get(self, url):
+        logged_on = {"name": "session", "value": "valid"} in self.cookies
+        self.page_source = "<html><body>Jobs</body></html>" if logged_on else sites.login_form(ConfigKA)
+
+    def get_cookies(self):
+        return self.cookies
+
+    def add_cookie(self, cookie):
+        self.cookies.append(cookie)
+
+
+class TestSessionStore(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.TemporaryDirectory()
+        self.sessions = Sessions.SessionStore(ConfigKA, os.path.join(self.path.name, "KA.json"))
+
+    def tearDown(self):
+        self.path.cleanup()
+
+    def test_nothing_saved(self):
+        self.assertEqual([], self.sessions.load())
+        self.assertFalse(self.sessions.restore(Driver(), ConfigKA.LANDING_PAGE))
+
+    def test_restore(self):
+        self.sessions.save(Driver({"name": "session", "value": "valid"}, {"name": "old", "value": "", "expiry": 1}))
+        self.assertEqual([{"name": "session", "value": "valid"}], self.sessions.load())  # expired cookies dropped
+        driver = Driver()
+        self.assertTrue(self.sessions.restore(driver, ConfigKA.LANDING_PAGE))
+        self.assertTrue(self.sessions.is_logged_on(driver))
+
+    def test_timed_out(self):
+        self.sessions.save(Driver({"name": "session", "value": "timed out"}))
+        self.assertFalse(self.sessions.restore(Driver(), ConfigKA.LANDING_PAGE))
+        self.assertFalse(os.path.exists(self.sessions.path))  # a session that no longer logs on is forgotten
+
+    def test_opt_in(self):
+        self.assertIsNone(HsScraper().sessions)  # nothing is written to disk unless asked for
+        sessions = HsScraper(persist_session=True).sessions
+        self.assertEqual(os.path.join(Sessions.SESSION_DIR, "House_Simple.json"), sessions.path)
+
+
+class TestLogon(unittest.TestCase):
+    DASHBOARD = "<html><body><table><tr><td>No home visits</td></tr></table></body></html>"
+
+    class FormDriver(Replay.ReplayDriver):
+        # remembers which logon form fields it was asked for
+        def __init__(self, capture):
+            super().__init__(capture)
+            self.fields = []
+
+        def find_element_by_name(self, name):
+            self.fields.append(name)
+            return super().find_element_by_name(name)
+
+    def logon(self, *pages):
+        # House Simple's logon form and dashboard share a url, pages are what each visit to it shows
+        with tempfile.TemporaryDirectory() as path:
+            capture = Replay.Capture(path)
+            for visit, page in enumerate(pages):
+                capture.add(page, url=ConfigHS.LOGIN_PAGE, visit=visit)
+            scraper = HsScraper(replay=path)
+            driver = self.FormDriver(scraper.capture)
+            scraper._create_driver = lambda: driver
+            self.assertIs(driver, scraper._logon())
+            self.assertEqual(self.DASHBOARD, driver.page_source)
+            return driver.fields
+
+    def test_logon_form(self):
+        self.assertEqual([ConfigHS.USERNAME_FIELD, ConfigHS.PASSWORD_FIELD, ConfigHS.LOGIN_BUTTON],
+                         self.logon(sites.login_form(ConfigHS), self.DASHBOARD))
+
+    def test_still_logged_on(self):
+        self.assertEqual([], self.logon(self.DASHBOARD))  # the browser went straight to the dashboard
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import random
+import tempfile
+import unittest
+
+from EstateAgent import ConfigHS, Replay, Waits
+from Benchmarks import generator
+from Tests import sites
+
+
+class TestPageReadiness(unittest.TestCase):
+    def test_wait(self):
+        with tempfile.TemporaryDirectory() as path:
+            capture = Replay.Capture(path)
+            # House Simple's logon form and dashboard share a url
+            capture.add(sites.login_form(ConfigHS), url=ConfigHS.LOGIN_PAGE)
+            capture.add(generator.hs_dashboard(random.Random(0), 2), url=ConfigHS.LOGIN_PAGE, visit=1)
+            capture.add(generator.job_page("HS", 0), href="job")
+            driver = Replay.ReplayDriver(Replay.Capture(path))
+            readiness = Waits.PageReadiness(ConfigHS, timeout=0)
+            driver.get(ConfigHS.LOGIN_PAGE)
+            self.assertEqual({}, readiness.wait(driver, "LOGIN_PAGE"))
+            driver.get(ConfigHS.LOGIN_PAGE)
+            self.assertEqual({"table": True}, readiness.wait(driver, "LANDING_PAGE"))
+            self.assertRaises(Waits.PageNotReady, readiness.wait, driver, "JOB_PAGE")  # the dashboard has tables too
+            readiness.find(driver, "xpath", '//a[@href="job"]').click()
+            self.assertEqual({}, readiness.wait(driver, "JOB_PAGE"))
+            self.assertEqual(1, readiness.summary()["JOB_PAGE"][3])
+
+    def test_missing_optional(self):
+        with tempfile.TemporaryDirectory() as path:
+            capture = Replay.Capture(path)
+            capture.add("<html><body>No home visits</body></html>", url=ConfigHS.LANDING_PAGE)
+            driver = Replay.ReplayDriver(capture)
+            driver.get(ConfigHS.LANDING_PAGE)
+            self.assertEqual({"table": False}, Waits.PageReadiness(ConfigHS, timeout=0).wait(driver, "LANDING_PAGE"))
+
+
+if __name__ == '__main__':
+    unittest.main()
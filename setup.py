@@ -8,5 +8,6 @@ setup(
         license='',
         author='steve',
         author_email='',
-        description=''
+        description='',
+        python_requires='>=3.7'
 )